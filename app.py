@@ -1,13 +1,30 @@
+import functools
+import hmac
 import json
 import logging
 import random
 import sys
+import threading
 from logging.handlers import RotatingFileHandler
 
 import flask
 import flask_socketio
 
-from source import config, content, manager
+from source import (
+    admission,
+    assets,
+    config,
+    content,
+    manager,
+    metrics,
+    opener,
+    profiler,
+    reaper,
+    usage,
+    utils,
+)
+from source.allocator import RoomCapacityError
+from source.api import tts
 from source.eval import PersonaDebateEvaluator
 
 
@@ -17,7 +34,35 @@ file_handler = RotatingFileHandler("app.log", maxBytes=1_000_000, backupCount=3)
 formatter = logging.Formatter("[%(levelname)s-%(asctime)s]\t%(name)s: %(message)s")
 
 app = flask.Flask(__name__)
-socketio = flask_socketio.SocketIO(app, logger=True, engineio_logger=False)
+# production 에서는 websocket 만 허용해 long-polling 요청/스레드를 없앰
+SOCKETIO_TRANSPORTS = [
+    transport.strip()
+    for transport in config.CONFIG["flask"]
+    .get("SOCKETIO.TRANSPORTS", "polling, websocket")
+    .split(",")
+    if transport.strip()
+]
+socketio = flask_socketio.SocketIO(
+    app,
+    logger=True,
+    engineio_logger=False,
+    # threading(기본), gevent, eventlet
+    async_mode=config.CONFIG["flask"].get("SOCKETIO.ASYNC_MODE") or None,
+    transports=SOCKETIO_TRANSPORTS,
+    # 미리 인코딩된 메시지 frame 은 다시 직렬화하지 않음
+    json=content.FrameJSON,
+    http_compression=True,
+    compression_threshold=config.CONFIG["flask"].getint(
+        "SOCKETIO.COMPRESSION_THRESHOLD", 1024
+    ),
+    # 여러 프로세스에서 emit 하려면 공유 메시지 큐(redis:// 등)가 필요
+    message_queue=config.CONFIG["flask"].get("SOCKETIO.MESSAGE_QUEUE") or None,
+)
+# python -m source.assets 로 build 한 fingerprint 파일을 /assets/ 에서 immutable 로 서빙
+assets.Assets.from_config(config.CONFIG["flask"], app.static_folder).init_app(app)
+connections = admission.ConnectionLimiter(
+    config.CONFIG["flask"].getint("SOCKETIO.MAX_CONNECTIONS", 0)
+)
 
 file_handler.setFormatter(formatter)
 file_handler.setLevel(logging.INFO)
@@ -41,6 +86,27 @@ app.secret_key = config.CONFIG["flask"]["SECRET_KEY"]
 app.logger.info("=== Logging initialized ===")
 
 room_manager = manager.RoomManager()
+room_reaper = reaper.RoomReaper(
+    room_manager,
+    idle_ttl=float(config.CONFIG["default"].get("ROOM.IDLE_TTL", 600)),
+    max_lifetime=float(config.CONFIG["default"].get("ROOM.MAX_LIFETIME", 3600)),
+    interval=float(config.CONFIG["default"].get("ROOM.REAP_INTERVAL", 30)),
+)
+room_reaper.start()
+admission_controller = admission.AdmissionController.from_config(
+    config.CONFIG["default"], room_manager.load
+)
+
+if config.CONFIG.has_section("pricing"):
+    usage.configure(config.CONFIG["pricing"])
+if config.CONFIG.has_section("tts"):
+    tts.configure(config.CONFIG["tts"])
+
+metrics.configure(config.CONFIG["default"].getboolean("METRICS.ENABLED", True))
+metrics.ACTIVE_ROOMS.set_function(lambda: len(room_manager.list_rooms()))
+metrics.THREADS.set_function(threading.active_count)
+metrics.MESSAGE_BYTES.set_function(room_manager.message_bytes)
+metrics.CONNECTIONS.set_function(lambda: connections.active)
 evaluator = PersonaDebateEvaluator(
     persona_json_path=config.CONFIG["default"]["EVAL.PERSONA"],
     num_agents=int(config.CONFIG["default"]["EVAL.SIZE"]),
@@ -55,10 +121,32 @@ room_manager.event_bus.subscribe(
     lambda data: socketio.emit("cons-message", data.get("data"), room=data.get("room")),
 )
 
+room_manager.event_bus.subscribe(
+    "pros-error",
+    lambda data: socketio.emit("pros-error", data.get("data"), room=data.get("room")),
+)
+room_manager.event_bus.subscribe(
+    "cons-error",
+    lambda data: socketio.emit("cons-error", data.get("data"), room=data.get("room")),
+)
+
 with open(config.CONFIG["default"]["TOPIC"], "r", encoding="utf-8") as fp:
     TOPIC_POOL = json.load(fp)
 
 
+def admin_required(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = config.CONFIG["flask"].get("ADMIN.TOKEN")
+        # query string 은 access log / 브라우저 기록에 남으므로 header 로만 받음
+        given = flask.request.headers.get("X-Admin-Token", "")
+        if not token or not hmac.compare_digest(given.encode(), token.encode()):
+            flask.abort(403)
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
 @socketio.on("complete")
 def on_tts(data):
     code = data.get("room")
@@ -67,7 +155,15 @@ def on_tts(data):
         return
 
     room = room_manager.get_room(code)
-    room.set_event(role)
+    if room is None:
+        return
+    seq = data.get("seq")
+    if not seq:
+        seq = None
+    elif (seq := utils.parse_seq(seq)) is None:
+        # 잘못된 seq 로 다른 발언을 완료 처리하지 않도록 무시
+        return
+    room.acknowledge(role, seq)
 
     app.logger.info(f"{role} - Complete")
 
@@ -83,6 +179,61 @@ def on_model(data, code):
     room.start_debate(topic)
 
 
+def stored_messages(code) -> list:
+    # 끝났거나 다른 프로세스가 가진 방은 공유 상태 / 저장소의 기록을 씀
+    if not code:
+        return []
+    return room_manager.get_messages(code, flask.session.get("uid"))
+
+
+@socketio.on("sync")
+def on_sync(data):
+    code = flask.session.get("room")
+    room = room_manager.get_room(code) if code else None
+    since = utils.parse_seq((data or {}).get("since") or 0)
+    if since is None:
+        return
+
+    if room is None:
+        # 오디오는 audio 이벤트로 따로 받으므로 메타데이터만
+        messages = [
+            {
+                **{key: value for key, value in message.items() if key != "audio_base64"},
+                "has_audio": bool(message.get("audio_base64")),
+            }
+            for message in stored_messages(code)
+            if message.get("seq", 0) > since
+        ]
+        seq = max([since] + [message["seq"] for message in messages])
+        return {"messages": messages, "seq": seq, "pending": None}
+
+    messages = room.messages_since(since)
+    # 재생이 끝나지 않은 발언과 다른 시청자가 재생 중인지 (클라이언트가 대신 complete 할지 판단)
+    return {
+        "messages": messages,
+        "seq": room.seq,
+        "pending": room.pending(flask.request.sid),
+    }
+
+
+@socketio.on("audio")
+def on_audio(data):
+    code = flask.session.get("room")
+    room = room_manager.get_room(code) if code else None
+    seq = utils.parse_seq((data or {}).get("seq") or 0)
+    if seq is None:
+        return
+    if room is not None:
+        audio_base64, audio_type = room.get_audio(seq)
+    else:
+        message = next(
+            (message for message in stored_messages(code) if message.get("seq") == seq), {}
+        )
+        audio_base64, audio_type = message.get("audio_base64", ""), message.get("audio_type", "")
+
+    return {"seq": seq, "audio_base64": audio_base64, "audio_type": audio_type}
+
+
 @socketio.on("user")
 def on_user(data):
     code = flask.session.get("room")
@@ -92,13 +243,11 @@ def on_user(data):
     if not (code and message_text) or code not in room_manager.list_rooms():
         return
 
-    data = content.MessageContent(
-        name=name, role="user", message=message_text, is_playing=True
-    ).to_dict()
+    data = content.MessageContent(name=name, role="user", message=message_text)
 
     room = room_manager.get_room(code)
     room.user_message(message_text)
-    socketio.emit("message", data, room=code)
+    socketio.emit("message", data.frame, room=code)
 
     app.logger.info(f"{name} - Send: {message_text}")
 
@@ -108,7 +257,7 @@ def on_start(data):
     code = flask.session.get("room")
     name = flask.session.get("name", "user")
     topic = data.get("topic", "").strip()
-    message = f"토론 주제는 '{topic}' 입니다."
+    message = opener.opening_message(topic)
 
     if not (code and topic) or code not in room_manager.list_rooms():
         return
@@ -117,7 +266,6 @@ def on_start(data):
         name=name,
         role="system",
         message=message,
-        is_playing=True,
     ).to_dict()
 
     on_model(data, code)
@@ -126,22 +274,49 @@ def on_start(data):
 
 
 @socketio.on("connect")
-def on_connect():
+def on_connect(auth=None):
     code = flask.session.get("room")
     topic = flask.session.get("topic")
     name = flask.session.get("name", "user")
 
-    # 세션이나 유효한 방이 없으면 연결 중단
-    if not (code and topic) or code not in room_manager.list_rooms():
-        flask_socketio.leave_room(code)
-        return
-
-    room = room_manager.get_room(code)
-    room.add_member()
+    if not connections.acquire():
+        app.logger.warning(f"{name} - Connect: rejected, connection limit reached")
+        raise ConnectionRefusedError("server is full")
 
-    flask_socketio.join_room(code)
-
-    app.logger.info(f"{name} - Connect: User {name} connected to room {code}")
+    member = None
+    try:
+        # 방의 worker 는 만든 프로세스에만 있으므로 sticky session 이 깨졌으면 거절
+        owner = room_manager.remote_owner(code) if code else None
+        if owner:
+            app.logger.warning(f"{name} - Connect: room {code} is served by node {owner}")
+            raise ConnectionRefusedError("room is served by another process")
+
+        # 세션이나 유효한 방이 없으면 연결 중단
+        if not (code and topic) or code not in room_manager.list_rooms():
+            flask_socketio.leave_room(code)
+            return
+
+        # 브라우저가 알려준 재생 가능 형식/네트워크 상태로 audio profile 선택
+        capabilities = auth or {}
+        room = room_manager.get_room(code)
+        member = room
+        profile = room.add_member(
+            flask.request.sid,
+            capabilities.get("audio"),
+            capabilities.get("lowBandwidth", False),
+        )
+
+        flask_socketio.join_room(code)
+    except Exception:
+        # 연결이 실패하면 disconnect 가 오지 않으므로 여기서 slot 과 member 를 돌려줌
+        if member is not None:
+            member.remove_member(flask.request.sid)
+        connections.release()
+        raise
+
+    app.logger.info(
+        f"{name} - Connect: User {name} connected to room {code} (audio: {profile.name})"
+    )
 
 
 @socketio.on("disconnect")
@@ -149,12 +324,14 @@ def on_disconnect():
     code = flask.session.get("room")
     name = flask.session.get("name", "user")
 
+    connections.release()
+
     if not code:
         return
 
     if code in room_manager.list_rooms():
         room = room_manager.get_room(code)
-        if not room.remove_member():
+        if not room.remove_member(flask.request.sid):
             room_manager.remove_room(code)
 
     flask_socketio.leave_room(code)
@@ -167,12 +344,25 @@ def room():
     code = flask.session.get("room")
     topic = flask.session.get("topic")
 
-    if not (code and topic) or code not in room_manager.list_rooms():
+    uid = flask.session.get("uid")
+
+    if not (code and topic) or not room_manager.exists(code, uid):
         return flask.redirect(flask.url_for("home"))
 
-    room = room_manager.get_room(code)
+    owner = room_manager.remote_owner(code)
+    if owner:
+        app.logger.warning(f"/room - room {code} is served by node {owner}")
+        return (
+            f"Room {code} is served by another server process; "
+            "the load balancer must use sticky sessions.",
+            409,
+        )
+
     return flask.render_template(
-        "room.html", code=code, topic=topic, messages=room.messages
+        "room.html",
+        code=code,
+        topic=topic,
+        transports=SOCKETIO_TRANSPORTS,
     )
 
 
@@ -182,13 +372,20 @@ def evaluate():
     code = data.get("room")
     topic = data.get("topic")
 
-    if not code or not topic or code not in room_manager.list_rooms():
+    uid = flask.session.get("uid")
+
+    if not code or not topic or not room_manager.exists(code, uid):
         return flask.jsonify({"error": "Invalid room or topic"}), 400
 
-    room = room_manager.get_room(code)
     try:
-        messages = room.messages
-        room.results = evaluator.evaluate_with_personas(messages, topic)
+        messages = room_manager.get_messages(code, uid)
+        with profiler.tagged(room=code, role="evaluate"):
+            results = evaluator.evaluate_with_personas(messages, topic)
+        results["usage"] = {
+            "debate": room_manager.get_usage(code),
+            "evaluation": results.get("usage", {}),
+        }
+        room_manager.set_results(code, results, uid)
 
         return flask.jsonify({"ok": True}), 200
     except Exception as e:
@@ -200,41 +397,179 @@ def evaluate():
 @app.route("/result")
 def result():
     code = flask.session.get("room")
-    room = room_manager.get_room(code)
+    uid = flask.session.get("uid")
 
-    results = room.results
+    results = room_manager.get_results(code, uid)
     if not results:
         return flask.redirect(flask.url_for("home"))
 
     return flask.render_template("result.html", result=results)
 
 
+@app.route("/metrics")
+def prometheus_metrics():
+    if not metrics.enabled():
+        flask.abort(404)
+    return flask.Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route("/admin/rooms")
+@admin_required
+def admin_rooms():
+    return flask.jsonify(
+        {
+            "summary": room_manager.metrics(),
+            "events": room_manager.event_bus.stats(),
+            "connections": connections.stats(),
+            "admission": admission_controller.metrics(),
+            "usage": usage.GLOBAL.summary(),
+            "router": evaluator.router_stats(),
+            "providers": manager.room.POLICY.stats(),
+            "rooms": room_manager.resources(),
+        }
+    )
+
+
+@app.route("/admin/profile")
+@admin_required
+def admin_profile():
+    # 모든 스레드의 stack 을 seconds 동안 sample (wall-clock)
+    section = config.CONFIG["flask"]
+    if not section.getboolean("PROFILER.ENABLED", True):
+        flask.abort(404)
+
+    try:
+        seconds = float(flask.request.args.get("seconds", 5))
+        interval = float(
+            flask.request.args.get("interval", section.getfloat("PROFILER.INTERVAL", 0.01))
+        )
+    except ValueError:
+        flask.abort(400)
+    seconds = min(max(seconds, 0.1), section.getfloat("PROFILER.MAX_SECONDS", 30))
+    interval = max(interval, 0.001)
+
+    try:
+        profile = profiler.sample(seconds, interval)
+    except profiler.ProfilerBusy as exc:
+        return flask.jsonify({"error": str(exc)}), 409
+
+    if flask.request.args.get("format") == "speedscope":
+        response = flask.jsonify(profile.speedscope())
+        response.headers["Content-Disposition"] = (
+            "attachment; filename=profile.speedscope.json"
+        )
+        return response
+    return flask.Response(profile.collapsed(), mimetype="text/plain")
+
+
+@app.route("/admin/threads")
+@admin_required
+def admin_threads():
+    return flask.jsonify({"threads": profiler.threads()})
+
+
+def create_room(payload):
+    return room_manager.create_room(
+        payload["model_pros"], payload["model_cons"], topic=payload["topic"]
+    )
+
+
+def enter_room(code, topic):
+    flask.session.pop("ticket", None)
+    flask.session["room"] = code
+    flask.session["uid"] = room_manager.get_room(code).uid
+    flask.session["topic"] = topic
+    flask.session["name"] = "user"  # 기본 이름
+
+
+def busy(random_topics, retry_after):
+    response = flask.make_response(
+        flask.render_template(
+            "home.html",
+            error="All debate rooms are busy. Please try again later.",
+            random_topics=random_topics,
+        ),
+        503,
+    )
+    response.headers["Retry-After"] = str(int(retry_after))
+    return response
+
+
 @app.route("/", methods=["GET", "POST"])
 def home():
+    # 대기 화면에서 취소했거나 새 주제로 다시 요청하면 이전 대기표는 버림
+    ticket = flask.session.get("ticket")
+    if ticket:
+        admission_controller.cancel(ticket)
     flask.session.clear()
     random_topics = random.sample(TOPIC_POOL, 3)
 
     if flask.request.method == "POST":
-        name = "user"  # 기본 이름
         topic = flask.request.form.get("topic", "").strip()
-        model_pros = flask.request.form.get("model_pros")
-        model_cons = flask.request.form.get("model_cons")
+        payload = {
+            "topic": topic,
+            "model_pros": flask.request.form.get("model_pros"),
+            "model_cons": flask.request.form.get("model_cons"),
+        }
 
         if not topic:
             return flask.render_template(
                 "home.html", error="Please enter a topic.", random_topics=random_topics
             )
 
-        code = room_manager.create_room(model_pros, model_cons)
+        # 부하가 한도를 넘으면 대기열에 넣거나 Retry-After 와 함께 거절
+        try:
+            decision = admission_controller.request(payload, create_room)
+        except RoomCapacityError:
+            return busy(random_topics, admission_controller.retry_after)
 
-        flask.session["room"] = code
-        flask.session["topic"] = topic
-        flask.session["name"] = name
+        if decision["status"] == "rejected":
+            return busy(random_topics, decision["retry_after"])
+        if decision["status"] == "waiting":
+            flask.session["ticket"] = decision["ticket"]
+            flask.session["topic"] = topic
+            return flask.redirect(flask.url_for("waiting"))
 
+        enter_room(decision["result"], topic)
         return flask.redirect(flask.url_for("room"))
 
     return flask.render_template("home.html", random_topics=random_topics)
 
 
+@app.route("/waiting")
+def waiting():
+    if not flask.session.get("ticket"):
+        return flask.redirect(flask.url_for("home"))
+
+    return flask.render_template("waiting.html", topic=flask.session.get("topic"))
+
+
+@app.route("/admission")
+def admission_status():
+    ticket = flask.session.get("ticket")
+    if not ticket:
+        return flask.jsonify({"status": "expired", "redirect": flask.url_for("home")})
+
+    try:
+        decision = admission_controller.poll(ticket, create_room)
+    except RoomCapacityError:
+        decision = {"status": "waiting", "position": 1}
+
+    if decision["status"] == "admitted":
+        enter_room(decision["result"], flask.session.get("topic"))
+        return flask.jsonify({"status": "admitted", "redirect": flask.url_for("room")})
+    if decision["status"] == "expired":
+        flask.session.pop("ticket", None)
+        return flask.jsonify({"status": "expired", "redirect": flask.url_for("home")})
+
+    return flask.jsonify(
+        {
+            "status": "waiting",
+            "position": decision["position"],
+            "retry_after": admission_controller.retry_after,
+        }
+    )
+
+
 if __name__ == "__main__":
     socketio.run(app, host="0.0.0.0", port=80, debug=True)
@@ -0,0 +1,168 @@
+import resource
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class ConnectionLimiter:
+    """동시에 유지할 socket 연결 수의 상한. limit 이 0 이면 제한하지 않는다."""
+
+    def __init__(self, limit=0):
+        self.limit = limit
+        self.active = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self.lock:
+            if self.limit and self.active >= self.limit:
+                self.rejected += 1
+                return False
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        with self.lock:
+            self.active = max(0, self.active - 1)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"active": self.active, "limit": self.limit, "rejected": self.rejected}
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class AdmissionController:
+    """
+    현재 부하(signals)가 limits 에 도달하면 새 방을 바로 만들지 않고
+    대기열(queue_size)에 넣거나, 대기열도 가득 차면 retry_after 와 함께 거절한다.
+
+    - signals(): {"rooms": ..., "threads": ..., "queued": ..., "rss_mb": ...}
+    - limits: 같은 이름의 상한 (0 이면 제한 없음)
+    - 대기열은 FIFO 이며, ticket_ttl 동안 poll 하지 않은 요청은 버린다.
+
+    방 생성(create)은 느릴 수 있으므로 lock 밖에서 하고, 그동안은 예약(creating)으로
+    rooms 에 더해 동시에 들어온 요청이 한도를 넘기지 않게 한다.
+    """
+
+    def __init__(
+        self, signals, limits=None, queue_size=0, retry_after=30.0, ticket_ttl=30.0
+    ):
+        self.signals = signals
+        self.limits = {name: limit for name, limit in (limits or {}).items() if limit}
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.ticket_ttl = ticket_ttl
+
+        self.waiting = OrderedDict()
+        self.creating = 0
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "expired": 0, "cancelled": 0}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, section, signals) -> "AdmissionController":
+        return cls(
+            signals,
+            limits={
+                "rooms": section.getint("ADMISSION.MAX_ROOMS", 0),
+                "threads": section.getint("ADMISSION.MAX_THREADS", 0),
+                "queued": section.getint("ADMISSION.MAX_QUEUED_TURNS", 0),
+                "rss_mb": section.getint("ADMISSION.MAX_RSS_MB", 0),
+            },
+            queue_size=section.getint("ADMISSION.QUEUE_SIZE", 0),
+            retry_after=section.getfloat("ADMISSION.RETRY_AFTER", 30.0),
+            ticket_ttl=section.getfloat("ADMISSION.TICKET_TTL", 30.0),
+        )
+
+    def overloaded(self) -> list[str]:
+        if not self.limits:
+            return []
+        values = self.signals()
+        if self.creating:
+            values = {**values, "rooms": values.get("rooms", 0) + self.creating}
+        return [name for name, limit in self.limits.items() if values.get(name, 0) >= limit]
+
+    def _expire(self) -> None:
+        now = time.monotonic()
+        for ticket, entry in list(self.waiting.items()):
+            if now - entry["seen"] > self.ticket_ttl:
+                del self.waiting[ticket]
+                self.stats["expired"] += 1
+
+    def _admit(self, payload, create) -> dict:
+        # lock 을 잡은 쪽에서 creating 을 올린 뒤 lock 밖에서 호출
+        try:
+            result = create(payload)
+        finally:
+            with self.lock:
+                self.creating -= 1
+        with self.lock:
+            self.stats["admitted"] += 1
+        return {"status": "admitted", "result": result}
+
+    def request(self, payload, create) -> dict:
+        with self.lock:
+            self._expire()
+            if self.waiting or self.overloaded():
+                if len(self.waiting) >= self.queue_size:
+                    self.stats["rejected"] += 1
+                    return {"status": "rejected", "retry_after": self.retry_after}
+
+                ticket = uuid.uuid4().hex
+                self.waiting[ticket] = {"payload": payload, "seen": time.monotonic()}
+                self.stats["queued"] += 1
+                return {"status": "waiting", "ticket": ticket, "position": len(self.waiting)}
+            self.creating += 1
+
+        return self._admit(payload, create)
+
+    def poll(self, ticket, create) -> dict:
+        with self.lock:
+            self._expire()
+            entry = self.waiting.get(ticket)
+            if entry is None:
+                return {"status": "expired"}
+
+            entry["seen"] = time.monotonic()
+            position = list(self.waiting).index(ticket) + 1
+            if position != 1 or self.overloaded():
+                return {"status": "waiting", "ticket": ticket, "position": position}
+            del self.waiting[ticket]
+            self.creating += 1
+
+        try:
+            return self._admit(entry["payload"], create)
+        except Exception:
+            # 생성에 실패하면 순서를 잃지 않도록 맨 앞으로 되돌림
+            with self.lock:
+                entry["seen"] = time.monotonic()
+                self.waiting[ticket] = entry
+                self.waiting.move_to_end(ticket, last=False)
+            raise
+
+    def cancel(self, ticket) -> bool:
+        # 대기를 그만둔 요청이 TTL 까지 뒤 순서를 막지 않도록 바로 뺌
+        with self.lock:
+            if self.waiting.pop(ticket, None) is None:
+                return False
+            self.stats["cancelled"] += 1
+            return True
+
+    def metrics(self) -> dict:
+        with self.lock:
+            return {
+                **self.stats,
+                "waiting": len(self.waiting),
+                "limits": dict(self.limits),
+                "overloaded": self.overloaded(),
+            }
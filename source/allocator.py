@@ -0,0 +1,121 @@
+import hashlib
+import secrets
+import string
+import threading
+from collections import deque
+
+
+class RoomCapacityError(Exception):
+    pass
+
+
+class RoomIdAllocator:
+    """
+    충돌 없는 O(1) 방 코드 할당기.
+
+    0..capacity-1 구간을 비밀 key 로 섞는 Feistel 순열로 한 번씩만 발급하므로
+    코드 하나를 알아도 다음 코드를 추측할 수 없다. 반납된 코드는 free-list 에서 재사용하고,
+    다른 프로세스가 이미 점유한 코드(conflict)는 새 코드가 바닥난 뒤에 다시 시도한다.
+
+    key 는 프로세스마다 달라야 한다. 같은 key 를 쓰는 프로세스들은 같은 순서로 발급해 계속 충돌한다.
+    """
+
+    ROUNDS = 4
+
+    def __init__(
+        self,
+        length: int = 4,
+        alphabet: str = string.ascii_uppercase,
+        key: bytes | None = None,
+    ):
+        if length < 1 or len(set(alphabet)) != len(alphabet) or len(alphabet) < 2:
+            raise ValueError("Invalid room id length or alphabet")
+
+        self.length = length
+        self.alphabet = alphabet
+        self.capacity = len(alphabet) ** length
+
+        self._key = key or secrets.token_bytes(16)
+        # 짝수 bit 로 나눠 두 half 가 같은 크기가 되도록 함
+        self._half = max(1, ((self.capacity - 1).bit_length() + 1) // 2)
+        self._next = 0
+        self._free = deque()
+        self._deferred = deque()
+        self._used = set()
+        self._lock = threading.Lock()
+
+    def _feistel(self, value: int) -> int:
+        mask = (1 << self._half) - 1
+        left, right = value >> self._half, value & mask
+        for round_ in range(self.ROUNDS):
+            digest = hashlib.blake2b(
+                b"%d:%d" % (round_, right), key=self._key, digest_size=8
+            ).digest()
+            left, right = right, left ^ (int.from_bytes(digest, "big") & mask)
+        return (left << self._half) | right
+
+    def _permute(self, index: int) -> int:
+        # 2^(2*half) 범위의 순열이므로 capacity 안에 들어올 때까지 다시 섞음 (cycle walking)
+        while True:
+            index = self._feistel(index)
+            if index < self.capacity:
+                return index
+
+    def _encode(self, index: int) -> str:
+        base = len(self.alphabet)
+        chars = []
+        for _ in range(self.length):
+            index, digit = divmod(index, base)
+            chars.append(self.alphabet[digit])
+        return "".join(reversed(chars))
+
+    def _decode(self, code: str) -> int:
+        base = len(self.alphabet)
+        index = 0
+        for char in code:
+            index = index * base + self.alphabet.index(char)
+        return index
+
+    def allocate(self) -> str:
+        with self._lock:
+            if self._free:
+                index = self._free.popleft()
+            elif self._next < self.capacity:
+                index = self._permute(self._next)
+                self._next += 1
+            elif self._deferred:
+                index = self._deferred.popleft()
+            else:
+                raise RoomCapacityError(
+                    f"All {self.capacity} room ids are in use"
+                )
+            self._used.add(index)
+            return self._encode(index)
+
+    def release(self, code: str) -> None:
+        if len(code) != self.length or any(c not in self.alphabet for c in code):
+            return
+
+        index = self._decode(code)
+        with self._lock:
+            if index in self._used:
+                self._used.remove(index)
+                self._free.append(index)
+
+    def conflict(self, code: str) -> None:
+        """다른 프로세스가 이미 점유한 코드. 새 코드를 다 쓴 뒤에 다시 시도한다."""
+        index = self._decode(code)
+        with self._lock:
+            if index in self._used:
+                self._used.remove(index)
+                self._deferred.append(index)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            occupied = len(self._used)
+            return {
+                "capacity": self.capacity,
+                "occupied": occupied,
+                "free": self.capacity - occupied,
+                "occupancy": round(occupied / self.capacity, 6),
+            }
@@ -0,0 +1,96 @@
+import threading
+from dataclasses import dataclass
+
+MIME_TYPES = {
+    "OGG_OPUS": "audio/ogg",
+    "MP3": "audio/mpeg",
+    "LINEAR16": "audio/wav",
+    "M4A": "audio/mp4",
+}
+
+
+@dataclass(frozen=True)
+class AudioProfile:
+    name: str
+    encoding: str = "OGG_OPUS"
+    # 0 이면 voice 의 기본 sample rate
+    sample_rate: int = 0
+    speaking_rate: float = 1.0
+
+    @property
+    def mime(self) -> str:
+        return MIME_TYPES.get(self.encoding, "application/octet-stream")
+
+    def key(self) -> dict:
+        return {
+            "encoding": self.encoding,
+            "sample_rate": self.sample_rate,
+            "speaking_rate": self.speaking_rate,
+        }
+
+
+DEFAULT_PROFILE = AudioProfile("default")
+PROFILES = {DEFAULT_PROFILE.name: DEFAULT_PROFILE}
+
+
+def configure(section) -> None:
+    # config.ini 의 [tts] 섹션: "<profile> = encoding, sample_rate, speaking_rate"
+    PROFILES.clear()
+    for name, value in section.items():
+        encoding, sample_rate, speaking_rate = (v.strip() for v in value.split(","))
+        PROFILES[name] = AudioProfile(
+            name, encoding.upper(), int(sample_rate), float(speaking_rate)
+        )
+    PROFILES.setdefault(DEFAULT_PROFILE.name, DEFAULT_PROFILE)
+
+
+def select_profile(mimes=None, low_bandwidth=False) -> AudioProfile:
+    """
+    클라이언트가 재생할 수 있는 형식(mimes) 중에서 고른다.
+    저대역폭이면 sample rate 가 가장 낮은 profile, 아니면 default (없으면 가장 높은 것).
+    """
+    candidates = [
+        profile
+        for profile in PROFILES.values()
+        if mimes is None or profile.mime in mimes
+    ]
+    if not candidates:
+        return PROFILES.get(DEFAULT_PROFILE.name, DEFAULT_PROFILE)
+
+    # sample_rate 0 은 기본값(최고 품질)으로 취급
+    def rate(profile):
+        return profile.sample_rate or 48000
+
+    if low_bandwidth:
+        return min(candidates, key=rate)
+    for profile in candidates:
+        if profile.name == DEFAULT_PROFILE.name:
+            return profile
+    return max(candidates, key=rate)
+
+
+class Capabilities:
+    """시청자(sid)별 재생 가능 형식. 지금 접속 중인 시청자 모두가 재생할 수 있는 profile 을 고른다."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.profile = select_profile()
+
+    def add(self, sid, mimes=None, low_bandwidth=False) -> AudioProfile:
+        with self.lock:
+            self.clients[sid] = (None if mimes is None else set(mimes), bool(low_bandwidth))
+            return self._select()
+
+    def remove(self, sid) -> AudioProfile:
+        # 마지막 저대역폭/제한된 시청자가 나가면 다시 더 좋은 profile 로
+        with self.lock:
+            self.clients.pop(sid, None)
+            return self._select()
+
+    def _select(self) -> AudioProfile:
+        known = [mimes for mimes, _ in self.clients.values() if mimes is not None]
+        mimes = set.intersection(*known) if known else None
+        low_bandwidth = any(low for _, low in self.clients.values())
+        self.profile = select_profile(mimes, low_bandwidth)
+        return self.profile
@@ -0,0 +1,120 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+
+class CassetteMiss(KeyError):
+    pass
+
+
+class Cassette:
+    """
+    provider 호출 결과를 녹화/재생하는 transport 계층.
+
+    - off: 항상 실제 호출
+    - record: 실제 호출 결과(텍스트, 오디오 bytes, 지연 시간)를 {provider}.jsonl 에 추가
+    - replay: 녹화된 결과를 반환 (speed="recorded" 면 녹화 당시 지연 시간만큼 대기)
+
+    같은 요청이 여러 번 녹화되었다면 녹화된 순서대로 돌려가며 재생한다.
+    """
+
+    MODES = ("off", "record", "replay")
+
+    def __init__(self, directory="./cassettes", mode="off", speed="instant"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+
+        self.directory = directory
+        self.mode = mode
+        self.speed = speed
+        self.entries = defaultdict(list)
+        self.cursor = defaultdict(int)
+        self.lock = threading.Lock()
+
+        if mode == "replay":
+            self.load()
+        elif mode == "record":
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, section) -> "Cassette":
+        return cls(
+            directory=section.get("CASSETTE.DIR", "./cassettes"),
+            mode=section.get("CASSETTE.MODE", "off"),
+            speed=section.get("CASSETTE.SPEED", "instant"),
+        )
+
+    def load(self) -> None:
+        if not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".jsonl"):
+                continue
+            provider = name[: -len(".jsonl")]
+            with open(os.path.join(self.directory, name), "r", encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[(provider, entry["key"])].append(entry)
+
+    @staticmethod
+    def make_key(request: dict) -> str:
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return {"__bytes__": base64.b64encode(value).decode("ascii")}
+        if isinstance(value, dict):
+            return {k: Cassette._encode(v) for k, v in value.items()}
+        return value
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, dict):
+            if set(value) == {"__bytes__"}:
+                return base64.b64decode(value["__bytes__"])
+            return {k: Cassette._decode(v) for k, v in value.items()}
+        return value
+
+    def call(self, provider: str, request: dict, fn):
+        if self.mode == "off":
+            return fn()
+
+        key = self.make_key(request)
+        if self.mode == "replay":
+            return self._replay(provider, key)
+
+        started = time.perf_counter()
+        value = fn()
+        entry = {
+            "key": key,
+            "latency": round(time.perf_counter() - started, 6),
+            "response": self._encode(value),
+        }
+        with self.lock:
+            path = os.path.join(self.directory, f"{provider}.jsonl")
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return value
+
+    def _replay(self, provider: str, key: str):
+        with self.lock:
+            entries = self.entries.get((provider, key))
+            if not entries:
+                raise CassetteMiss(f"No recording for {provider} request {key[:12]}")
+            index = self.cursor[(provider, key)]
+            self.cursor[(provider, key)] = index + 1
+            entry = entries[index % len(entries)]
+
+        if self.speed == "recorded":
+            time.sleep(entry["latency"])
+        return self._decode(entry["response"])
+
+
+OFF = Cassette(mode="off")
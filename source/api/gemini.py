@@ -1,14 +1,38 @@
 from google import genai
 from google.oauth2 import service_account
 
+from source import metrics, usage
+from source.api import cassette as _cassette
+
 
 class Gemini:
-    def __init__(self, model, credential_file=None, project=None) -> None:
+    provider = "gemini"
+
+    def __init__(
+        self,
+        model,
+        credential_file=None,
+        project=None,
+        base_url=None,
+        key=None,
+        cassette=None,
+        meter=None,
+        timeout=None,
+    ) -> None:
         self.model_name = model
+        self.timeout = timeout
+        self.meter = meter
+        self.cassette = cassette or _cassette.OFF
         self.project = project
-        self.credential_file = service_account.Credentials.from_service_account_file(
-            filename=credential_file,
-            scopes=["https://www.googleapis.com/auth/cloud-platform"],
+        self.base_url = base_url or None
+        self.key = key
+        self.credential_file = (
+            None
+            if self.base_url
+            else service_account.Credentials.from_service_account_file(
+                filename=credential_file,
+                scopes=["https://www.googleapis.com/auth/cloud-platform"],
+            )
         )
         self.client = None
         self.conversations = []
@@ -17,14 +41,29 @@ class Gemini:
         self.connect_session()
 
     def connect_session(self) -> None:
-        self.client = genai.Client(
-            vertexai=True,
-            credentials=self.credential_file,
-            project=self.project,
-            location="global",
-        )
+        timeout = int(self.timeout * 1000) if self.timeout else None
+        if self.base_url:
+            # 로컬 stub 등 Gemini API 호환 서버
+            self.client = genai.Client(
+                api_key=self.key or "local",
+                http_options=genai.types.HttpOptions(
+                    base_url=self.base_url, timeout=timeout
+                ),
+            )
+        else:
+            self.client = genai.Client(
+                vertexai=True,
+                credentials=self.credential_file,
+                project=self.project,
+                location="global",
+                http_options=genai.types.HttpOptions(timeout=timeout),
+            )
         self.create_chat()
 
+    def close(self) -> None:
+        if self.client:
+            self.client.close()
+
     def create_chat(self):
         self.chat = self.client.chats.create(
             model=self.model_name,
@@ -74,12 +113,34 @@ class Gemini:
         if not text:
             return ""
 
+        request = {
+            "model": self.model_name,
+            "system": self.system_prompt,
+            "history": [
+                (content.role, [part.text for part in content.parts])
+                for content in self.conversations
+            ],
+            "text": text,
+        }
         self.append_history("user", text)
-        response = self.chat.send_message(text)
-        output = response.text
+        try:
+            with metrics.LLM_LATENCY.labels("gemini", self.model_name).time():
+                output, counts = usage.unpack(
+                    self.cassette.call("gemini", request, lambda: self._send(text))
+                )
+        except Exception:
+            # 재시도 시 같은 발언이 중복되지 않도록 되돌림
+            self.conversations.pop()
+            self.create_chat()
+            raise
+        usage.record("gemini", self.model_name, counts, self.meter)
 
         return output
 
+    def _send(self, text: str) -> dict:
+        response = self.chat.send_message(text)
+        return {"text": response.text, "usage": usage.from_gemini(response.usage_metadata)}
+
     def convert_content(self, content: dict) -> genai.types.Content:
         chat = genai.types.Content(
             role=content.get("role"),
@@ -102,3 +163,24 @@ class Gemini:
 
         self.conversations.append(content)
         self.create_chat()
+
+    def import_history(self, items: list[tuple[str, str]]) -> None:
+        self.conversations.extend(
+            self.convert_content(
+                {
+                    "role": "model" if role == "assistant" else role,
+                    "parts": [{"text": text}],
+                }
+            )
+            for role, text in items
+        )
+        self.create_chat()
+
+    def export_history(self) -> list[tuple[str, str]]:
+        return [
+            (
+                "assistant" if content.role == "model" else content.role,
+                "".join(part.text or "" for part in content.parts),
+            )
+            for content in self.conversations
+        ]
@@ -1,10 +1,21 @@
 from openai import OpenAI
 
+from source import metrics, usage
+from source.api import cassette as _cassette
+
 
 class ChatGPT:
-    def __init__(self, model, key=None) -> None:
+    provider = "openai"
+
+    def __init__(
+        self, model, key=None, base_url=None, cassette=None, meter=None, timeout=None
+    ) -> None:
         self.model_name = model
+        self.timeout = timeout
+        self.meter = meter
         self.key = key
+        self.base_url = base_url or None
+        self.cassette = cassette or _cassette.OFF
         self.client = None
         self.system_prompt = ""
         self.conversations = []
@@ -12,7 +23,14 @@ class ChatGPT:
         self.connect_session()
 
     def connect_session(self) -> None:
-        self.client = OpenAI(api_key=self.key)
+        # 재시도는 resilience.Policy 에서 처리
+        self.client = OpenAI(
+            api_key=self.key, base_url=self.base_url, timeout=self.timeout, max_retries=0
+        )
+
+    def close(self) -> None:
+        if self.client:
+            self.client.close()
 
     def set_system_prompt(self, system_prompt: str) -> None:
         self.system_prompt = system_prompt
@@ -23,14 +41,41 @@ class ChatGPT:
             return ""
 
         self.append_history(role="user", text=text)
-        response = self.client.responses.create(
-            model=self.model_name, reasoning={"effort": "low"}, input=self.conversations
-        )
-        output = response.output_text
+        try:
+            with metrics.LLM_LATENCY.labels("openai", self.model_name).time():
+                output, counts = usage.unpack(
+                    self.cassette.call(
+                        "openai",
+                        {"model": self.model_name, "input": self.conversations},
+                        self._create,
+                    )
+                )
+        except Exception:
+            # 재시도 시 같은 발언이 중복되지 않도록 되돌림
+            self.conversations.pop()
+            raise
+        usage.record("openai", self.model_name, counts, self.meter)
         self.append_history("assistant", output)
 
         return output
 
+    def _create(self) -> dict:
+        response = self.client.responses.create(
+            model=self.model_name, reasoning={"effort": "low"}, input=self.conversations
+        )
+        return {"text": response.output_text, "usage": usage.from_openai(response.usage)}
+
     def append_history(self, role: str, text: str) -> None:
         history = {"role": role, "content": text}
         self.conversations.append(history)
+
+    def import_history(self, items: list[tuple[str, str]]) -> None:
+        for role, text in items:
+            self.append_history(role, text)
+
+    def export_history(self) -> list[tuple[str, str]]:
+        return [
+            (item["role"], item["content"])
+            for item in self.conversations
+            if item["role"] != "system"
+        ]
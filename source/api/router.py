@@ -1,5 +1,57 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import numpy as np
 from openai import OpenAI
 
+from source import metrics, profiler, usage
+from source.api import cassette as _cassette
+
+HEDGES = metrics.Counter("router_hedges_total", "Hedged router requests.", ["model"])
+FALLBACKS = metrics.Counter(
+    "router_fallbacks_total", "Router requests retried on another base.", ["model"]
+)
+
+
+class Endpoint:
+    """base(url + body) 와 model 의 조합, 그리고 최근 지연 시간/성공률 기반 health score."""
+
+    def __init__(self, name, base, model, key, window=100):
+        self.name = name
+        self.base = base
+        self.model = model
+        self.client = OpenAI(base_url=base.get("url"), api_key=key or "EMPTY")
+
+        self.latencies = deque(maxlen=window)
+        self.health = 1.0
+        self.lock = threading.Lock()
+
+    def record(self, latency=None, ok=True) -> None:
+        with self.lock:
+            self.health = 0.9 * self.health + 0.1 * (1.0 if ok else 0.0)
+            if ok and latency is not None:
+                self.latencies.append(latency)
+
+    def deadline(self, percentile, minimum) -> float:
+        with self.lock:
+            samples = list(self.latencies)
+        if len(samples) < 10:
+            return minimum
+        return max(minimum, float(np.percentile(samples, percentile)))
+
+    def stats(self) -> dict:
+        with self.lock:
+            samples = list(self.latencies)
+            health = self.health
+        return {
+            "model": self.model,
+            "health": round(health, 4),
+            "p50": round(float(np.percentile(samples, 50)), 4) if samples else None,
+            "p99": round(float(np.percentile(samples, 99)), 4) if samples else None,
+        }
+
 
 class LLMRouter:
     def __init__(
@@ -7,8 +59,14 @@ class LLMRouter:
         model: str = "openai/gpt-oss-120b:free",
         base: str = "openrouter",
         key: str = "",
+        base_url: str = "",
+        cassette: _cassette.Cassette | None = None,
+        fallbacks: list[tuple[str, str]] | None = None,
+        hedge_percentile: float | None = None,
+        hedge_min_delay: float = 1.0,
     ) -> None:
         self.model = model
+        self.cassette = cassette or _cassette.OFF
         self.client = None
         self.bases = {
             "openrouter": {
@@ -29,28 +87,128 @@ class LLMRouter:
                 "body": {"chat_template_kwargs": {"enable_thinking": False}},
             },
         }
-        self.base = self.bases.get(base)
+        self.base = dict(self.bases.get(base))
+        if base_url:
+            self.base["url"] = base_url
+
+        # 순서대로 primary, fallback/hedge 대상
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.endpoints = [Endpoint(base, self.base, model, key)]
+        for name, fallback_model in fallbacks or []:
+            fallback_base = dict(self.bases.get(name))
+            if name == base and base_url:
+                fallback_base["url"] = base_url
+            self.endpoints.append(
+                Endpoint(name, fallback_base, fallback_model or model, key)
+            )
+        self._pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="router")
 
         self.connect_session(key)
 
     def connect_session(self, key: str) -> None:
-        self.client = OpenAI(
-            base_url=self.base.get("url"),
-            api_key=key,
-        )
+        self.client = self.endpoints[0].client
+
+    def _candidates(self) -> list[Endpoint]:
+        # health score 가 낮은 base 는 뒤로 미룸 (설정 순서는 유지)
+        healthy = [e for e in self.endpoints if e.health >= 0.5]
+        return healthy + [e for e in self.endpoints if e.health < 0.5]
+
+    def _invoke(
+        self,
+        endpoint: Endpoint,
+        message: list,
+        meter: usage.UsageMeter | None,
+    ) -> str:
+        def _create() -> dict:
+            completion = endpoint.client.chat.completions.create(
+                model=endpoint.model,
+                messages=message,
+                # extra_headers={
+                #     "HTTP-Referer": "<YOUR_SITE_URL>",  # Optional. Site URL for rankings on openrouter.ai.
+                #     "X-OpenRouter-Title": "<YOUR_SITE_NAME>",  # Optional. Site title for rankings on openrouter.ai.
+                # },
+                extra_body=endpoint.base.get("body"),
+            )
+            return {
+                "text": completion.choices[0].message.content,
+                "usage": usage.from_openai(completion.usage),
+            }
+
+        started = time.perf_counter()
+        try:
+            with metrics.LLM_LATENCY.labels("router", endpoint.model).time():
+                output, counts = usage.unpack(
+                    self.cassette.call(
+                        "router", {"model": endpoint.model, "messages": message}, _create
+                    )
+                )
+        except Exception:
+            endpoint.record(ok=False)
+            raise
+
+        endpoint.record(time.perf_counter() - started)
+        # hedge 로 버려진 요청도 과금되므로 모두 기록
+        usage.record("router", endpoint.model, counts, meter)
+
+        return output
 
-    def get_response(self, text: str = "", messages: list = []) -> str:
+    def get_response(
+        self,
+        text: str = "",
+        messages: list = [],
+        meter: usage.UsageMeter | None = None,
+    ) -> str:
         message = messages if messages else [{"role": "user", "content": text}]
-        body = self.base.get("body")
-
-        completion = self.client.chat.completions.create(
-            model=self.model,
-            messages=message,
-            # extra_headers={
-            #     "HTTP-Referer": "<YOUR_SITE_URL>",  # Optional. Site URL for rankings on openrouter.ai.
-            #     "X-OpenRouter-Title": "<YOUR_SITE_NAME>",  # Optional. Site title for rankings on openrouter.ai.
-            # },
-            extra_body=body,
-        )
-
-        return completion.choices[0].message.content
+
+        if len(self.endpoints) == 1:
+            return self._invoke(self.endpoints[0], message, meter)
+
+        remaining = iter(self._candidates())
+        pending = {}
+        errors = []
+
+        def _launch() -> Endpoint | None:
+            endpoint = next(remaining, None)
+            if endpoint is not None:
+                future = self._pool.submit(
+                    profiler.bind(self._invoke), endpoint, message, meter
+                )
+                pending[future] = endpoint
+            return endpoint
+
+        primary = _launch()
+        hedged = not self.hedge_percentile
+        while pending:
+            timeout = None
+            if not hedged:
+                timeout = primary.deadline(self.hedge_percentile, self.hedge_min_delay)
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # 지연이 deadline 을 넘으면 다음 base 로 중복 요청
+                hedged = True
+                if _launch() is not None:
+                    HEDGES.labels(primary.model).inc()
+                continue
+
+            for future in done:
+                pending.pop(future)
+                try:
+                    output = future.result()
+                except Exception as exc:
+                    errors.append(exc)
+                    continue
+
+                # 진 쪽 요청은 취소 (이미 실행 중이면 결과만 버림)
+                for loser in pending:
+                    loser.cancel()
+                return output
+
+            if not pending and _launch() is not None:
+                FALLBACKS.labels(primary.model).inc()
+
+        raise errors[-1]
+
+    def stats(self) -> dict:
+        return {f"{e.name}/{e.model}": e.stats() for e in self.endpoints}
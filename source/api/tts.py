@@ -1,45 +1,109 @@
 import base64
 
+from google.auth.credentials import AnonymousCredentials
 from google.cloud import texttospeech
 from google.oauth2 import service_account
 
+from source import metrics, usage
+from source.api import cassette as _cassette
+from source.api.audio import (  # noqa: F401  기존 tts.* 이름 유지
+    DEFAULT_PROFILE,
+    MIME_TYPES,
+    PROFILES,
+    AudioProfile,
+    Capabilities,
+    configure,
+    select_profile,
+)
+
+
+VOICES = {
+    1: "ko-KR-Standard-A",
+    2: "ko-KR-Standard-B",
+    3: "ko-KR-Standard-C",
+    4: "ko-KR-Standard-D",
+    5: "ko-KR-Chirp3-HD-Aoede",
+    6: "ko-KR-Chirp3-HD-Orus",
+}
+
 
 class TTS:
-    def __init__(self, voice=1, credential_file=None) -> None:
-        voices = {
-            1: "ko-KR-Standard-A",
-            2: "ko-KR-Standard-B",
-            3: "ko-KR-Standard-C",
-            4: "ko-KR-Standard-D",
-            5: "ko-KR-Chirp3-HD-Aoede",
-            6: "ko-KR-Chirp3-HD-Orus",
-        }
+    provider = "tts"
+
+    def __init__(
+        self,
+        voice=1,
+        credential_file=None,
+        endpoint=None,
+        cassette=None,
+        meter=None,
+        timeout=None,
+        profile=None,
+    ) -> None:
+        self.timeout = timeout
+        self.cassette = cassette or _cassette.OFF
+        self.meter = meter
+        self.profile = profile or PROFILES.get(DEFAULT_PROFILE.name, DEFAULT_PROFILE)
         self.config = {
             "language": "ko-KR",
-            "voice": voices[voice] if voice in voices.keys() else None,
+            # 번호(예전 설정) 또는 voice 이름
+            "voice": VOICES.get(voice) if isinstance(voice, int) else voice,
         }
 
-        self._client = texttospeech.TextToSpeechClient(
-            credentials=service_account.Credentials.from_service_account_file(
-                filename=credential_file
+        if endpoint:
+            # 로컬 stub 등 REST 호환 서버
+            self._client = texttospeech.TextToSpeechClient(
+                credentials=AnonymousCredentials(),
+                transport="rest",
+                client_options={"api_endpoint": endpoint},
+            )
+        else:
+            self._client = texttospeech.TextToSpeechClient(
+                credentials=service_account.Credentials.from_service_account_file(
+                    filename=credential_file
+                )
             )
-        )
         self.voice = texttospeech.VoiceSelectionParams(
             language_code=self.config["language"],
             name=self.config["voice"],
             # ssml_gender=
         )
-        self.audio_config = texttospeech.AudioConfig(
-            audio_encoding=texttospeech.AudioEncoding.OGG_OPUS
-        )
+        self.audio_configs = {}
+
+    def close(self) -> None:
+        self._client.transport.close()
+
+    def audio_config(self, profile: AudioProfile) -> texttospeech.AudioConfig:
+        if profile.name not in self.audio_configs:
+            options = {
+                "audio_encoding": texttospeech.AudioEncoding[profile.encoding],
+                "speaking_rate": profile.speaking_rate,
+            }
+            if profile.sample_rate:
+                options["sample_rate_hertz"] = profile.sample_rate
+            self.audio_configs[profile.name] = texttospeech.AudioConfig(**options)
+        return self.audio_configs[profile.name]
 
-    def request(self, text: str) -> bytes:
+    def request(self, text: str, profile: AudioProfile | None = None) -> bytes:
+        profile = profile or self.profile
         synthesis_input = texttospeech.SynthesisInput(text=text)
-        response = self._client.synthesize_speech(
-            input=synthesis_input, voice=self.voice, audio_config=self.audio_config
-        )
+        audio_config = self.audio_config(profile)
+
+        with metrics.TTS_LATENCY.labels(self.config["voice"]).time():
+            audio = self.cassette.call(
+                "tts",
+                {"voice": self.config["voice"], "text": text, "profile": profile.key()},
+                lambda: self._client.synthesize_speech(
+                    input=synthesis_input,
+                    voice=self.voice,
+                    audio_config=audio_config,
+                    timeout=self.timeout,
+                ).audio_content,
+            )
+        metrics.TTS_AUDIO_BYTES.labels(self.config["voice"]).observe(len(audio))
+        usage.record("tts", self.config["voice"], {"tts_chars": len(text)}, self.meter)
 
-        return response.audio_content
+        return audio
 
     def decode(self, audio: bytes, format: str = "utf-8") -> str:
         return base64.b64encode(audio).decode(format)
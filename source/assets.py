@@ -0,0 +1,240 @@
+"""
+정적 파일 build: socket.io client vendoring, content hash fingerprint, gzip/brotli 사전 압축.
+
+    python -m source.assets
+
+static/ 아래 파일을 {dist}/<name>.<hash>.<ext> 로 복사하고 manifest.json 을 남긴다.
+서버는 manifest 로 URL 을 만들고, /assets/ 아래 파일은 immutable 로 캐시하게 하며
+브라우저가 받을 수 있으면 미리 압축해 둔 .br / .gz 를 그대로 보낸다.
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import sys
+import urllib.request
+
+import flask
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+SOCKETIO_URL = "https://cdn.socket.io/{version}/socket.io.esm.min.js"
+SOCKETIO_PATH = "vendor/socket.io.esm.min.js"
+
+# 이미 압축된 이미지 등은 그대로 둠
+COMPRESSIBLE = {".js", ".css", ".json", ".svg", ".html", ".txt", ".ico", ".map"}
+# js module 의 상대 import ("./x.js", "../x.js") 와 new URL("../x.png", import.meta.url) 참조
+IMPORT_PATTERN = re.compile(
+    r"""((?:\bfrom|\bimport|\bnew\s+URL)\s*\(?\s*)(['"])(\.{1,2}/[^'"]+)\2"""
+)
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def vendor(static_dir: str, version: str, force=False) -> str:
+    path = os.path.join(static_dir, SOCKETIO_PATH)
+    if os.path.exists(path) and not force:
+        return path
+
+    url = SOCKETIO_URL.format(version=version)
+    logger.info("Downloading %s", url)
+    with urllib.request.urlopen(url, timeout=30) as response:
+        data = response.read()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(data)
+    return path
+
+
+def fingerprint(name: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:12]
+    stem, ext = posixpath.splitext(name)
+    return f"{stem}.{digest}{ext}"
+
+
+def compress(path: str, data: bytes, min_size=256) -> list[str]:
+    if posixpath.splitext(path)[1] not in COMPRESSIBLE or len(data) < min_size:
+        return []
+
+    encodings = []
+    if brotli is not None:
+        with open(path + ".br", "wb") as fh:
+            fh.write(brotli.compress(data, quality=11))
+        encodings.append("br")
+    # mtime 을 고정해야 같은 입력에서 같은 .gz 가 나옴
+    with open(path + ".gz", "wb") as fh:
+        fh.write(gzip.compress(data, compresslevel=9, mtime=0))
+    encodings.append("gzip")
+    return encodings
+
+
+def build(static_dir: str, dist: str) -> dict:
+    """static_dir 의 파일을 dist 에 fingerprint 해서 복사하고 manifest 를 돌려준다."""
+    static_dir = os.path.abspath(static_dir)
+    dist = os.path.abspath(dist)
+
+    sources = {}
+    for root, dirs, names in os.walk(static_dir):
+        if os.path.abspath(root) == dist or os.path.abspath(root).startswith(dist + os.sep):
+            dirs[:] = []
+            continue
+        for name in names:
+            full = os.path.join(root, name)
+            if os.path.abspath(full).startswith(dist + os.sep):
+                continue
+            sources[os.path.relpath(full, static_dir).replace(os.sep, "/")] = full
+
+    files = {}
+
+    def resolve(name, visiting=()):
+        # import 대상의 hash 가 먼저 정해져야 import 하는 쪽 내용(과 hash)이 확정됨
+        if name in files:
+            return files[name]
+        with open(sources[name], "rb") as fh:
+            data = fh.read()
+
+        if name.endswith(".js"):
+            text = data.decode("utf-8")
+
+            def rewrite(match):
+                target = posixpath.normpath(
+                    posixpath.join(posixpath.dirname(name), match.group(3))
+                )
+                if target not in sources or target in visiting:
+                    return match.group(0)
+                hashed = resolve(target, visiting + (name,))[0]
+                relative = posixpath.relpath(hashed, posixpath.dirname(name) or ".")
+                if not relative.startswith("."):
+                    relative = "./" + relative
+                return f"{match.group(1)}{match.group(2)}{relative}{match.group(2)}"
+
+            data = IMPORT_PATTERN.sub(rewrite, text).encode("utf-8")
+
+        files[name] = (fingerprint(name, data), data)
+        return files[name]
+
+    for name in sorted(sources):
+        resolve(name)
+
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+
+    manifest = {"files": {}, "encodings": {}}
+    for name, (hashed, data) in sorted(files.items()):
+        path = os.path.join(dist, hashed)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        manifest["files"][name] = hashed
+        encodings = compress(path, data)
+        if encodings:
+            manifest["encodings"][hashed] = encodings
+
+    with open(os.path.join(dist, "manifest.json"), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    return manifest
+
+
+class Assets:
+    """build 결과(manifest)로 asset URL 을 만들고 /assets/ 를 서빙한다. build 전에는 static 을 그대로 씀."""
+
+    def __init__(self, static_dir="./static", dist="./static/dist"):
+        self.static_dir = static_dir
+        self.dist = dist
+        self.files = {}
+        self.encodings = {}
+        self.served = set()
+        self.load()
+
+    @classmethod
+    def from_config(cls, section, static_dir="./static") -> "Assets":
+        return cls(static_dir, section.get("ASSETS.DIST", os.path.join(static_dir, "dist")))
+
+    def load(self) -> None:
+        try:
+            with open(os.path.join(self.dist, "manifest.json"), "r", encoding="utf-8") as fh:
+                manifest = json.load(fh)
+        except (OSError, ValueError):
+            return
+        self.files = manifest.get("files", {})
+        self.encodings = manifest.get("encodings", {})
+        self.served = set(self.files.values())
+
+    def url(self, name: str, fallback: str | None = None) -> str:
+        if name in self.files:
+            return flask.url_for("assets", filename=self.files[name])
+        if fallback and not os.path.exists(os.path.join(self.static_dir, name)):
+            return fallback
+        return flask.url_for("static", filename=name)
+
+    def send(self, filename):
+        if filename not in self.served:
+            flask.abort(404)
+
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        accept = flask.request.accept_encodings
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in self.encodings.get(filename, ()) and accept[encoding]:
+                response = flask.send_from_directory(
+                    os.path.abspath(self.dist), filename + suffix, mimetype=mimetype
+                )
+                response.headers["Content-Encoding"] = encoding
+                break
+        else:
+            response = flask.send_from_directory(
+                os.path.abspath(self.dist), filename, mimetype=mimetype
+            )
+
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+    def init_app(self, app) -> None:
+        app.add_url_rule("/assets/<path:filename>", "assets", self.send)
+        app.jinja_env.globals["asset_url"] = self.url
+
+
+def main(argv=None) -> int:
+    from source.config import CONFIG as _CONFIG
+
+    section = _CONFIG["flask"]
+    parser = argparse.ArgumentParser(description="Vendor, fingerprint and precompress assets.")
+    parser.add_argument("--static", default="./static")
+    parser.add_argument("--dist", default=section.get("ASSETS.DIST", "./static/dist"))
+    parser.add_argument(
+        "--socketio-version", default=section.get("ASSETS.SOCKETIO_VERSION", "4.8.1")
+    )
+    parser.add_argument("--refresh", action="store_true", help="re-download vendored files")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(levelname)s-%(asctime)s]\t%(name)s: %(message)s",
+    )
+
+    try:
+        vendor(args.static, args.socketio_version, force=args.refresh)
+    except OSError as exc:
+        # 받지 못하면 room.html 은 CDN 주소로 import 함
+        logger.warning("Failed to vendor socket.io client: %s", exc)
+    manifest = build(args.static, args.dist)
+    if brotli is None:
+        logger.warning("brotli is not installed; only .gz variants were written")
+    logger.info("Built %d assets into %s", len(manifest["files"]), args.dist)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
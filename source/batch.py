@@ -0,0 +1,273 @@
+"""
+저장된 토론 기록을 오프라인으로 일괄 평가하는 CLI.
+
+    python -m source.batch ./data/transcripts.sqlite3 -o results.parquet
+    python -m source.batch ./archive/ -o results.csv --resume
+
+입력은 디렉터리(*.json, *.jsonl), JSONL 파일, 또는 TranscriptStore(SQLite) 파일이며
+각 토론 기록은 {"id": ..., "topic": ..., "messages": [...]} 형식이다.
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from typing import Iterator
+
+import pandas as pd
+
+from source import usage
+from source.eval import EvalResult, PersonaDebateEvaluator, shared_metrics
+
+logger = logging.getLogger(__name__)
+
+_BERT = None
+
+
+def _init_metrics() -> None:
+    # 프로세스마다 BERTScore 모델을 한 번만 로드
+    from bert_score.scorer import BERTScorer
+
+    global _BERT
+    _BERT = BERTScorer(lang="kr")
+
+
+def _metrics_worker(gpt_turns: list[str], gemini_turns: list[str]) -> EvalResult:
+    return shared_metrics(_BERT, gpt_turns, gemini_turns)
+
+
+def _read_jsonl(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            item.setdefault("id", f"{os.path.basename(path)}:{line_no}")
+            yield item
+
+
+def _read_json(path: str) -> Iterator[dict]:
+    with open(path, "r", encoding="utf-8") as fh:
+        item = json.load(fh)
+    if isinstance(item, list):
+        item = {"messages": item}
+    item.setdefault("id", os.path.splitext(os.path.basename(path))[0])
+    yield item
+
+
+def _read_store(path: str) -> Iterator[dict]:
+    from source.store import TranscriptStore
+
+    store = TranscriptStore(path)
+    try:
+        for room in store.find_rooms():
+            meta = store.get_room(room["uid"]) or {}
+            yield {
+                "id": room["uid"],
+                "topic": meta.get("topic"),
+                "messages": store.get_messages(room["uid"]),
+            }
+    finally:
+        store.close()
+
+
+def iter_transcripts(path: str) -> Iterator[dict]:
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            full = os.path.join(path, name)
+            if name.endswith(".jsonl"):
+                yield from _read_jsonl(full)
+            elif name.endswith(".json"):
+                yield from _read_json(full)
+    elif path.endswith((".sqlite3", ".sqlite", ".db")):
+        yield from _read_store(path)
+    else:
+        yield from _read_jsonl(path)
+
+
+def flatten(item_id: str, topic: str, result: EvalResult) -> dict:
+    row = {"id": item_id, "topic": topic}
+    row.update(pd.json_normalize(result["aggregate"], sep=".").iloc[0].to_dict())
+    if "usage" in result:
+        row.update({f"usage.{k}": v for k, v in result["usage"]["total"].items()})
+    row["agents"] = json.dumps(result["agents"], ensure_ascii=False)
+    return row
+
+
+class BatchEvaluator:
+    def __init__(
+        self,
+        evaluator: PersonaDebateEvaluator,
+        metric_workers: int = 2,
+        judge_workers: int = 16,
+        max_pending: int = 8,
+    ) -> None:
+        self._evaluator = evaluator
+        self._metric_workers = metric_workers
+        self._judge_workers = judge_workers
+        self._max_pending = max_pending
+
+    def _evaluate_one(
+        self,
+        item: dict,
+        metrics_pool: ProcessPoolExecutor,
+        judge_pool: ThreadPoolExecutor,
+    ) -> dict:
+        topic = item.get("topic") or ""
+        result = self._evaluator.evaluate_in_pool(
+            judge_pool,
+            item["messages"],
+            topic,
+            shared_fn=lambda gpt, gemini: metrics_pool.submit(_metrics_worker, gpt, gemini),
+        )
+        return flatten(item["id"], topic, result)
+
+    def run(
+        self, source: str, checkpoint: str, resume: bool = False, overwrite: bool = False
+    ) -> int:
+        done = set()
+        if resume and os.path.exists(checkpoint):
+            with open(checkpoint, "r", encoding="utf-8") as fh:
+                done = {json.loads(line)["id"] for line in fh if line.strip()}
+            logger.info("Resuming: %d transcripts already evaluated", len(done))
+        elif os.path.exists(checkpoint):
+            # 이전 결과를 말없이 지우지 않음
+            if not overwrite:
+                raise FileExistsError(
+                    f"{checkpoint} already exists; pass --resume to continue or --overwrite"
+                )
+            os.remove(checkpoint)
+
+        count = 0
+        with (
+            # store writer 등 스레드가 이미 떠 있으므로 fork 대신 spawn
+            ProcessPoolExecutor(
+                max_workers=self._metric_workers,
+                initializer=_init_metrics,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as metrics_pool,
+            ThreadPoolExecutor(max_workers=self._judge_workers) as judge_pool,
+            ThreadPoolExecutor(max_workers=self._max_pending) as debate_pool,
+            open(checkpoint, "a", encoding="utf-8") as out,
+        ):
+            pending = {}
+
+            def _collect(futures):
+                nonlocal count
+                for future in futures:
+                    item_id = pending.pop(future)
+                    try:
+                        row = future.result()
+                    except Exception as exc:
+                        logger.error("Failed to evaluate %s: %s", item_id, exc)
+                        continue
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    out.flush()
+                    count += 1
+                    logger.info("Evaluated %s (%d)", item_id, count)
+
+            for item in iter_transcripts(source):
+                if item["id"] in done or not item.get("messages"):
+                    continue
+                if len(pending) >= self._max_pending:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    _collect(finished)
+
+                future = debate_pool.submit(
+                    self._evaluate_one, item, metrics_pool, judge_pool
+                )
+                pending[future] = item["id"]
+
+            _collect(as_completed(list(pending)))
+
+        return count
+
+
+def check_output(output: str) -> None:
+    # 모든 토론을 평가한 뒤에야 실패하지 않도록 시작 전에 확인
+    if output.endswith(".parquet") and not any(
+        importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")
+    ):
+        raise ValueError(
+            "writing Parquet needs pyarrow; install it with `uv sync --extra batch` "
+            "or use a .csv output"
+        )
+
+
+def write_output(checkpoint: str, output: str) -> None:
+    df = pd.read_json(checkpoint, lines=True, dtype={"id": str})
+    if output.endswith(".parquet"):
+        df.to_parquet(output, index=False)
+    else:
+        df.to_csv(output, index=False)
+
+
+def main(argv=None) -> int:
+    from source.config import CONFIG as _CONFIG
+
+    parser = argparse.ArgumentParser(description="Evaluate archived debates offline.")
+    parser.add_argument("source", help="directory, JSONL file or transcript store")
+    parser.add_argument("-o", "--output", default="results.csv", help="CSV or Parquet")
+    parser.add_argument("--checkpoint", help="defaults to <output>.checkpoint.jsonl")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--resume", action="store_true", help="skip checkpointed transcripts")
+    group.add_argument("--overwrite", action="store_true", help="discard an existing checkpoint")
+    parser.add_argument("--metric-workers", type=int, default=2)
+    parser.add_argument("--judge-workers", type=int, default=16)
+    parser.add_argument("--max-pending", type=int, default=8)
+    parser.add_argument(
+        "--agents", type=int, default=int(_CONFIG["default"]["EVAL.SIZE"])
+    )
+    args = parser.parse_args(argv)
+    try:
+        check_output(args.output)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(levelname)s-%(asctime)s]\t%(name)s: %(message)s",
+    )
+
+    if _CONFIG.has_section("pricing"):
+        usage.configure(_CONFIG["pricing"])
+
+    checkpoint = args.checkpoint or f"{args.output}.checkpoint.jsonl"
+    evaluator = PersonaDebateEvaluator(
+        persona_json_path=_CONFIG["default"]["EVAL.PERSONA"],
+        num_agents=args.agents,
+    )
+    batch = BatchEvaluator(
+        evaluator,
+        metric_workers=args.metric_workers,
+        judge_workers=args.judge_workers,
+        max_pending=args.max_pending,
+    )
+    try:
+        count = batch.run(
+            args.source, checkpoint, resume=args.resume, overwrite=args.overwrite
+        )
+    except FileExistsError as exc:
+        parser.error(str(exc))
+    logger.info("Evaluated %d new transcripts", count)
+
+    if os.path.exists(checkpoint) and os.path.getsize(checkpoint):
+        write_output(checkpoint, args.output)
+        logger.info("Wrote %s", args.output)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,89 @@
-from dataclasses import asdict, dataclass, field
+import json
+from dataclasses import dataclass, field, replace
 
 from source import utils
 
 
-@dataclass
+class Frame(str):
+    """이미 JSON 으로 인코딩된 값. FrameJSON 이 다시 인코딩하지 않고 그대로 끼워 넣는다."""
+
+    __slots__ = ()
+
+
+def encode(value) -> Frame:
+    return Frame(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+
+class FrameJSON:
+    """
+    socket.io packet 용 json 모듈. Frame 은 그대로 두고 나머지만 인코딩하므로
+    같은 메시지를 여러 이벤트/시청자에게 보내도 직렬화는 한 번만 일어난다.
+    """
+
+    @staticmethod
+    def dumps(obj, **kwargs) -> str:
+        if isinstance(obj, Frame):
+            return str.__str__(obj)
+        if isinstance(obj, (list, tuple)):
+            return "[" + ",".join(FrameJSON.dumps(item, **kwargs) for item in obj) + "]"
+        if isinstance(obj, dict):
+            return (
+                "{"
+                + ",".join(
+                    json.dumps(str(key)) + ":" + FrameJSON.dumps(value, **kwargs)
+                    for key, value in obj.items()
+                )
+                + "}"
+            )
+        return json.dumps(obj, **kwargs)
+
+    loads = staticmethod(json.loads)
+
+
+@dataclass(frozen=True, slots=True)
 class MessageContent:
     name: str
     role: str
     message: str
     audio_base64: str = ""
+    audio_type: str = "audio/ogg"
     timestamp: str = field(default_factory=utils.get_utc_timestamp)
     is_typing: bool = False
-    is_playing: bool = False
+    seq: int = 0
+    # 처음 요청될 때 한 번만 인코딩해 두는 캐시
+    _frame: Frame | None = field(default=None, init=False, repr=False, compare=False)
+    _meta: Frame | None = field(default=None, init=False, repr=False, compare=False)
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {
+            "name": self.name,
+            "role": self.role,
+            "message": self.message,
+            "audio_base64": self.audio_base64,
+            "audio_type": self.audio_type,
+            "timestamp": self.timestamp,
+            "is_typing": self.is_typing,
+            "seq": self.seq,
+        }
+
+    def with_seq(self, seq: int) -> "MessageContent":
+        return replace(self, seq=seq)
+
+    @property
+    def frame(self) -> Frame:
+        if self._frame is None:
+            object.__setattr__(self, "_frame", encode(self.to_dict()))
+        return self._frame
+
+    @property
+    def meta(self) -> Frame:
+        # 오디오 없이 메타데이터만 (재접속 sync 용)
+        if self._meta is None:
+            data = self.to_dict()
+            data["has_audio"] = bool(data.pop("audio_base64"))
+            object.__setattr__(self, "_meta", encode(data))
+        return self._meta
+
+    @property
+    def size(self) -> int:
+        return len(self.message.encode("utf-8")) + len(self.audio_base64)
@@ -2,7 +2,8 @@ import json
 import logging
 import random
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from typing import Any, Callable, Optional, TypeVar
 
@@ -12,7 +13,9 @@ from bert_score.scorer import BERTScorer
 from googleapiclient import discovery
 from sklearn.feature_extraction.text import CountVectorizer
 
+from source.api.cassette import Cassette
 from source.api.router import LLMRouter
+from source import metrics, profiler, usage
 from source.config import CONFIG as _CONFIG
 
 logger = logging.getLogger(__name__)
@@ -32,6 +35,56 @@ def loo_metric(
     return float(np.mean(scores))
 
 
+def coherence_score(bert: BERTScorer, turns: list[str]) -> float:
+    def _score_fn(target: str, others: list[str]) -> float:
+        _, _, f1 = bert.score([target] * len(others), others, verbose=False)
+        return float(f1.mean())
+
+    return loo_metric(turns, _score_fn)
+
+
+def diversity_index(turns: list[str], n: int = 2) -> float:
+    analyzer = CountVectorizer(analyzer="word", ngram_range=(n, n)).build_analyzer()
+
+    def _score_fn(target: str, others: list[str]) -> float:
+        current = set(analyzer(target))
+        if not current:
+            return 0.0
+        other_union = set().union(*(set(analyzer(o)) for o in others))
+        return len(current - other_union) / len(current)
+
+    return loo_metric(turns, _score_fn)
+
+
+def shared_metrics(
+    bert: BERTScorer,
+    gpt_turns: list[str],
+    gemini_turns: list[str],
+) -> EvalResult:
+    with metrics.EVAL_PHASE.labels("bertscore").time():
+        coherence = {
+            "gpt": round(coherence_score(bert, gpt_turns), 4),
+            "gemini": round(coherence_score(bert, gemini_turns), 4),
+        }
+    with metrics.EVAL_PHASE.labels("distinct_n").time():
+        diversity = {
+            "gpt": round(diversity_index(gpt_turns), 4),
+            "gemini": round(diversity_index(gemini_turns), 4),
+        }
+
+    return {"coherence": coherence, "diversity": diversity}
+
+
+def _parse_fallbacks(value: str) -> list[tuple[str, str]]:
+    # "vllm=<model>, openrouter=<model>" -> [("vllm", "<model>"), ...]
+    fallbacks = []
+    for item in value.split(","):
+        if item.strip():
+            base, _, model = item.strip().partition("=")
+            fallbacks.append((base.strip(), model.strip()))
+    return fallbacks
+
+
 def field_stats(values: list[float]) -> dict[str, float]:
     if not values:
         return {"mean": 0.0, "std": 0.0}
@@ -61,6 +114,7 @@ class AgentResult:
     judge_result: str
     coherence: dict[str, float]
     diversity: dict[str, float]
+    usage: Optional[dict] = None
 
     def to_dict(self) -> EvalResult:
         return {
@@ -72,6 +126,7 @@ class AgentResult:
                 "coherence": self.coherence,
                 "diversity": self.diversity,
             },
+            "usage": self.usage,
         }
 
 
@@ -105,6 +160,7 @@ class _C:
         "- Do not invent unsupported traits.\n"
         "- Explain how the persona influenced your judgment.\n"
     )
+    JUDGE_INSTRUCTION = "Explicitly describe how your background influenced your judgment."
 
     JUDGE_SCORE_RE = re.compile(
         f"{GPT_NAME}"
@@ -129,27 +185,45 @@ class DebateEvaluator:
 
     def __init__(self) -> None:
         self._system_prompt = None
+        # persona: persona 를 system prompt 에 넣는 기존 배치 (기본값, 이전 점수와 비교 가능)
+        # cache: 규칙 + 토론 기록을 공통 prefix 로 두고 persona 는 마지막 메시지로 보냄
+        self._prompt_layout = _CONFIG["default"].get("EVAL.PROMPT_LAYOUT", "persona")
+        self._cache_prime = _CONFIG["default"].getfloat("EVAL.CACHE_PRIME", 0.0)
 
         self._llm = LLMRouter(
             model=_CONFIG["openrouter"]["OR.MODEL_NAME"],
-            key=_CONFIG["openrouter"]["OR.API_KEY"]
+            key=_CONFIG["openrouter"]["OR.API_KEY"],
+            base_url=_CONFIG["openrouter"].get("OR.BASE_URL", ""),
+            cassette=Cassette.from_config(_CONFIG["default"]),
+            fallbacks=_parse_fallbacks(_CONFIG["openrouter"].get("OR.FALLBACKS", "")),
+            hedge_percentile=_CONFIG["openrouter"].getfloat("OR.HEDGE_PERCENTILE", None),
+            hedge_min_delay=_CONFIG["openrouter"].getfloat("OR.HEDGE_MIN_DELAY", 1.0),
         )
         # self._llm = LLMRouter(
         #     model="mlx-community/K-EXAONE-236B-A23B-8bit",
         #     base="vllm"
         # )
-        self._bert = BERTScorer(lang="kr")
+        # BERTScore 모델은 무거우므로 처음 사용할 때 로드
+        self._bert_scorer: Optional[BERTScorer] = None
         self._perspective = discovery.build(
             serviceName="commentanalyzer",
             version="v1alpha1",
             discoveryServiceUrl=(
-                "https://commentanalyzer.googleapis.com"
-                "/$discovery/rest?version=v1alpha1"
+                _CONFIG["google"].get(
+                    "PERSPECTIVE.BASE_URL", "https://commentanalyzer.googleapis.com"
+                )
+                + "/$discovery/rest?version=v1alpha1"
             ),
             developerKey=_CONFIG["google"]["GCP.API_KEY"],
             static_discovery=False,
         )
 
+    @property
+    def _bert(self) -> BERTScorer:
+        if self._bert_scorer is None:
+            self._bert_scorer = BERTScorer(lang="kr")
+        return self._bert_scorer
+
     def _prepare_dataframe(self, messages: list[Message]) -> pd.DataFrame:
         df = pd.DataFrame(messages)
         df = df[df["role"].isin(["pros", "cons"])].copy()
@@ -160,7 +234,18 @@ class DebateEvaluator:
 
         return df
 
-    def _build_system_prompt(self, persona: Optional[str]):
+    def _build_system_prompt(self, persona: Optional[str]) -> str:
+        if self._prompt_layout == "cache":
+            # 모든 persona 호출에서 byte 단위로 같아야 provider 의 prompt cache 가 적중함
+            self._system_prompt = (
+                "You are a debate judge whose evaluations are influenced by the persona "
+                "given after the debate script.\n\n"
+                f"{_C.PERSONA_RULES}\n\n{_C.JUDGE_RULES}"
+                if persona
+                else f"You are a debate judge.\n\n{_C.JUDGE_RULES}"
+            )
+            return self._system_prompt
+
         prompt = (
             "You are a debate judge whose evaluations are influenced by a persona.\n\n"
             f"{_C.PERSONA_RULES}\n"
@@ -170,6 +255,7 @@ class DebateEvaluator:
         )
 
         self._system_prompt = f"{prompt}\n\n{_C.JUDGE_RULES}"
+        return self._system_prompt
 
     def _build_judge_prompt(
         self,
@@ -185,48 +271,52 @@ class DebateEvaluator:
             for i in range(0, len(df), 2)
         )
 
+        if self._prompt_layout == "cache":
+            return f'Topic: "{topic}"\n\nDebate script: "{script}"'
+
         return (
             f'Topic: "{topic}"\n\n'
             f'Debate script: "{script}"\n\n'
 
-            "Explicitly describe how your background influenced your judgment."
+            f"{_C.JUDGE_INSTRUCTION}"
         )
 
-    def _call_judge(self, prompt: Optional[str]) -> str:
+    def _build_persona_prompt(self, persona: Optional[str]) -> str:
+        prefix = f'Persona: \n"{persona}"\n\n' if persona else ""
+        return f"{prefix}{_C.JUDGE_INSTRUCTION}"
+
+    def _call_judge(
+        self,
+        prompt: Optional[str],
+        system_prompt: Optional[str] = None,
+        meter: Optional[usage.UsageMeter] = None,
+        persona: Optional[str] = None,
+    ) -> str:
         if not prompt:
             return "Not enough valid debate turns to evaluate."
 
-        return self._llm.get_response(
-            messages=[
-                {
-                    "role": "system",
-                    "content": self._system_prompt,
-                },
-                {
-                    "role": "user",
-                    "content": prompt
-                },
-            ],
-        )
+        messages = [
+            {
+                "role": "system",
+                "content": system_prompt or self._system_prompt,
+            },
+            {
+                "role": "user",
+                "content": prompt
+            },
+        ]
+        if self._prompt_layout == "cache":
+            messages.append(
+                {"role": "user", "content": self._build_persona_prompt(persona)}
+            )
 
-    def _coherence_score(self, turns: list[str]) -> float:
-        def _score_fn(target: str, others: list[str]) -> float:
-            _, _, f1 = self._bert.score([target] * len(others), others, verbose=False)
-            return float(f1.mean())
+        return self._llm.get_response(messages=messages, meter=meter)
 
-        return loo_metric(turns, _score_fn)
+    def _coherence_score(self, turns: list[str]) -> float:
+        return coherence_score(self._bert, turns)
 
     def _diversity_index(self, turns: list[str], n: int = 2) -> float:
-        analyzer = CountVectorizer(analyzer="word", ngram_range=(n, n)).build_analyzer()
-
-        def _score_fn(target: str, others: list[str]) -> float:
-            current = set(analyzer(target))
-            if not current:
-                return 0.0
-            other_union = set().union(*(set(analyzer(o)) for o in others))
-            return len(current - other_union) / len(current)
-
-        return loo_metric(turns, _score_fn)
+        return diversity_index(turns, n)
 
     def _toxicity_score(self, text: str) -> Optional[float]:
         try:
@@ -271,7 +361,7 @@ class DebateEvaluator:
         self._build_system_prompt(persona)
         prompt = self._build_judge_prompt(df, topic)
         result: EvalResult = {
-            "judge_result": self._call_judge(prompt),
+            "judge_result": self._call_judge(prompt, persona=persona),
             "coherence": {
                 "gpt": round(self._coherence_score(gpt_turns), 4),
                 "gemini": round(self._coherence_score(gemini_turns), 4),
@@ -296,6 +386,9 @@ class PersonaDebateEvaluator:
         self._num_agents = num_agents
         self._evaluator = DebateEvaluator()
 
+    def router_stats(self) -> dict:
+        return self._evaluator._llm.stats()
+
     def _load_personas(self) -> list[dict]:
         with open(self._persona_path, "r", encoding="utf-8") as fh:
             all_personas: list[dict] = json.load(fh)
@@ -313,16 +406,37 @@ class PersonaDebateEvaluator:
         idx: int,
         persona: str,
         *,
-        df: pd.DataFrame,
-        topic: str,
-    ) -> tuple[int, str]:
+        prompt: str,
+        meter: Optional[usage.UsageMeter] = None,
+        primed: Optional[threading.Event] = None,
+    ) -> tuple[int, tuple[str, dict]]:
+        ev = self._evaluator
+        if primed is not None and idx > 1:
+            # 첫 호출이 공통 prefix 를 cache 에 올릴 때까지 잠시 기다림
+            primed.wait(ev._cache_prime)
+
         logger.info("[%d/%d] 평가 중: %.60s …", idx, self._num_agents, persona)
-        self._evaluator._build_system_prompt(persona)
-        prompt = self._evaluator._build_judge_prompt(df, topic)
-        result = self._evaluator._call_judge(prompt)
-        logger.info("[%d/%d] 완료", idx, self._num_agents)
+        system_prompt = ev._build_system_prompt(persona)
+        call_meter = usage.UsageMeter()
+        try:
+            with metrics.EVAL_PHASE.labels("judge").time():
+                result = ev._call_judge(prompt, system_prompt, call_meter, persona=persona)
+        finally:
+            if primed is not None and idx == 1:
+                primed.set()
+            if meter is not None:
+                meter.merge(call_meter)
+
+        call_usage = call_meter.summary()["total"]
+        logger.info(
+            "[%d/%d] 완료 (cached input %d/%d)",
+            idx,
+            self._num_agents,
+            call_usage["cached_input"],
+            call_usage["input"],
+        )
 
-        return idx, result
+        return idx, (result, call_usage)
 
     def _compute_aggregate(self, results: list[EvalResult]) -> EvalResult:
         gpt_scores, gemini_scores = [], []
@@ -354,53 +468,106 @@ class PersonaDebateEvaluator:
             "total_agents": len(results),
         }
 
-    def evaluate_with_personas(
-        self,
-        messages: list[Message],
-        topic: str = _C.DEFAULT_TOPIC,
-    ) -> EvalResult:
-        personas = self._load_personas()
-        ev = self._evaluator
-        df = ev._prepare_dataframe(messages)
-
+    def _split_turns(self, df: pd.DataFrame) -> tuple[list[str], list[str]]:
         gpt_turns = df[df["role"] == "pros"]["message"].tolist()
         gemini_turns = df[df["role"] == "cons"]["message"].tolist()
 
-        logger.info("[공통 지표 계산 중] Coherence / Diversity …")
-        shared: EvalResult = {
-            "coherence": {
-                "gpt": round(ev._coherence_score(gpt_turns), 4),
-                "gemini": round(ev._coherence_score(gemini_turns), 4),
-            },
-            "diversity": {
-                "gpt": round(ev._diversity_index(gpt_turns), 4),
-                "gemini": round(ev._diversity_index(gemini_turns), 4),
-            },
-        }
+        return gpt_turns, gemini_turns
 
-        logger.info("[병렬 실행] 번역 + LLM Judge 평가 시작 …")
-        judge_results: dict[int, str] = {}
-        with ThreadPoolExecutor(max_workers=self._num_agents + 1) as pool:
-            judge_futures = {
-                pool.submit(
-                    self._judge_worker, idx, persona["en-US"], df=df, topic=topic
-                ): idx
-                for idx, persona in enumerate(personas, start=1)
-            }
-            for future in as_completed(judge_futures):
-                idx, result = future.result()
-                judge_results[idx] = result
+    def _submit_judges(
+        self,
+        pool: Executor,
+        personas: list[dict],
+        df: pd.DataFrame,
+        topic: str,
+        meter: Optional[usage.UsageMeter] = None,
+    ) -> dict[Future, int]:
+        ev = self._evaluator
+        # 토론 기록 prompt 는 모든 persona 가 공유
+        prompt = ev._build_judge_prompt(df, topic)
+        primed = (
+            threading.Event()
+            if ev._prompt_layout == "cache" and ev._cache_prime > 0
+            else None
+        )
+        return {
+            pool.submit(
+                profiler.bind(self._judge_worker),
+                idx,
+                persona["en-US"],
+                prompt=prompt,
+                meter=meter,
+                primed=primed,
+            ): idx
+            for idx, persona in enumerate(personas, start=1)
+        }
 
+    def _assemble(
+        self,
+        personas: list[dict],
+        judge_results: dict[int, tuple[str, dict]],
+        shared: EvalResult,
+        meter: Optional[usage.UsageMeter] = None,
+    ) -> EvalResult:
         agents = [
             AgentResult(
                 agent_index=idx,
                 persona=personas[idx - 1]["en-US"],
                 persona_ko=personas[idx - 1]["ko-KR"],
-                judge_result=judge_results[idx],
+                judge_result=judge_results[idx][0],
+                usage=judge_results[idx][1],
                 **shared,
             ).to_dict()
             for idx in sorted(judge_results)
         ]
         aggregate = self._compute_aggregate([a["result"] for a in agents])
 
-        return {"agents": agents, "aggregate": aggregate}
+        result: EvalResult = {"agents": agents, "aggregate": aggregate}
+        if meter is not None:
+            result["usage"] = meter.summary()
+
+        return result
+
+    def evaluate_in_pool(
+        self,
+        pool: Executor,
+        messages: list[Message],
+        topic: str = _C.DEFAULT_TOPIC,
+        shared_fn: Optional[Callable[[list[str], list[str]], Future]] = None,
+    ) -> EvalResult:
+        """
+        judge 호출을 호출한 쪽이 가진 pool 에서 실행한다 (batch CLI 처럼 여러 토론이 pool 을 공유할 때).
+        shared_fn 을 주면 공통 지표를 그 Future 로 받아 judge 와 동시에 계산한다.
+        """
+        personas = self._load_personas()
+        ev = self._evaluator
+        df = ev._prepare_dataframe(messages)
+        gpt_turns, gemini_turns = self._split_turns(df)
+
+        if shared_fn is not None:
+            shared_future = shared_fn(gpt_turns, gemini_turns)
+        else:
+            logger.info("[공통 지표 계산 중] Coherence / Diversity …")
+            shared_future = Future()
+            shared_future.set_result(shared_metrics(ev._bert, gpt_turns, gemini_turns))
+
+        logger.info("[병렬 실행] 번역 + LLM Judge 평가 시작 …")
+        meter = usage.UsageMeter()
+        judge_results: dict[int, tuple[str, dict]] = {}
+        with metrics.EVAL_PHASE.labels("judge_fanout").time():
+            judge_futures = self._submit_judges(pool, personas, df, topic, meter)
+            for future in as_completed(judge_futures):
+                idx, result = future.result()
+                judge_results[idx] = result
+
+        return self._assemble(personas, judge_results, shared_future.result(), meter)
+
+    def evaluate_with_personas(
+        self,
+        messages: list[Message],
+        topic: str = _C.DEFAULT_TOPIC,
+    ) -> EvalResult:
+        with ThreadPoolExecutor(
+            max_workers=self._num_agents + 1, thread_name_prefix="judge"
+        ) as pool:
+            return self.evaluate_in_pool(pool, messages, topic)
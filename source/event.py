@@ -1,12 +1,154 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from source import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    구독자별 큐와 전달 스레드.
+
+    큐가 가득 찼을 때의 정책:
+      - block: 자리가 날 때까지 발행자를 대기시킴
+      - drop-oldest: 가장 오래된 이벤트를 버림
+      - coalesce: 같은 key 의 대기 중 이벤트를 최신 값으로 교체
+
+    coalesce 는 key 를 지정한 구독(상태 갱신처럼 최신 값만 의미 있는 이벤트)에만 적용된다.
+    key 가 없으면 토론 발언 같은 이벤트를 잃지 않도록 block 으로 동작한다.
+    """
+
+    POLICIES = ("block", "drop-oldest", "coalesce")
+
+    def __init__(self, event_name, callback, maxsize=256, policy="block", key=None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+
+        self.event_name = event_name
+        self.callback = callback
+        self.maxsize = maxsize
+        self.policy = "block" if policy == "coalesce" and key is None else policy
+        self.key = key
+
+        self.queue = deque()
+        self.cond = threading.Condition()
+        self.running = True
+        self.stats = {
+            "delivered": 0,
+            "dropped": 0,
+            "errors": 0,
+            "latency_sum": 0.0,
+            "latency_max": 0.0,
+        }
+
+        self.thread = threading.Thread(target=self.drain, daemon=True, name="event-bus")
+        self.thread.start()
+
+    def put(self, data):
+        item = (time.perf_counter(), data)
+        with self.cond:
+            if self.policy == "coalesce":
+                key = self.key(data)
+                for i, (_, pending) in enumerate(self.queue):
+                    if self.key(pending) == key:
+                        self.queue[i] = item
+                        self.stats["dropped"] += 1
+                        return
+
+            while self.running and len(self.queue) >= self.maxsize:
+                if self.policy == "block":
+                    self.cond.wait()
+                else:
+                    self.queue.popleft()
+                    self.stats["dropped"] += 1
+
+            self.queue.append(item)
+            self.cond.notify_all()
+
+    def drain(self):
+        while True:
+            with self.cond:
+                while self.running and not self.queue:
+                    self.cond.wait()
+                if not self.queue:
+                    return
+                queued_at, data = self.queue.popleft()
+                self.cond.notify_all()
+
+            try:
+                with metrics.EVENT_EMIT.labels(self.event_name).time():
+                    self.callback(data)
+            except Exception as exc:
+                with self.cond:
+                    self.stats["errors"] += 1
+                logger.exception("Subscriber of %s failed: %s", self.event_name, exc)
+                continue
+
+            latency = time.perf_counter() - queued_at
+            with self.cond:
+                self.stats["delivered"] += 1
+                self.stats["latency_sum"] += latency
+                self.stats["latency_max"] = max(self.stats["latency_max"], latency)
+
+    def depth(self):
+        with self.cond:
+            return len(self.queue)
+
+    def snapshot(self):
+        with self.cond:
+            return dict(self.stats)
+
+    def close(self, timeout=1.0):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join(timeout)
+
+
 class EventBus:
-    def __init__(self):
+    def __init__(self, maxsize=256, policy="block"):
         self.subscribers = {}
+        self.maxsize = maxsize
+        self.policy = policy
 
-    def subscribe(self, event_name, callback):
+    def subscribe(self, event_name, callback, maxsize=None, policy=None, key=None):
         if event_name not in self.subscribers:
             self.subscribers[event_name] = []
-        self.subscribers[event_name].append(callback)
+        self.subscribers[event_name].append(
+            Subscription(
+                event_name,
+                callback,
+                maxsize=maxsize or self.maxsize,
+                policy=policy or self.policy,
+                key=key,
+            )
+        )
 
     def publish(self, event_name, data):
-        for callback in self.subscribers.get(event_name, []):
-            callback(data)
+        for subscription in self.subscribers.get(event_name, []):
+            subscription.put(data)
+
+    def stats(self):
+        result = {}
+        for event_name, subscriptions in self.subscribers.items():
+            stats = [s.snapshot() for s in subscriptions]
+            delivered = sum(s["delivered"] for s in stats)
+            latency_sum = sum(s["latency_sum"] for s in stats)
+            result[event_name] = {
+                "subscribers": len(subscriptions),
+                "queue_depth": sum(s.depth() for s in subscriptions),
+                "delivered": delivered,
+                "dropped": sum(s["dropped"] for s in stats),
+                "errors": sum(s["errors"] for s in stats),
+                "latency_avg": latency_sum / delivered if delivered else 0.0,
+                "latency_max": max(s["latency_max"] for s in stats),
+            }
+        return result
+
+    def close(self):
+        for subscriptions in self.subscribers.values():
+            for subscription in subscriptions:
+                subscription.close()
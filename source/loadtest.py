@@ -0,0 +1,215 @@
+"""
+실제 Flask-SocketIO 흐름(home POST -> connect -> start -> complete)으로 N 개의 방을
+동시에 구동하여 한 프로세스가 감당할 수 있는 방 수를 측정한다.
+
+    python -m source.stub --port 9000 &
+    python -m source.loadtest --rooms 50 --ramp 0.2 --playback 0.5
+
+config.ini 의 provider 주소는 source.stub 을 가리켜야 한다.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+
+import numpy as np
+
+from source.admission import rss_bytes
+
+
+class Sampler:
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.threads = []
+        self.rss = []
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.threads.append(threading.active_count())
+            self.rss.append(rss_bytes())
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+
+class SimulatedRoom:
+    def __init__(self, app, socketio, topic, turns, playback, timeout):
+        self.app = app
+        self.socketio = socketio
+        self.topic = topic
+        self.turns = turns
+        self.playback = playback
+        self.timeout = timeout
+
+        self.code = None
+        self.turn_latency = []
+        self.first_audio = None
+        self.admission_wait = None
+        self.rejected = False
+        self.error = None
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as exc:
+            self.error = repr(exc)
+
+    def _admit(self, client, deadline, interval=0.5) -> bool:
+        # 브라우저처럼 home POST -> (/waiting -> /admission polling) -> /room
+        started = time.perf_counter()
+        response = client.post(
+            "/", data={"topic": self.topic, "model_pros": "gpt", "model_cons": "gemini"}
+        )
+        if response.status_code == 503:
+            # admission 이 거절한 방은 오류가 아니라 따로 집계
+            self.rejected = True
+            return False
+        if response.status_code != 302:
+            raise RuntimeError(f"home() returned {response.status_code}")
+
+        if response.headers["Location"].endswith("/waiting"):
+            while time.perf_counter() < deadline:
+                decision = client.get("/admission").get_json()
+                if decision["status"] == "admitted":
+                    break
+                if decision["status"] == "expired":
+                    raise RuntimeError("admission ticket expired")
+                time.sleep(interval)
+            else:
+                raise TimeoutError("still waiting for admission")
+
+        self.admission_wait = time.perf_counter() - started
+        return True
+
+    def _run(self):
+        client = self.app.test_client()
+        if not self._admit(client, time.perf_counter() + self.timeout):
+            return
+
+        with client.session_transaction() as session:
+            self.code = session.get("room")
+
+        sio = self.socketio.test_client(self.app, flask_test_client=client)
+        started = last = time.perf_counter()
+        sio.emit("start", {"topic": self.topic})
+
+        deadline = started + self.timeout
+        while len(self.turn_latency) < self.turns and time.perf_counter() < deadline:
+            for packet in sio.get_received():
+                if packet["name"] not in ("pros-message", "cons-message"):
+                    continue
+
+                data = packet["args"][0]
+                now = time.perf_counter()
+                self.turn_latency.append(now - last)
+                if self.first_audio is None and data.get("audio_base64"):
+                    self.first_audio = now - started
+
+                # 브라우저의 오디오 재생 시간 흉내
+                time.sleep(self.playback)
+                sio.emit(
+                    "complete",
+                    {"room": self.code, "role": data.get("role"), "seq": data.get("seq")},
+                )
+                last = time.perf_counter()
+            time.sleep(0.01)
+
+        sio.disconnect()
+        if len(self.turn_latency) < self.turns:
+            raise TimeoutError(f"only {len(self.turn_latency)}/{self.turns} turns")
+
+
+def percentile(values, q):
+    return round(float(np.percentile(values, q)), 4) if values else None
+
+
+def report(rooms, sampler, slo, elapsed) -> dict:
+    latencies = [lat for room in rooms for lat in room.turn_latency]
+    first_audio = [room.first_audio for room in rooms if room.first_audio is not None]
+    sustained = [
+        room
+        for room in rooms
+        if room.error is None
+        and not room.rejected
+        and percentile(room.turn_latency, 99) <= slo
+    ]
+    waits = [room.admission_wait for room in rooms if room.admission_wait is not None]
+
+    return {
+        "rooms": len(rooms),
+        "rooms_sustained": len(sustained),
+        "rooms_rejected": sum(room.rejected for room in rooms),
+        "errors": [room.error for room in rooms if room.error][:10],
+        "turn_latency": {
+            "p50": percentile(latencies, 50),
+            "p99": percentile(latencies, 99),
+        },
+        "admission_wait": {
+            "p50": percentile(waits, 50),
+            "p99": percentile(waits, 99),
+        },
+        "time_to_first_audio": {
+            "p50": percentile(first_audio, 50),
+            "p99": percentile(first_audio, 99),
+        },
+        "threads_peak": max(sampler.threads, default=threading.active_count()),
+        "rss_peak_mb": round(max(sampler.rss, default=rss_bytes()) / 2**20, 1),
+        "elapsed": round(elapsed, 2),
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="End-to-end room load test.")
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--ramp", type=float, default=0.1, help="seconds between rooms")
+    parser.add_argument("--turns", type=int, help="defaults to HISTORY.SIZE")
+    parser.add_argument("--playback", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--slo", type=float, default=5.0, help="p99 turn latency (s)")
+    args = parser.parse_args(argv)
+
+    # config.ini 를 읽고 서버 전역 객체를 만드는 import 는 인자 파싱 이후에 수행
+    from app import TOPIC_POOL, app, socketio
+    from source.config import CONFIG as _CONFIG
+
+    turns = args.turns or int(_CONFIG["default"]["HISTORY.SIZE"])
+    rooms = [
+        SimulatedRoom(
+            app,
+            socketio,
+            random.choice(TOPIC_POOL),
+            turns=turns,
+            playback=args.playback,
+            timeout=args.timeout,
+        )
+        for _ in range(args.rooms)
+    ]
+
+    sampler = Sampler()
+    sampler.start()
+    started = time.perf_counter()
+
+    threads = []
+    for room in rooms:
+        thread = threading.Thread(target=room.run, daemon=True)
+        thread.start()
+        threads.append(thread)
+        time.sleep(args.ramp)
+    for thread in threads:
+        thread.join()
+
+    sampler.stop()
+    result = report(rooms, sampler, args.slo, time.perf_counter() - started)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,66 @@
 import string
-import random
+import threading
+import uuid
 
-from source import room, event
+from source import admission, allocator, room, event, state, store
+from source.config import CONFIG as _CONFIG
 
 
 class RoomManager:
-    def __init__(self):
+    def __init__(self, backend=None):
         self.rooms = {}
-        self.event_bus = event.EventBus()
+        self.event_bus = event.EventBus(
+            maxsize=int(_CONFIG["default"].get("EVENT.QUEUE_SIZE", 256)),
+            policy=_CONFIG["default"].get("EVENT.POLICY", "block"),
+        )
+        self.state = backend or state.create_backend(
+            _CONFIG["default"].get("STATE.BACKEND", "memory://")
+        )
+        self.node = state.node_id()
+        store_path = _CONFIG["default"].get("STORE.PATH", "./data/transcripts.sqlite3")
+        self.store = (
+            store.TranscriptStore(
+                store_path,
+                batch_size=int(_CONFIG["default"].get("STORE.BATCH_SIZE", 64)),
+                flush_interval=float(_CONFIG["default"].get("STORE.FLUSH_INTERVAL", 1.0)),
+                keep_audio=_CONFIG["default"].getboolean("STORE.AUDIO", False),
+            )
+            if store_path
+            else None
+        )
+        self.allocator = allocator.RoomIdAllocator(
+            length=int(_CONFIG["default"].get("ROOM.ID_LENGTH", 4)),
+            alphabet=_CONFIG["default"].get("ROOM.ID_ALPHABET", string.ascii_uppercase),
+        )
+
+    def create_room(self, model_pros, model_cons, topic=None) -> str:
+        meta = {
+            "node": self.node,
+            "uid": uuid.uuid4().hex,
+            "topic": topic,
+            "model_pros": model_pros,
+            "model_cons": model_cons,
+        }
+        for _ in range(self.allocator.capacity):
+            room_id = self.generate_room_id()
+            if self.state.claim_room(room_id, meta):
+                break
+            # 다른 프로세스가 점유한 코드는 나중에 다시 쓸 수 있도록 돌려 놓음
+            self.allocator.conflict(room_id)
+        else:
+            raise allocator.RoomCapacityError("All room ids are claimed by other processes")
+
+        if self.store:
+            self.store.open_room(meta["uid"], room_id, meta)
 
-    def create_room(self, model_pros, model_cons) -> str:
-        room_id = self.generate_room_id(2)
         self.rooms[room_id] = room.Room(
             room_id=room_id,
             event_bus=self.event_bus,
             model_pros=model_pros,
-            model_cons=model_cons
+            model_cons=model_cons,
+            state=self.state,
+            store=self.store,
+            uid=meta["uid"],
         )
         self.rooms[room_id].start_threads()
         return room_id
@@ -24,19 +69,99 @@ class RoomManager:
         return self.rooms.get(room_id)
 
     def remove_room(self, room_id) -> None:
-        room = self.get_room(room_id)
+        room = self.rooms.pop(room_id, None)
         if room:
-            room.stop_threads()
-            self.rooms.pop(room_id, None)
+            room.close()
+            self.state.delete_room(room_id)
+            self.allocator.release(room_id)
 
     def list_rooms(self) -> list:
         return list(self.rooms.keys())
 
-    def generate_room_id(self, length=2) -> str:
-        while True:
-            code = ""
-            for _ in range(length):
-                code += random.choice(string.ascii_uppercase)
-            if code not in self.rooms:
-                break
-        return code
+    def get_owner(self, room_id) -> str | None:
+        meta = self.state.load_room(room_id)
+        return meta.get("node") if meta else None
+
+    def remote_owner(self, room_id) -> str | None:
+        # 진행 중인 방을 다른 프로세스가 가지고 있으면 그 node id
+        if room_id in self.rooms:
+            return None
+        owner = self.get_owner(room_id)
+        return owner if owner not in (None, self.node) else None
+
+    def _locate(self, room_id, uid=None):
+        # 살아있는 방 -> 공유 상태 -> 영구 저장소 순으로 조회
+        room = self.get_room(room_id)
+        if room and uid in (None, room.uid):
+            return "room", room
+        meta = self.state.load_room(room_id) if room_id else None
+        if meta and uid in (None, meta.get("uid")):
+            return "state", meta
+        if self.store and uid:
+            return "store", uid
+        return None, None
+
+    def exists(self, room_id, uid=None) -> bool:
+        source, target = self._locate(room_id, uid)
+        if source == "store":
+            return self.store.get_room(target) is not None
+        return source is not None
+
+    def get_messages(self, room_id, uid=None) -> list:
+        source, target = self._locate(room_id, uid)
+        if source == "room":
+            return target.get_messages()
+        if source == "state":
+            return self.state.get_messages(room_id)
+        if source == "store":
+            return self.store.get_messages(target)
+        return []
+
+    def get_results(self, room_id, uid=None) -> dict:
+        source, target = self._locate(room_id, uid)
+        if source == "room":
+            return target.results
+        if source == "state":
+            return self.state.get_results(room_id)
+        if source == "store":
+            return self.store.get_results(target)
+        return {}
+
+    def get_usage(self, room_id) -> dict:
+        room = self.get_room(room_id)
+        return room.usage.summary() if room else {}
+
+    def set_results(self, room_id, results, uid=None) -> None:
+        source, target = self._locate(room_id, uid)
+        if source == "room":
+            target.results = results
+            return
+        if source == "state":
+            self.state.set_results(room_id, results)
+            uid = target.get("uid")
+        if self.store and uid:
+            self.store.set_results(uid, results)
+
+    def generate_room_id(self) -> str:
+        return self.allocator.allocate()
+
+    def metrics(self) -> dict:
+        return {"rooms": len(self.rooms), **self.allocator.metrics()}
+
+    def message_bytes(self) -> int:
+        return sum(usage["message_bytes"] for usage in self.resources().values())
+
+    def load(self) -> dict:
+        # 새 방 admission 판단에 쓰는 현재 부하
+        resources = self.resources()
+        return {
+            "rooms": len(resources),
+            "threads": threading.active_count(),
+            "queued": sum(usage["queued"] for usage in resources.values()),
+            "rss_mb": admission.rss_bytes() / 2**20,
+        }
+
+    def resources(self) -> dict:
+        return {
+            room_id: room.resources() for room_id, room in list(self.rooms.items())
+        }
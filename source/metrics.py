@@ -0,0 +1,85 @@
+"""
+prometheus_client 위에 얇게 얹은 metric 정의.
+
+전역 registry 대신 이 모듈의 REGISTRY 에만 등록하고, configure(False) 이면 observe / set / inc 가
+즉시 반환되는 no-op 이 된다.
+"""
+
+import prometheus_client
+from prometheus_client import CollectorRegistry
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+BYTES_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6)
+CONTENT_TYPE = prometheus_client.CONTENT_TYPE_LATEST
+
+_ENABLED = True
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+
+def configure(enabled: bool = True) -> None:
+    # 비활성화하면 observe/set 이 즉시 반환되는 no-op 이 됨
+    global _ENABLED
+    _ENABLED = enabled
+
+
+def enabled() -> bool:
+    return _ENABLED
+
+
+def render(registry: CollectorRegistry = REGISTRY) -> bytes:
+    return prometheus_client.generate_latest(registry)
+
+
+class _Registered:
+    # registry 를 주지 않으면 전역 REGISTRY 가 아니라 이 모듈의 REGISTRY 에 등록
+    def __init__(self, *args, registry=None, **kwargs):
+        super().__init__(*args, registry=REGISTRY if registry is None else registry, **kwargs)
+
+
+class Histogram(_Registered, prometheus_client.Histogram):
+    def __init__(self, *args, buckets=LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, buckets=buckets, **kwargs)
+
+    def observe(self, amount: float, exemplar=None) -> None:
+        # time() 도 여기를 거침
+        if _ENABLED:
+            super().observe(amount, exemplar)
+
+
+class Gauge(_Registered, prometheus_client.Gauge):
+    def set(self, value: float) -> None:
+        if _ENABLED:
+            super().set(value)
+
+    def inc(self, amount: float = 1) -> None:
+        if _ENABLED:
+            super().inc(amount)
+
+
+class Counter(_Registered, prometheus_client.Counter):
+    def inc(self, amount: float = 1, exemplar=None) -> None:
+        if _ENABLED:
+            super().inc(amount, exemplar)
+
+
+LLM_LATENCY = Histogram(
+    "llm_request_seconds", "LLM request latency.", ["provider", "model"]
+)
+TTS_LATENCY = Histogram("tts_request_seconds", "TTS request latency.", ["voice"])
+TTS_AUDIO_BYTES = Histogram(
+    "tts_audio_bytes", "Synthesized audio size.", ["voice"], buckets=BYTES_BUCKETS
+)
+QUEUE_WAIT = Histogram(
+    "worker_queue_wait_seconds", "Time a turn waits in ModelWorker.input_queue.", ["role"]
+)
+PLAYBACK_WAIT = Histogram(
+    "client_playback_wait_seconds", "Time a worker waits for client playback.", ["role"]
+)
+EVENT_EMIT = Histogram("event_emit_seconds", "EventBus subscriber duration.", ["event"])
+EVAL_PHASE = Histogram("evaluation_phase_seconds", "Evaluation phase latency.", ["phase"])
+
+ACTIVE_ROOMS = Gauge("active_rooms", "Rooms with live worker threads.")
+THREADS = Gauge("process_threads", "Threads in this process.")
+MESSAGE_BYTES = Gauge("room_message_bytes", "Bytes held in room message buffers.")
+CONNECTIONS = Gauge("socketio_connections", "Connected socket.io clients.")
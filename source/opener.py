@@ -0,0 +1,234 @@
+"""
+주제 풀(resources/topic.json)의 첫 발언(pros)과 음성을 미리 생성해 두는 캐시.
+
+    python -m source.opener --count 3
+
+첫 발언은 (모델, system prompt, 입력 문장, 음성, audio profile) 의 해시로 저장되므로
+prompt 나 모델 설정이 바뀌면 자동으로 다시 생성된다.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def opening_message(topic: str) -> str:
+    return f"토론 주제는 '{topic}' 입니다."
+
+
+def make_key(model, tts, text: str, profile) -> str:
+    payload = json.dumps(
+        {
+            "model": model.model_name,
+            "system": model.system_prompt,
+            "voice": tts.config["voice"],
+            "profile": profile.key(),
+            "text": text,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class OpenerCache:
+    """key 별로 {directory}/{key}.jsonl 에 첫 발언을 쌓아 두고 무작위로 하나를 돌려준다."""
+
+    def __init__(self, directory="./data/openers", enabled=True):
+        self.directory = directory
+        self.enabled = enabled
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, section) -> "OpenerCache":
+        return cls(
+            directory=section.get("OPENER.DIR", "./data/openers"),
+            enabled=section.getboolean("OPENER.ENABLED", True),
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.jsonl")
+
+    def load(self, key: str) -> list[dict]:
+        path = self._path(key)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return []
+
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        # 다른 프로세스(오프라인 warmer)가 추가했을 수 있으므로 mtime 이 바뀌면 다시 읽음
+        with open(path, "r", encoding="utf-8") as fh:
+            items = [json.loads(line) for line in fh if line.strip()]
+        with self.lock:
+            self.entries[key] = (mtime, items)
+        return items
+
+    def pick(self, model, tts, text: str, profile) -> dict | None:
+        if not self.enabled:
+            return None
+        items = self.load(make_key(model, tts, text, profile))
+        return random.choice(items) if items else None
+
+    def count(self, key: str) -> int:
+        return len(self.load(key))
+
+    def add(self, key: str, item: dict) -> None:
+        with self.lock:
+            # 같은 mtime 안에 다시 쓰면 오래된 목록을 읽을 수 있으므로 캐시를 버림
+            self.entries.pop(key, None)
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(key), "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+
+class OpenerWarmer:
+    """
+    주제 x 모델 x audio profile 조합마다 첫 발언을 count 개씩 채워 두는 one-shot 작업.
+    서버 프로세스마다 돌면 같은 발언을 중복 생성하므로 CLI(main)로만 실행한다.
+
+    build_model(name), build_tts(voice) 는 Room 과 같은 설정의 client 를 만든다.
+    한 번 생성한 발언을 부족한 profile 마다 합성해 저장한다.
+    """
+
+    def __init__(
+        self,
+        cache,
+        topics,
+        build_model,
+        build_tts,
+        prompt,
+        voice,
+        profiles,
+        models=("gpt", "gemini"),
+        count=3,
+    ):
+        self.cache = cache
+        self.topics = list(topics)
+        self.build_model = build_model
+        self.build_tts = build_tts
+        self.prompt = prompt
+        self.models = models
+        self.voice = voice
+        self.profiles = list(profiles)
+        self.count = count
+        self.stopped = threading.Event()
+
+    def warm(self, name: str, topic: str) -> int:
+        text = opening_message(topic)
+        tts = self.build_tts(self.voice)
+        created = 0
+        try:
+            while not self.stopped.is_set():
+                # 샘플마다 빈 대화에서 시작
+                model = self.build_model(name)
+                try:
+                    model.set_system_prompt(self.prompt)
+                    keys = {
+                        profile: make_key(model, tts, text, profile)
+                        for profile in self.profiles
+                    }
+                    missing = {
+                        profile: key
+                        for profile, key in keys.items()
+                        if self.cache.count(key) < self.count
+                    }
+                    if not missing:
+                        break
+
+                    message = model.get_response(text)
+                finally:
+                    model.close()
+
+                for profile, key in missing.items():
+                    audio = tts.request(message, profile)
+                    self.cache.add(
+                        key,
+                        {
+                            "topic": topic,
+                            "model": model.model_name,
+                            "voice": tts.config["voice"],
+                            "profile": profile.name,
+                            "message": message,
+                            "audio_base64": tts.decode(audio),
+                            "audio_type": profile.mime,
+                        },
+                    )
+                    created += 1
+        finally:
+            tts.close()
+        return created
+
+    def run(self) -> int:
+        created = 0
+        for topic in self.topics:
+            for name in self.models:
+                if self.stopped.is_set():
+                    return created
+                try:
+                    created += self.warm(name, topic)
+                except Exception as exc:
+                    logger.warning("Failed to warm opener for %s/%s: %s", name, topic, exc)
+        logger.info("Warmed %d openers", created)
+        return created
+
+    def stop(self):
+        self.stopped.set()
+
+
+def main(argv=None) -> int:
+    from source import room
+    from source.api import tts
+    from source.config import CONFIG as _CONFIG
+
+    parser = argparse.ArgumentParser(description="Precompute opening turns.")
+    parser.add_argument("--topics", default=_CONFIG["default"]["TOPIC"])
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=_CONFIG["default"].getint("OPENER.COUNT", 3),
+        help="openers per topic/model",
+    )
+    parser.add_argument("--models", nargs="+", default=["gpt", "gemini"])
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(levelname)s-%(asctime)s]\t%(name)s: %(message)s",
+    )
+
+    if _CONFIG.has_section("tts"):
+        tts.configure(_CONFIG["tts"])
+
+    with open(args.topics, "r", encoding="utf-8") as fp:
+        topics = json.load(fp)
+
+    warmer = OpenerWarmer(
+        room.OPENERS,
+        topics,
+        room.build_model,
+        room.build_tts,
+        prompt=_CONFIG["default"]["HISTORY.POSITIVE"],
+        voice=room.VOICES["pros"],
+        profiles=tts.PROFILES.values(),
+        models=args.models,
+        count=args.count,
+    )
+    warmer.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
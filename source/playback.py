@@ -0,0 +1,113 @@
+import itertools
+import threading
+from collections import deque
+
+MESSAGE_LIMIT = 100
+
+
+class Playback:
+    """
+    방의 최근 발언 ring buffer 와 재생 상태. 시청자가 재생을 끝낸(complete) 발언만
+    다음 차례로 넘어가게 하고, 재접속한 시청자에게 놓친 발언과 재생 대기 중인 발언을 알려준다.
+    """
+
+    def __init__(self, limit=MESSAGE_LIMIT):
+        self.lock = threading.Lock()
+        self.seq = 0
+        # 최근 limit 개만 보관하는 ring buffer 와 아직 재생되지 않은 seq 목록
+        self.messages = deque(maxlen=limit)
+        self.unplayed = deque()
+        # 접속 중인 시청자(sid)와, 재생 대기 중인 발언을 실시간으로 받은 시청자
+        self.viewers = set()
+        self.listeners = set()
+        self.size = 0
+
+    def append(self, message):
+        with self.lock:
+            self.seq += 1
+            message = message.with_seq(self.seq)
+            if len(self.messages) == self.messages.maxlen:
+                self.size -= self.messages[0].size
+            self.messages.append(message)
+            self.unplayed.append(message.seq)
+            self.listeners = set(self.viewers)
+            self.size += message.size
+        return message
+
+    def _find(self, seq):
+        # seq 는 1 씩 증가하므로 ring buffer 안의 위치를 바로 계산할 수 있음
+        if not self.messages:
+            return None
+        index = seq - self.messages[0].seq
+        if 0 <= index < len(self.messages):
+            return self.messages[index]
+        return None
+
+    def find(self, seq):
+        with self.lock:
+            return self._find(seq)
+
+    def __len__(self):
+        return len(self.messages)
+
+    def get_messages(self):
+        with self.lock:
+            return [message.to_dict() for message in self.messages]
+
+    def since(self, since=0):
+        # 오디오는 seq 로 따로 요청하므로 메타데이터만 전달
+        with self.lock:
+            if not self.messages:
+                return []
+            start = max(0, since - self.messages[0].seq + 1)
+            return [
+                message.meta
+                for message in itertools.islice(self.messages, start, None)
+            ]
+
+    def pending(self, sid=None):
+        """아직 재생 완료(complete)되지 않은 가장 오래된 발언과, 다른 시청자가 재생 중인지."""
+        with self.lock:
+            while self.unplayed:
+                message = self._find(self.unplayed[0])
+                if message is not None:
+                    return {
+                        "seq": message.seq,
+                        "role": message.role,
+                        "playing": bool(self.listeners - {sid}),
+                    }
+                self.unplayed.popleft()
+        return None
+
+    def acknowledge(self, role, seq=None):
+        """재생이 끝난 발언을 대기 목록에서 빼고, 새로 완료된 발언의 역할을 반환."""
+        # seq 가 없으면(이전 클라이언트) 해당 역할의 대기 중인 발언을 모두 완료로 봄
+        acked = None
+        with self.lock:
+            while self.unplayed:
+                message = self._find(self.unplayed[0])
+                if message is not None and (
+                    message.role != role if seq is None else message.seq > seq
+                ):
+                    break
+                self.unplayed.popleft()
+                acked = message.role if message is not None else acked
+            if acked:
+                self.listeners.clear()
+        return acked
+
+    def join(self, sid):
+        with self.lock:
+            self.viewers.add(sid)
+
+    def leave(self, sid):
+        with self.lock:
+            self.viewers.discard(sid)
+            self.listeners.discard(sid)
+
+    def clear(self):
+        with self.lock:
+            self.messages.clear()
+            self.unplayed.clear()
+            self.listeners.clear()
+            self.size = 0
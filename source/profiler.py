@@ -0,0 +1,194 @@
+"""
+실행 중인 프로세스용 wall-clock sampling profiler.
+
+요청한 스레드가 N 초 동안 sys._current_frames() 로 모든 스레드의 stack 을 모으므로
+profile 중이 아닐 때는 아무 비용이 없다. room worker 처럼 tagged() 안에서 도는 스레드는
+room / role 이 stack 앞에 붙어 방 단위로 나눠 볼 수 있다. thread pool 에 넘기는 작업은
+bind() 로 감싸야 제출한 스레드의 tag 를 이어받는다.
+
+gevent 로 실행하면 greenlet 은 OS 스레드가 아니므로 현재 실행 중인 것만 보인다.
+"""
+
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# thread ident -> {"room": ..., "role": ...}
+_TAGS = {}
+# 동시에 하나의 profile 만
+_LOCK = threading.Lock()
+
+# stack 맨 위가 여기서 멈춰 있으면 대기 중으로 봄 (C 함수는 frame 이 없으므로 호출한 쪽으로 판단)
+WAITING_FILES = {"threading.py", "queue.py", "selectors.py", "socket.py", "ssl.py"}
+WAITING_FUNCS = {"wait", "acquire", "get", "sleep", "select", "poll", "recv", "accept", "join"}
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def tagged(**tags):
+    ident = threading.get_ident()
+    previous = _TAGS.get(ident)
+    _TAGS[ident] = {**(previous or {}), **tags}
+    try:
+        yield
+    finally:
+        if previous is None:
+            _TAGS.pop(ident, None)
+        else:
+            _TAGS[ident] = previous
+
+
+def bind(fn):
+    """지금 스레드의 tag 를 pool 등 다른 스레드에서 실행될 fn 에도 붙인다."""
+    tags = dict(_TAGS.get(threading.get_ident()) or {})
+    if not tags:
+        return fn
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with tagged(**tags):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def _label(ident, names) -> tuple:
+    tags = _TAGS.get(ident) or {}
+    return tuple(f"{key}:{value}" for key, value in tags.items()) + (
+        f"thread:{names.get(ident, ident)}",
+    )
+
+
+def _stack(frame) -> tuple:
+    # root -> leaf, 함수 단위로 모이도록 호출 줄 대신 정의된 줄을 씀
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_qualname, code.co_filename, code.co_firstlineno))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+class Profile:
+    def __init__(self, samples, started, duration, count):
+        # (label, stack) -> sample 수
+        self.samples = samples
+        self.started = started
+        self.duration = duration
+        self.count = count
+
+    @property
+    def interval(self) -> float:
+        return self.duration / self.count if self.count else 0.0
+
+    def collapsed(self) -> str:
+        """flamegraph.pl / speedscope 가 읽는 collapsed stack 형식."""
+        lines = []
+        for (label, stack), count in sorted(self.samples.items()):
+            frames = label + tuple(
+                f"{name} ({os.path.basename(path)}:{line})" for name, path, line in stack
+            )
+            lines.append(";".join(frame.replace(";", ",") for frame in frames) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> dict:
+        """스레드(label)마다 sampled profile 하나씩 담은 speedscope 파일."""
+        frames, index = [], {}
+        profiles = {}
+
+        def frame_id(key):
+            if key not in index:
+                index[key] = len(frames)
+                name, path, line = key
+                frames.append({"name": name, "file": path, "line": line})
+            return index[key]
+
+        for (label, stack), count in sorted(self.samples.items()):
+            profile = profiles.setdefault(
+                label,
+                {
+                    "type": "sampled",
+                    "name": " ".join(label),
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.duration,
+                    "samples": [],
+                    "weights": [],
+                },
+            )
+            profile["samples"].append([frame_id(key) for key in stack])
+            profile["weights"].append(count * self.interval)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"wall-clock profile ({self.duration:.1f}s, {self.count} samples)",
+            "exporter": "llms-discussions",
+            "shared": {"frames": frames},
+            "profiles": list(profiles.values()),
+        }
+
+
+def sample(seconds: float, interval=0.01) -> Profile:
+    if not _LOCK.acquire(blocking=False):
+        raise ProfilerBusy("another profile is running")
+
+    try:
+        me = threading.get_ident()
+        samples = Counter()
+        count = 0
+        started = time.time()
+        start = time.perf_counter()
+        deadline = start + seconds
+        while time.perf_counter() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != me:
+                    samples[(_label(ident, names), _stack(frame))] += 1
+            count += 1
+            time.sleep(interval)
+        return Profile(samples, started, time.perf_counter() - start, count)
+    finally:
+        _LOCK.release()
+
+
+def threads() -> list[dict]:
+    """스레드별 상태와 현재 stack."""
+    frames = sys._current_frames()
+    result = []
+    for thread in threading.enumerate():
+        frame = frames.get(thread.ident)
+        state = "unknown"
+        if frame is not None:
+            waiting = (
+                os.path.basename(frame.f_code.co_filename) in WAITING_FILES
+                or frame.f_code.co_name in WAITING_FUNCS
+            )
+            state = "waiting" if waiting else "running"
+
+        result.append(
+            {
+                "name": thread.name,
+                "ident": thread.ident,
+                "daemon": thread.daemon,
+                "tags": dict(_TAGS.get(thread.ident) or {}),
+                "state": state,
+                "stack": _lines(frame),
+            }
+        )
+    return result
+
+
+def _lines(frame) -> list[str]:
+    # 지금 실행 중인 줄, leaf 가 먼저
+    lines = []
+    while frame is not None:
+        lines.append(f"{frame.f_code.co_qualname} ({frame.f_code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return lines
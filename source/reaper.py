@@ -0,0 +1,63 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class RoomReaper:
+    """
+    방치된 방을 주기적으로 정리하는 백그라운드 스레드.
+
+    - idle_ttl: 마지막 활동 이후 이 시간(초)이 지나면 정리
+    - max_lifetime: 생성 이후 이 시간(초)이 지나면 정리
+
+    접속 중인 시청자가 있는 방은 정리하지 않는다.
+    """
+
+    def __init__(self, manager, idle_ttl=600.0, max_lifetime=3600.0, interval=30.0):
+        self.manager = manager
+        self.idle_ttl = idle_ttl
+        self.max_lifetime = max_lifetime
+        self.interval = interval
+
+        self.thread = threading.Thread(target=self.run, daemon=True, name="room-reaper")
+        self.stopped = threading.Event()
+
+    def expired(self, room) -> str | None:
+        usage = room.resources()
+        if usage["members"] > 0:
+            return None
+        if self.max_lifetime and usage["age"] > self.max_lifetime:
+            return "max-lifetime"
+        if self.idle_ttl and usage["idle"] > self.idle_ttl:
+            return "idle"
+        return None
+
+    def reap(self) -> list:
+        reaped = []
+        for room_id in self.manager.list_rooms():
+            room = self.manager.get_room(room_id)
+            if room is None:
+                continue
+
+            reason = self.expired(room)
+            if reason is None:
+                continue
+
+            try:
+                self.manager.remove_room(room_id)
+                reaped.append(room_id)
+                logger.info("Reaped room %s (%s)", room_id, reason)
+            except Exception as exc:
+                logger.warning("Failed to reap room %s: %s", room_id, exc)
+        return reaped
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.reap()
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,177 @@
+import logging
+import random
+import threading
+import time
+
+from source import metrics
+
+logger = logging.getLogger(__name__)
+
+BREAKER_STATE = metrics.Gauge(
+    "provider_breaker_open", "1 if the provider circuit breaker is open.", ["provider"]
+)
+RETRIES = metrics.Counter("provider_retries_total", "Provider call retries.", ["provider"])
+FAILURES = metrics.Counter(
+    "provider_failures_total", "Provider calls that failed after retries.", ["provider"]
+)
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold 에 도달하면 reset_timeout 동안 호출을 즉시 거부(open)하고,
+    이후 한 번의 시험 호출(half-open)이 성공하면 다시 닫는다.
+    """
+
+    def __init__(self, name, threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def success(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+        BREAKER_STATE.labels(self.name).set(0)
+
+    def failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            self.probing = False
+            if self.failures >= self.threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+                BREAKER_STATE.labels(self.name).set(1)
+                logger.warning("Circuit breaker for %s is open", self.name)
+
+
+class RetryBudget:
+    """요청마다 ratio 만큼 적립하고 재시도마다 1 을 소모하는 토큰 버킷."""
+
+    def __init__(self, ratio=0.2, minimum=3.0, maximum=20.0):
+        self.ratio = ratio
+        self.tokens = minimum
+        self.minimum = minimum
+        self.maximum = maximum
+        self.lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self.lock:
+            self.tokens = min(self.maximum, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self.lock:
+            if self.tokens < 1.0:
+                return False
+            self.tokens -= 1.0
+            return True
+
+
+class Policy:
+    def __init__(
+        self,
+        timeout=30.0,
+        retries=2,
+        backoff=0.5,
+        budget_ratio=0.2,
+        threshold=5,
+        reset_timeout=30.0,
+        failover=True,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.budget_ratio = budget_ratio
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failover = failover
+
+        self.breakers = {}
+        self.budgets = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, section) -> "Policy":
+        return cls(
+            timeout=section.getfloat("RESILIENCE.TIMEOUT", 30.0),
+            retries=section.getint("RESILIENCE.RETRIES", 2),
+            backoff=section.getfloat("RESILIENCE.BACKOFF", 0.5),
+            budget_ratio=section.getfloat("RESILIENCE.RETRY_BUDGET", 0.2),
+            threshold=section.getint("RESILIENCE.BREAKER_THRESHOLD", 5),
+            reset_timeout=section.getfloat("RESILIENCE.BREAKER_RESET", 30.0),
+            failover=section.getboolean("RESILIENCE.FAILOVER", True),
+        )
+
+    def breaker(self, provider: str) -> CircuitBreaker:
+        with self.lock:
+            if provider not in self.breakers:
+                self.breakers[provider] = CircuitBreaker(
+                    provider, self.threshold, self.reset_timeout
+                )
+                self.budgets[provider] = RetryBudget(self.budget_ratio)
+            return self.breakers[provider]
+
+    def call(self, provider: str, fn, *args, **kwargs):
+        breaker = self.breaker(provider)
+        budget = self.budgets[provider]
+        deadline = time.monotonic() + self.timeout * (self.retries + 1)
+
+        budget.deposit()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                raise CircuitOpenError(f"{provider} circuit breaker is open")
+
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                breaker.failure()
+                attempt += 1
+                # full jitter backoff
+                delay = random.uniform(0, self.backoff * 2 ** (attempt - 1))
+                if (
+                    attempt > self.retries
+                    or time.monotonic() + delay >= deadline
+                    or not budget.withdraw()
+                ):
+                    FAILURES.labels(provider).inc()
+                    raise exc
+                RETRIES.labels(provider).inc()
+                logger.warning("%s call failed (%s), retry %d", provider, exc, attempt)
+                time.sleep(delay)
+                continue
+
+            breaker.success()
+            return result
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                name: {"state": breaker.state, "failures": breaker.failures}
+                for name, breaker in self.breakers.items()
+            }
@@ -1,54 +1,134 @@
 import threading
+import time
 
-from source import worker
-from source.api import gemini, gpt, tts
+from source import opener, playback, resilience, usage, worker
+from source.api import cassette, gemini, gpt, tts
 from source.config import CONFIG as _CONFIG
 
+_CASSETTE = cassette.Cassette.from_config(_CONFIG["default"])
+POLICY = resilience.Policy.from_config(_CONFIG["default"])
+OPENERS = opener.OpenerCache.from_config(_CONFIG["default"])
+VOICES = {
+    "pros": _CONFIG["google"].get("TTS.VOICE.PROS", tts.VOICES[1]),
+    "cons": _CONFIG["google"].get("TTS.VOICE.CONS", tts.VOICES[3]),
+}
+
+
+def build_model(name, meter=None):
+    if name == "gpt":
+        return gpt.ChatGPT(
+            _CONFIG["openai"]["GPT.MODEL_NAME"],
+            key=_CONFIG["openai"]["GPT.API_KEY"],
+            base_url=_CONFIG["openai"].get("GPT.BASE_URL"),
+            cassette=_CASSETTE,
+            meter=meter,
+            timeout=POLICY.timeout,
+        )
+    return gemini.Gemini(
+        _CONFIG["google"]["GEMINI.MODEL_NAME"],
+        credential_file=_CONFIG["google"]["CREDENTIALS"],
+        project=_CONFIG["google"]["GCP.PROJECT_ID"],
+        base_url=_CONFIG["google"].get("GEMINI.BASE_URL"),
+        key=_CONFIG["google"].get("GCP.API_KEY"),
+        cassette=_CASSETTE,
+        meter=meter,
+        timeout=POLICY.timeout,
+    )
+
+
+def build_tts(voice, meter=None):
+    return tts.TTS(
+        voice,
+        credential_file=_CONFIG["google"]["CREDENTIALS"],
+        endpoint=_CONFIG["google"].get("TTS.BASE_URL"),
+        cassette=_CASSETTE,
+        meter=meter,
+        timeout=POLICY.timeout,
+    )
+
 
 class Room:
-    def __init__(self, room_id, model_pros="gpt", model_cons="gemini", event_bus=None):
+    def __init__(
+        self,
+        room_id,
+        model_pros="gpt",
+        model_cons="gemini",
+        event_bus=None,
+        state=None,
+        store=None,
+        uid=None,
+    ):
         self.room_id = room_id
+        self.uid = uid or room_id
         self.event_bus = event_bus
+        self.state = state
+        self.store = store
         self.members = 0
         self.count = 0
-        self.messages = []
-        self.results = {}
+        self.started = False
+        self.playback = playback.Playback()
+        # 접속한 클라이언트들이 모두 재생할 수 있는 audio profile
+        self.capabilities = tts.Capabilities()
+        self._results = {}
+        self.usage = usage.UsageMeter()
+        self.policy = POLICY
+        self.created_at = time.monotonic()
+        self.last_activity = self.created_at
 
         self.history_max = int(_CONFIG["default"]["HISTORY.SIZE"])
         self.history_prompt = {
             "pros": _CONFIG["default"]["HISTORY.POSITIVE"],
             "cons": _CONFIG["default"]["HISTORY.NEGATIVE"]
         }
-        self.models = {
-            "gpt": gpt.ChatGPT(
-                _CONFIG["openai"]["GPT.MODEL_NAME"],
-                key=_CONFIG["openai"]["GPT.API_KEY"],
-            ),
-            "gemini": gemini.Gemini(
-                _CONFIG["google"]["GEMINI.MODEL_NAME"],
-                credential_file=_CONFIG["google"]["CREDENTIALS"],
-                project=_CONFIG["google"]["GCP.PROJECT_ID"],
-            ),
-        }
+        self.models = {name: self.create_model(name) for name in ("gpt", "gemini")}
         self.lock = threading.Lock()
         self.threads = {
             "pros": worker.ModelWorker(
                 self,
                 "pros",
                 model=self.select_model(model_pros, "pros"),
-                tts=tts.TTS(1, credential_file=_CONFIG["google"]["CREDENTIALS"]),
+                tts=self.create_tts(VOICES["pros"]),
             ),
             "cons": worker.ModelWorker(
                 self,
                 "cons",
                 model=self.select_model(model_cons, "cons"),
-                tts=tts.TTS(3, credential_file=_CONFIG["google"]["CREDENTIALS"]),
+                tts=self.create_tts(VOICES["cons"]),
             ),
         }
 
         self.threads["pros"].set_output_queue(self.threads["cons"].input_queue)
         self.threads["cons"].set_output_queue(self.threads["pros"].input_queue)
 
+    def create_model(self, name):
+        return build_model(name, meter=self.usage)
+
+    def create_tts(self, voice):
+        return build_tts(voice, meter=self.usage)
+
+    def failover_model(self, role):
+        # 장애가 난 provider 대신 다른 provider 로 같은 대화를 이어감
+        current = self.threads[role].model
+        alternate = "gemini" if current.provider == "openai" else "gpt"
+
+        model = self.create_model(alternate)
+        model.set_system_prompt(self.history_prompt.get(role))
+        model.import_history(current.export_history())
+        with self.lock:
+            self.threads[role].set_model(model)
+            # 방이 가진 client 목록을 바꿔 close_clients 가 새 client 를 닫게 함
+            retired = all(worker.model is not current for worker in self.threads.values())
+            if retired:
+                self.models = {
+                    name: other for name, other in self.models.items() if other is not current
+                }
+            self.models[f"{role}:{alternate}"] = model
+
+        # 더 이상 아무 worker 도 쓰지 않는 client 는 바로 닫음
+        if retired:
+            current.close()
+        return model
+
     def select_model(self, model, role):
         prompt = self.history_prompt.get(role)
         model_obj = self.models.get(model)
@@ -57,40 +137,107 @@ class Room:
 
         return model_obj
 
+    def touch(self):
+        self.last_activity = time.monotonic()
+
     def start_debate(self, topic: str):
-        self.threads["pros"].enqueue_input(topic)
+        self.touch()
+        # 재접속한 클라이언트가 다시 start 를 보내도 토론은 한 번만 시작
+        with self.lock:
+            if self.started:
+                return False
+            self.started = True
+
+        pros = self.threads["pros"]
+        # 미리 생성된 첫 발언이 있으면 생성/합성 없이 바로 재생
+        pros.enqueue_input(
+            topic, OPENERS.pick(pros.model, pros.tts, topic, self.audio_profile)
+        )
+        return True
 
     def append_message(self, message):
         with self.lock:
             self.count += 1
-            if self.count >= self.history_max:
-                self.stop_threads()
-            self.messages.append(message)
-        if len(self.messages) > 100:
-            self.messages.pop(0)
+            finished = self.count >= self.history_max
+        message = self.playback.append(message)
+        self.touch()
+        if finished:
+            self.stop_threads()
+        if self.state or self.store:
+            data = message.to_dict()
+            if self.state:
+                self.state.append_message(self.room_id, data)
+            if self.store:
+                self.store.append_message(self.uid, self.room_id, data)
+        return message
+
+    @property
+    def seq(self):
+        return self.playback.seq
+
+    @property
+    def audio_profile(self):
+        return self.capabilities.profile
+
+    @property
+    def results(self):
+        return self._results
+
+    @results.setter
+    def results(self, results):
+        self._results = results
+        if self.state:
+            self.state.set_results(self.room_id, results)
+        if self.store:
+            self.store.set_results(self.uid, results)
+
+    def get_messages(self):
+        return self.playback.get_messages()
+
+    def messages_since(self, since=0):
+        return self.playback.since(since)
+
+    def get_audio(self, seq):
+        message = self.playback.find(seq)
+        if message is None:
+            return "", ""
+        return message.audio_base64, message.audio_type
 
     def user_message(self, message):
+        self.touch()
         for thread in self.threads.values():
             thread.model.append_history("user", message)
 
-    def get_message(self):
-        for i, msg in enumerate(self.messages):
-            if not msg.get("is_playing"):
-                self.messages[i]["is_playing"] = True
-                return msg
-        return None
+    def pending(self, sid=None):
+        return self.playback.pending(sid)
 
-    def add_member(self):
+    def acknowledge(self, role, seq=None):
+        acked = self.playback.acknowledge(role, seq)
+        # 이미 다른 시청자가 완료한 발언이면 다음 차례를 깨우지 않음
+        if acked:
+            self.set_event(acked)
+        return acked is not None
+
+    def add_member(self, sid=None, mimes=None, low_bandwidth=False):
+        self.touch()
         self.members += 1
+        if sid is not None:
+            self.playback.join(sid)
+            self.capabilities.add(sid, mimes, low_bandwidth)
+        return self.audio_profile
 
-    def remove_member(self):
+    def remove_member(self, sid=None):
         self.members -= 1
+        if sid is not None:
+            self.playback.leave(sid)
+            self.capabilities.remove(sid)
         return self.members > 0
 
     def wait_event(self, role):
         self.threads[role].wait_event()
 
     def set_event(self, role):
+        self.touch()
         self.threads[role].set_event()
 
     def check_event(self, role):
@@ -103,5 +250,46 @@ class Room:
 
     def stop_threads(self):
         with self.lock:
+            workers = list(self.threads.values())
+        for worker in workers:
+            worker.stop()
+
+    def close(self):
+        self.stop_threads()
+        if any(worker.is_alive() for worker in self.threads.values()):
+            # provider 호출이 끝나지 않은 worker 가 있으면 끝난 뒤에 client 를 닫음
+            threading.Thread(
+                target=self.close_clients,
+                args=(True,),
+                daemon=True,
+                name=f"room-close-{self.room_id}",
+            ).start()
+        else:
+            self.close_clients()
+        self.playback.clear()
+
+    def close_clients(self, wait=False):
+        if wait:
             for worker in self.threads.values():
-                worker.stop()
+                if worker.thread is not threading.current_thread():
+                    worker.thread.join()
+        for model in self.models.values():
+            model.close()
+        for worker in self.threads.values():
+            worker.tts.close()
+
+    def resources(self):
+        now = time.monotonic()
+        with self.playback.lock:
+            message_bytes = self.playback.size
+            count = len(self.playback)
+        return {
+            "members": self.members,
+            "threads": sum(worker.is_alive() for worker in self.threads.values()),
+            # provider 응답을 기다리거나 차례를 기다리는 발언 수
+            "queued": sum(worker.backlog() for worker in self.threads.values()),
+            "messages": count,
+            "message_bytes": message_bytes,
+            "age": round(now - self.created_at, 1),
+            "idle": round(now - self.last_activity, 1),
+        }
@@ -0,0 +1,58 @@
+"""
+gevent 기반 production 서버.
+
+    python -m source.serve --port 8001
+
+표준 라이브러리를 monkey patch 해서 room 의 worker 스레드와 socket 연결을 모두 greenlet 으로 돌린다.
+gevent-websocket 대신 simple-websocket 을 쓰면 브라우저와 permessage-deflate 가 협상된다.
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import sys  # noqa: E402
+
+from gevent.pool import Pool  # noqa: E402
+
+
+def main(argv=None) -> int:
+    try:
+        # google-cloud-texttospeech(gRPC) 호출이 이벤트 루프를 막지 않도록 함
+        import grpc.experimental.gevent
+
+        grpc.experimental.gevent.init_gevent()
+    except ImportError:
+        pass
+
+    from app import app, socketio
+    from source.config import CONFIG as _CONFIG
+
+    section = _CONFIG["flask"]
+    parser = argparse.ArgumentParser(description="Run the debate server with gevent.")
+    parser.add_argument("--host", default=section.get("SERVER.HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=section.getint("SERVER.PORT", 80))
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=section.getint("SERVER.MAX_CONCURRENCY", 10000),
+        help="maximum concurrent requests and websocket connections",
+    )
+    args = parser.parse_args(argv)
+
+    if socketio.async_mode != "gevent":
+        raise SystemExit("Set SOCKETIO.ASYNC_MODE = gevent to use this server.")
+
+    socketio.run(
+        app,
+        host=args.host,
+        port=args.port,
+        log_output=False,
+        spawn=Pool(args.concurrency),
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+import abc
+import json
+import os
+import select
+import socket
+import threading
+from urllib.parse import urlparse
+
+
+class StateBackend(abc.ABC):
+    """
+    프로세스 간에 공유되는 방 상태 저장소 인터페이스.
+
+    저장 항목:
+      - 방 메타데이터 (소유 노드, 모델 구성 등)
+      - 토론 기록 (메시지 목록)
+      - 평가 결과
+    """
+
+    @abc.abstractmethod
+    def claim_room(self, room_id: str, meta: dict) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def save_room(self, room_id: str, meta: dict) -> None:
+        ...
+
+    @abc.abstractmethod
+    def load_room(self, room_id: str) -> dict | None:
+        ...
+
+    @abc.abstractmethod
+    def delete_room(self, room_id: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def list_rooms(self) -> list:
+        ...
+
+    @abc.abstractmethod
+    def append_message(self, room_id: str, message: dict, limit: int = 100) -> None:
+        ...
+
+    @abc.abstractmethod
+    def get_messages(self, room_id: str) -> list:
+        ...
+
+    @abc.abstractmethod
+    def set_results(self, room_id: str, results: dict) -> None:
+        ...
+
+    @abc.abstractmethod
+    def get_results(self, room_id: str) -> dict:
+        ...
+
+
+class MemoryBackend(StateBackend):
+    def __init__(self):
+        self.rooms = {}
+        self.messages = {}
+        self.results = {}
+        self.lock = threading.Lock()
+
+    def claim_room(self, room_id, meta):
+        with self.lock:
+            if room_id in self.rooms:
+                return False
+            self.rooms[room_id] = dict(meta)
+            return True
+
+    def save_room(self, room_id, meta):
+        with self.lock:
+            self.rooms[room_id] = dict(meta)
+
+    def load_room(self, room_id):
+        with self.lock:
+            meta = self.rooms.get(room_id)
+            return dict(meta) if meta is not None else None
+
+    def delete_room(self, room_id):
+        with self.lock:
+            self.rooms.pop(room_id, None)
+            self.messages.pop(room_id, None)
+            self.results.pop(room_id, None)
+
+    def list_rooms(self):
+        with self.lock:
+            return list(self.rooms.keys())
+
+    def append_message(self, room_id, message, limit=100):
+        with self.lock:
+            messages = self.messages.setdefault(room_id, [])
+            messages.append(message)
+            if len(messages) > limit:
+                del messages[: len(messages) - limit]
+
+    def get_messages(self, room_id):
+        with self.lock:
+            return list(self.messages.get(room_id, []))
+
+    def set_results(self, room_id, results):
+        with self.lock:
+            self.results[room_id] = results
+
+    def get_results(self, room_id):
+        with self.lock:
+            return self.results.get(room_id, {})
+
+
+class RedisError(Exception):
+    pass
+
+
+# 응답을 받기 전에 끊겨도 다시 보내서 결과가 달라지지 않는 명령 (SET NX 는 제외)
+IDEMPOTENT = {"GET", "SET", "DEL", "SADD", "SREM", "SMEMBERS", "LRANGE", "LTRIM", "PING"}
+
+
+class RedisConnection:
+    """RESP 프로토콜만 구현한 최소한의 동기 클라이언트."""
+
+    def __init__(self, host="localhost", port=6379, db=0, password=None, timeout=5.0):
+        self.address = (host, port)
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.sock = None
+        self.reader = None
+        self.lock = threading.Lock()
+
+    def connect(self) -> None:
+        self.sock = socket.create_connection(self.address, timeout=self.timeout)
+        self.reader = self.sock.makefile("rb")
+        if self.password:
+            self._call("AUTH", self.password)
+        if self.db:
+            self._call("SELECT", self.db)
+
+    def close(self) -> None:
+        if self.sock:
+            self.reader.close()
+            self.sock.close()
+        self.sock = None
+        self.reader = None
+
+    def execute(self, *args):
+        with self.lock:
+            if self.sock is not None and not self._alive():
+                self.close()
+            if self.sock is None:
+                self.connect()
+
+            sent = False
+            try:
+                self.sock.sendall(self._encode(args))
+                sent = True
+                return self._read()
+            except (OSError, EOFError):
+                self.close()
+                # 보낸 뒤에 끊겼으면 서버가 이미 실행했을 수 있으므로 멱등한 명령만 한 번 재시도
+                if sent and not self._idempotent(args):
+                    raise
+                self.connect()
+                return self._call(*args)
+
+    def _alive(self) -> bool:
+        # 응답을 기다리지 않는데 읽을 것이 있으면 서버가 (idle timeout 등으로) 연결을 닫은 것
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        return not readable
+
+    @staticmethod
+    def _idempotent(args) -> bool:
+        command = str(args[0]).upper()
+        if command == "SET":
+            return not any(str(arg).upper() == "NX" for arg in args[3:])
+        return command in IDEMPOTENT
+
+    def _call(self, *args):
+        self.sock.sendall(self._encode(args))
+        return self._read()
+
+    def _encode(self, args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if isinstance(arg, bytes):
+                data = arg
+            else:
+                data = str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(out)
+
+    def _read(self):
+        line = self.reader.readline()
+        if not line:
+            raise EOFError("Connection closed by server")
+
+        prefix, body = line[:1], line[1:-2]
+        if prefix == b"+":
+            return body.decode("utf-8")
+        if prefix == b"-":
+            raise RedisError(body.decode("utf-8"))
+        if prefix == b":":
+            return int(body)
+        if prefix == b"$":
+            size = int(body)
+            if size < 0:
+                return None
+            data = self.reader.read(size + 2)
+            return data[:-2]
+        if prefix == b"*":
+            size = int(body)
+            if size < 0:
+                return None
+            return [self._read() for _ in range(size)]
+
+        raise RedisError(f"Unknown reply prefix: {prefix!r}")
+
+
+class RedisBackend(StateBackend):
+    def __init__(self, connection: RedisConnection, prefix: str = "debate"):
+        self.conn = connection
+        self.prefix = prefix
+
+    def _key(self, *parts) -> str:
+        return ":".join((self.prefix, *parts))
+
+    def claim_room(self, room_id, meta):
+        claimed = self.conn.execute(
+            "SET", self._key("room", room_id), json.dumps(meta), "NX"
+        )
+        if claimed is None:
+            return False
+        self.conn.execute("SADD", self._key("rooms"), room_id)
+        return True
+
+    def save_room(self, room_id, meta):
+        self.conn.execute("SET", self._key("room", room_id), json.dumps(meta))
+        self.conn.execute("SADD", self._key("rooms"), room_id)
+
+    def load_room(self, room_id):
+        data = self.conn.execute("GET", self._key("room", room_id))
+        return json.loads(data) if data is not None else None
+
+    def delete_room(self, room_id):
+        self.conn.execute(
+            "DEL",
+            self._key("room", room_id),
+            self._key("messages", room_id),
+            self._key("results", room_id),
+        )
+        self.conn.execute("SREM", self._key("rooms"), room_id)
+
+    def list_rooms(self):
+        return [
+            room_id.decode("utf-8")
+            for room_id in self.conn.execute("SMEMBERS", self._key("rooms")) or []
+        ]
+
+    def append_message(self, room_id, message, limit=100):
+        key = self._key("messages", room_id)
+        self.conn.execute("RPUSH", key, json.dumps(message, ensure_ascii=False))
+        self.conn.execute("LTRIM", key, -limit, -1)
+
+    def get_messages(self, room_id):
+        items = self.conn.execute("LRANGE", self._key("messages", room_id), 0, -1)
+        return [json.loads(item) for item in items or []]
+
+    def set_results(self, room_id, results):
+        self.conn.execute(
+            "SET",
+            self._key("results", room_id),
+            json.dumps(results, ensure_ascii=False),
+        )
+
+    def get_results(self, room_id):
+        data = self.conn.execute("GET", self._key("results", room_id))
+        return json.loads(data) if data is not None else {}
+
+
+def node_id() -> str:
+    # 방 워커 스레드를 소유한 프로세스 식별자 (sticky routing 용)
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def create_backend(url: str = "memory://") -> StateBackend:
+    parsed = urlparse(url or "memory://")
+
+    if parsed.scheme == "memory":
+        return MemoryBackend()
+    if parsed.scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        connection = RedisConnection(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=db,
+            password=parsed.password,
+        )
+        return RedisBackend(connection)
+
+    raise ValueError(f"Unsupported state backend: {url}")
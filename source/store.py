@@ -0,0 +1,194 @@
+import contextlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (
+    uid TEXT PRIMARY KEY,
+    room_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    meta TEXT NOT NULL DEFAULT '{}',
+    results TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT NOT NULL,
+    room_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rooms_room_time ON rooms (room_id, created_at);
+CREATE INDEX IF NOT EXISTS messages_uid ON messages (uid, id);
+CREATE INDEX IF NOT EXISTS messages_room_time ON messages (room_id, ts);
+"""
+
+
+class TranscriptStore:
+    """
+    SQLite(WAL) 기반 append-only 토론 기록 저장소.
+
+    쓰기는 백그라운드 스레드에서 batch 단위로 commit 하므로 워커 스레드를 막지 않는다.
+    방 코드는 재사용되므로 방 생성마다 발급되는 uid 로 기록을 구분한다.
+    """
+
+    def __init__(self, path, batch_size=64, flush_interval=1.0, keep_audio=False):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.keep_audio = keep_audio
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True, name="transcript-store")
+        self.thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def run(self):
+        conn = self._connect()
+        # BEGIN/SAVEPOINT 를 직접 관리
+        conn.isolation_level = None
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = None in batch
+            try:
+                self._write(conn, [statement for statement in batch if statement])
+            except sqlite3.Error as exc:
+                logger.error("Failed to write %d transcript records: %s", len(batch), exc)
+
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                break
+        conn.close()
+
+    @staticmethod
+    def _write(conn, statements):
+        # 한 항목이 실패해도 나머지는 commit 되도록 항목마다 savepoint 를 둠
+        conn.execute("BEGIN")
+        try:
+            for statement in statements:
+                conn.execute("SAVEPOINT item")
+                try:
+                    conn.execute(*statement)
+                except sqlite3.Error as exc:
+                    conn.execute("ROLLBACK TO item")
+                    logger.error("Failed to write transcript record: %s", exc)
+                conn.execute("RELEASE item")
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def open_room(self, uid, room_id, meta=None):
+        self.queue.put(
+            (
+                "INSERT OR IGNORE INTO rooms (uid, room_id, created_at, meta) "
+                "VALUES (?, ?, ?, ?)",
+                (uid, room_id, time.time(), json.dumps(meta or {}, ensure_ascii=False)),
+            )
+        )
+
+    def append_message(self, uid, room_id, message):
+        if not self.keep_audio:
+            message = {k: v for k, v in message.items() if k != "audio_base64"}
+        self.queue.put(
+            (
+                "INSERT INTO messages (uid, room_id, ts, payload) VALUES (?, ?, ?, ?)",
+                (uid, room_id, time.time(), json.dumps(message, ensure_ascii=False)),
+            )
+        )
+
+    def set_results(self, uid, results):
+        self.queue.put(
+            (
+                "UPDATE rooms SET results = ? WHERE uid = ?",
+                (json.dumps(results, ensure_ascii=False), uid),
+            )
+        )
+
+    def get_messages(self, uid, limit=None) -> list:
+        query = "SELECT payload FROM messages WHERE uid = ? ORDER BY id"
+        params = (uid,)
+        if limit:
+            query = (
+                "SELECT payload FROM (SELECT id, payload FROM messages WHERE uid = ? "
+                "ORDER BY id DESC LIMIT ?) ORDER BY id"
+            )
+            params = (uid, limit)
+
+        with contextlib.closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def get_results(self, uid) -> dict:
+        with contextlib.closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT results FROM rooms WHERE uid = ?", (uid,)
+            ).fetchone()
+        return json.loads(row[0]) if row and row[0] else {}
+
+    def get_room(self, uid) -> dict | None:
+        with contextlib.closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT room_id, created_at, meta FROM rooms WHERE uid = ?", (uid,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"uid": uid, "room_id": row[0], "created_at": row[1], **json.loads(row[2])}
+
+    def find_rooms(self, room_id=None, start=None, end=None) -> list:
+        query = "SELECT uid, room_id, created_at FROM rooms WHERE 1 = 1"
+        params = []
+        if room_id:
+            query += " AND room_id = ?"
+            params.append(room_id)
+        if start is not None:
+            query += " AND created_at >= ?"
+            params.append(start)
+        if end is not None:
+            query += " AND created_at < ?"
+            params.append(end)
+        query += " ORDER BY created_at"
+
+        with contextlib.closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            {"uid": uid, "room_id": code, "created_at": created}
+            for uid, code, created in rows
+        ]
+
+    def flush(self):
+        self.queue.join()
+
+    def close(self, timeout=5.0):
+        self.queue.put(None)
+        self.thread.join(timeout)
@@ -0,0 +1,291 @@
+"""
+외부 provider 를 흉내 내는 로컬 stub 서버 (부하 테스트 / 오프라인 개발용).
+
+    python -m source.stub --port 9000 --latency lognormal:0.8,0.4 --error-rate 0.01
+
+config.ini 에서 아래 값을 stub 주소로 지정하면 실제 API 대신 stub 을 호출한다.
+
+    [openai]     GPT.BASE_URL = http://localhost:9000/v1
+    [openrouter] OR.BASE_URL = http://localhost:9000/v1
+    [google]     GEMINI.BASE_URL = http://localhost:9000
+                 TTS.BASE_URL = http://localhost:9000
+                 PERSPECTIVE.BASE_URL = http://localhost:9000
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import time
+import uuid
+
+import flask
+
+SAMPLE_TEXT = (
+    "이 주장은 근거가 부족합니다. 예를 들어 최근 통계에 따르면 상황은 훨씬 복잡하며, "
+    "상대측이 제시한 사례는 일반화하기 어렵습니다."
+)
+# judge 응답은 eval._C.JUDGE_SCORE_RE 형식을 따름
+JUDGE_TEXT = "GPT: [[7]], GEMINI: [[6]], winner: [[GPT]]. 근거 제시가 더 설득력 있었습니다."
+
+
+class LatencyModel:
+    """fixed:x | uniform:a,b | lognormal:median,sigma (초 단위)"""
+
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, params = spec.partition(":")
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+
+    def sample(self) -> float:
+        if self.kind == "uniform":
+            return random.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return random.lognormvariate(0.0, sigma) * median
+        return self.params[0] if self.params else 0.0
+
+
+class Behavior:
+    def __init__(self, latency="fixed:0", error_rate=0.0, audio_bytes_per_char=200):
+        self.latency = LatencyModel(latency)
+        self.error_rate = error_rate
+        self.audio_bytes_per_char = audio_bytes_per_char
+
+    def delay(self) -> None:
+        time.sleep(max(0.0, self.latency.sample()))
+
+    def failed(self) -> bool:
+        return random.random() < self.error_rate
+
+
+def _text_for(messages: list) -> str:
+    system = " ".join(
+        str(m.get("content", "")) for m in messages if m.get("role") == "system"
+    )
+    return JUDGE_TEXT if "judge" in system.lower() else SAMPLE_TEXT
+
+
+def _usage(prompt: str, output: str) -> dict:
+    return {"prompt": max(1, len(prompt) // 2), "output": max(1, len(output) // 2)}
+
+
+def create_app(behavior: Behavior) -> flask.Flask:
+    app = flask.Flask(__name__)
+
+    @app.before_request
+    def _simulate():
+        if flask.request.method == "GET":
+            return None
+        if behavior.failed():
+            return flask.jsonify({"error": {"message": "stub failure"}}), 503
+        # 스트리밍 응답은 첫 chunk 전에 지연을 적용
+        body = flask.request.get_json(silent=True, force=True) or {}
+        streaming = body.get("stream") or flask.request.path.endswith(
+            ":streamGenerateContent"
+        )
+        if not streaming:
+            behavior.delay()
+        return None
+
+    @app.post("/v1/chat/completions")
+    def chat_completions():
+        body = flask.request.get_json(force=True)
+        text = _text_for(body.get("messages", []))
+        usage = _usage(json.dumps(body.get("messages", [])), text)
+        created = int(time.time())
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        if body.get("stream"):
+
+            def _stream():
+                behavior.delay()
+                for i in range(0, len(text), 8):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": body.get("model"),
+                        "choices": [
+                            {
+                                "index": 0,
+                                "delta": {"role": "assistant", "content": text[i : i + 8]},
+                                "finish_reason": None,
+                            }
+                        ],
+                    }
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                    time.sleep(0.01)
+                yield "data: [DONE]\n\n"
+
+            return flask.Response(_stream(), mimetype="text/event-stream")
+
+        return flask.jsonify(
+            {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": body.get("model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": usage["prompt"],
+                    "completion_tokens": usage["output"],
+                    "total_tokens": usage["prompt"] + usage["output"],
+                },
+            }
+        )
+
+    @app.post("/v1/responses")
+    def responses():
+        body = flask.request.get_json(force=True)
+        history = body.get("input", [])
+        text = _text_for(history if isinstance(history, list) else [])
+        usage = _usage(json.dumps(history, ensure_ascii=False), text)
+
+        return flask.jsonify(
+            {
+                "id": f"resp_{uuid.uuid4().hex}",
+                "object": "response",
+                "created_at": int(time.time()),
+                "status": "completed",
+                "model": body.get("model"),
+                "output": [
+                    {
+                        "id": f"msg_{uuid.uuid4().hex}",
+                        "type": "message",
+                        "role": "assistant",
+                        "status": "completed",
+                        "content": [
+                            {"type": "output_text", "text": text, "annotations": []}
+                        ],
+                    }
+                ],
+                "parallel_tool_calls": True,
+                "tool_choice": "auto",
+                "tools": [],
+                "usage": {
+                    "input_tokens": usage["prompt"],
+                    "input_tokens_details": {"cached_tokens": 0},
+                    "output_tokens": usage["output"],
+                    "output_tokens_details": {"reasoning_tokens": 0},
+                    "total_tokens": usage["prompt"] + usage["output"],
+                },
+            }
+        )
+
+    def _gemini_payload(text: str, prompt: str) -> dict:
+        usage = _usage(prompt, text)
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [{"text": text}]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": usage["prompt"],
+                "candidatesTokenCount": usage["output"],
+                "totalTokenCount": usage["prompt"] + usage["output"],
+            },
+        }
+
+    @app.post("/<version>/models/<model>:generateContent")
+    def gemini_generate(version, model):
+        prompt = flask.request.get_data(as_text=True)
+        return flask.jsonify(_gemini_payload(SAMPLE_TEXT, prompt))
+
+    @app.post("/<version>/models/<model>:streamGenerateContent")
+    def gemini_stream(version, model):
+        prompt = flask.request.get_data(as_text=True)
+
+        def _stream():
+            behavior.delay()
+            for i in range(0, len(SAMPLE_TEXT), 16):
+                payload = _gemini_payload(SAMPLE_TEXT[i : i + 16], prompt)
+                yield f"data: {json.dumps(payload, ensure_ascii=False)}\r\n\r\n"
+                time.sleep(0.01)
+
+        return flask.Response(_stream(), mimetype="text/event-stream")
+
+    @app.post("/v1/text:synthesize")
+    def synthesize():
+        body = flask.request.get_json(force=True)
+        text = body.get("input", {}).get("text", "")
+        audio = os.urandom(max(1, len(text) * behavior.audio_bytes_per_char))
+        return flask.jsonify({"audioContent": base64.b64encode(audio).decode("ascii")})
+
+    @app.get("/$discovery/rest")
+    def perspective_discovery():
+        root = flask.request.host_url
+        return flask.jsonify(
+            {
+                "kind": "discovery#restDescription",
+                "discoveryVersion": "v1",
+                "id": "commentanalyzer:v1alpha1",
+                "name": "commentanalyzer",
+                "version": "v1alpha1",
+                "rootUrl": root,
+                "servicePath": "",
+                "baseUrl": root,
+                "batchPath": "batch",
+                "protocol": "rest",
+                "parameters": {"key": {"type": "string", "location": "query"}},
+                "schemas": {},
+                "resources": {
+                    "comments": {
+                        "methods": {
+                            "analyze": {
+                                "id": "commentanalyzer.comments.analyze",
+                                "path": "v1alpha1/comments:analyze",
+                                "flatPath": "v1alpha1/comments:analyze",
+                                "httpMethod": "POST",
+                                "parameters": {},
+                                "parameterOrder": [],
+                            }
+                        }
+                    }
+                },
+            }
+        )
+
+    @app.post("/v1alpha1/comments:analyze")
+    def perspective_analyze():
+        score = round(random.betavariate(1, 8), 4)
+        return flask.jsonify(
+            {
+                "attributeScores": {
+                    "TOXICITY": {"summaryScore": {"value": score, "type": "PROBABILITY"}}
+                }
+            }
+        )
+
+    return app
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Local provider stand-ins.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="lognormal:0.8,0.4")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--audio-bytes-per-char", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    behavior = Behavior(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        audio_bytes_per_char=args.audio_bytes_per_char,
+    )
+    create_app(behavior).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == "__main__":
+    main()
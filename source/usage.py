@@ -0,0 +1,139 @@
+import threading
+
+from source import metrics
+
+FIELDS = ("input", "cached_input", "output", "reasoning", "tts_chars")
+
+# 모델명 -> (input, cached_input, output) USD / 1M tokens, "tts" -> (USD / 1M chars,)
+PRICES = {}
+
+TOKENS = metrics.Counter(
+    "llm_tokens_total", "Provider tokens and TTS characters.", ["provider", "model", "kind"]
+)
+COST = metrics.Counter("llm_cost_usd_total", "Estimated provider cost.", ["provider", "model"])
+
+
+def configure(section) -> None:
+    # config.ini 의 [pricing] 섹션: "<model> = input, cached_input, output"
+    PRICES.clear()
+    for model, value in section.items():
+        prices = tuple(float(v) for v in value.split(","))
+        PRICES[model.lower()] = prices
+
+
+def cost(provider: str, model: str, counts: dict) -> float:
+    prices = PRICES.get(model.lower()) or PRICES.get(provider.lower())
+    if prices is None:
+        return 0.0
+    # provider 가 None 으로 준 항목은 0 으로 봄
+    counts = {field: counts.get(field) or 0 for field in FIELDS}
+    if len(prices) == 1:
+        return counts["tts_chars"] * prices[0] / 1e6
+
+    input_price, cached_price, output_price = prices
+    uncached = max(0, counts["input"] - counts["cached_input"])
+    # reasoning 토큰은 output 토큰에 포함되어 과금됨
+    return (
+        uncached * input_price
+        + counts["cached_input"] * cached_price
+        + counts["output"] * output_price
+    ) / 1e6
+
+
+class UsageMeter:
+    def __init__(self):
+        self.totals = {}
+        self.lock = threading.Lock()
+
+    def add(self, provider: str, model: str, counts: dict) -> None:
+        with self.lock:
+            entry = self.totals.setdefault(
+                (provider, model), {**{f: 0 for f in FIELDS}, "calls": 0, "cost": 0.0}
+            )
+            for field in FIELDS:
+                entry[field] += counts.get(field, 0) or 0
+            entry["calls"] += 1
+            entry["cost"] += cost(provider, model, counts)
+
+    def merge(self, other: "UsageMeter") -> None:
+        with other.lock:
+            items = {key: dict(value) for key, value in other.totals.items()}
+        with self.lock:
+            for key, value in items.items():
+                entry = self.totals.setdefault(
+                    key, {**{f: 0 for f in FIELDS}, "calls": 0, "cost": 0.0}
+                )
+                for field, amount in value.items():
+                    entry[field] += amount
+
+    def summary(self) -> dict:
+        with self.lock:
+            items = {key: dict(value) for key, value in self.totals.items()}
+
+        total = {**{f: 0 for f in FIELDS}, "calls": 0, "cost": 0.0}
+        providers = {}
+        for (provider, model), entry in items.items():
+            entry["cost"] = round(entry["cost"], 6)
+            providers[f"{provider}/{model}"] = entry
+            for field in (*FIELDS, "calls", "cost"):
+                total[field] += entry[field]
+        total["cost"] = round(total["cost"], 6)
+
+        return {"providers": providers, "total": total}
+
+
+GLOBAL = UsageMeter()
+
+
+def record(provider: str, model: str, counts: dict, meter: UsageMeter | None = None):
+    counts = {field: counts.get(field) or 0 for field in FIELDS}
+
+    GLOBAL.add(provider, model, counts)
+    if meter is not None:
+        meter.add(provider, model, counts)
+
+    for field in FIELDS:
+        if counts[field]:
+            TOKENS.labels(provider, model, field).inc(counts[field])
+    COST.labels(provider, model).inc(cost(provider, model, counts))
+
+
+def from_openai(usage) -> dict:
+    # Responses API(input_tokens) 와 Chat Completions API(prompt_tokens) 모두 지원
+    if usage is None:
+        return {}
+
+    input_details = getattr(usage, "input_tokens_details", None) or getattr(
+        usage, "prompt_tokens_details", None
+    )
+    output_details = getattr(usage, "output_tokens_details", None) or getattr(
+        usage, "completion_tokens_details", None
+    )
+    return {
+        "input": getattr(usage, "input_tokens", None) or getattr(usage, "prompt_tokens", 0),
+        "cached_input": getattr(input_details, "cached_tokens", 0) or 0,
+        "output": getattr(usage, "output_tokens", None)
+        or getattr(usage, "completion_tokens", 0),
+        "reasoning": getattr(output_details, "reasoning_tokens", 0) or 0,
+    }
+
+
+def from_gemini(usage) -> dict:
+    if usage is None:
+        return {}
+
+    thoughts = usage.thoughts_token_count or 0
+    return {
+        "input": usage.prompt_token_count or 0,
+        "cached_input": usage.cached_content_token_count or 0,
+        # Gemini 는 thinking 토큰을 candidates 와 별도로 집계하므로 output 에 합산
+        "output": (usage.candidates_token_count or 0) + thoughts,
+        "reasoning": thoughts,
+    }
+
+
+def unpack(value) -> tuple[str, dict]:
+    # 예전에 녹화된 cassette 는 문자열만 담고 있음
+    if isinstance(value, dict):
+        return value.get("text") or "", value.get("usage") or {}
+    return value, {}
@@ -12,3 +12,14 @@ def get_random_time() -> float:
     value = random.betavariate(1, 3)
     # 값을 0.01과 0.7 사이의 범위로 스케일링
     return 0.01 + value * (0.35 - 0.01)
+
+
+def parse_seq(value) -> int | None:
+    # 클라이언트가 보낸 seq 검증. 정수로 읽을 수 없거나 음수면 None
+    if isinstance(value, bool):
+        return None
+    try:
+        seq = int(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return seq if seq >= 0 else None
@@ -1,7 +1,11 @@
+import logging
 import queue
 import threading
+import time
 
-from source import content
+from source import content, metrics, profiler
+
+logger = logging.getLogger(__name__)
 
 
 class ModelWorker:
@@ -12,59 +16,164 @@ class ModelWorker:
         self.model = model
         self.tts = tts
 
-        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread = threading.Thread(
+            target=self.run, daemon=True, name=f"worker-{room.room_id}-{role}"
+        )
         self.event = threading.Event()
         self.input_queue = queue.Queue()
         self.output_queue = None
         self.running = True
+        # provider 응답을 기다리는 중인 호출 수 (admission 부하 신호)
+        self.inflight = 0
+
+    def process_content(self, message, audio_base64=None, audio_type=None):
+        if audio_base64 is None:
+            profile = self.room.audio_profile
+            audio = self.synthesize(message, profile)
+            audio_base64 = self.tts.decode(audio) if audio else ""
+            audio_type = profile.mime
 
-    def process_content(self, message):
-        data = content.MessageContent(
+        record = content.MessageContent(
             name=self.name,
             role=self.role,
             message=message,
-        ).to_dict()
-
-        audio = self.tts.request(message)
-        data["audio_base64"] = self.tts.decode(audio)
+            audio_base64=audio_base64,
+            audio_type=audio_type or "audio/ogg",
+        )
 
+        # seq 가 붙은 뒤에 전달해야 클라이언트가 since 로 이어받을 수 있음
+        record = self.room.append_message(record)
         if self.room.event_bus:
+            # 미리 인코딩된 frame 을 모든 시청자에게 그대로 전송
             self.room.event_bus.publish(
-                f"{self.role}-response", {"room": self.room.room_id, "data": data}
+                f"{self.role}-response", {"room": self.room.room_id, "data": record.frame}
             )
-        self.room.append_message(data)
 
     def run(self):
+        # profiler 의 stack 에 방/역할을 붙임
+        with profiler.tagged(room=self.room.room_id, role=self.role):
+            self.loop()
+
+    def loop(self):
         while self.running:
             try:
-                user_input = self.input_queue.get()
+                item = self.input_queue.get()
             except queue.Empty:
                 continue
-
-            response = self.model.get_response(user_input)
-            self.process_content(response)
-            self.wait_event()
+            if item is None or not self.running:
+                break
+
+            enqueued_at, user_input, opener = item
+            metrics.QUEUE_WAIT.labels(self.role).observe(time.perf_counter() - enqueued_at)
+            # 발언을 보내기 전에 비워야 재생이 바로 끝나도(오디오 끔) complete 를 놓치지 않음
+            self.event.clear()
+
+            if opener:
+                response = opener["message"]
+                self.model.import_history([("user", user_input), ("assistant", response)])
+                self.process_content(
+                    response, opener.get("audio_base64", ""), opener.get("audio_type")
+                )
+            else:
+                response = self.generate(user_input)
+                if response is None:
+                    # 두 provider 모두 실패하면 상대에게 넘길 발언이 없어 토론이 멈추므로 끝냄
+                    self.report_error("model", "no provider could answer", fatal=True)
+                    self.input_queue.task_done()
+                    self.room.stop_threads()
+                    break
+                self.process_content(response)
+
+            with metrics.PLAYBACK_WAIT.labels(self.role).time():
+                self.wait_event()
 
             if self.output_queue:
-                self.output_queue.put(response)
+                self.output_queue.put((time.perf_counter(), response, None))
 
             self.input_queue.task_done()
 
-    def enqueue_input(self, user_input):
-        self.input_queue.put(user_input)
+    def generate(self, user_input):
+        self.inflight += 1
+        try:
+            return self._generate(user_input)
+        finally:
+            self.inflight -= 1
+
+    def _generate(self, user_input):
+        policy = self.room.policy
+        try:
+            return policy.call(self.model.provider, self.model.get_response, user_input)
+        except Exception as exc:
+            self.report_error("model", exc)
+            if not policy.failover:
+                return None
+
+        model = self.room.failover_model(self.role)
+        try:
+            return policy.call(model.provider, model.get_response, user_input)
+        except Exception as exc:
+            self.report_error("model", exc)
+            return None
+
+    def synthesize(self, message, profile=None):
+        # 음성 합성에 실패하면 텍스트만 전달
+        try:
+            return self.room.policy.call(
+                self.tts.provider, self.tts.request, message, profile
+            )
+        except Exception as exc:
+            self.report_error("tts", exc)
+            return b""
+
+    def report_error(self, kind, exc, fatal=False):
+        logger.warning("%s - %s error in room %s: %s", self.role, kind, self.room.room_id, exc)
+        if self.room.event_bus:
+            self.room.event_bus.publish(
+                f"{self.role}-error",
+                {
+                    "room": self.room.room_id,
+                    "data": {
+                        "role": self.role,
+                        "kind": kind,
+                        "message": str(exc),
+                        "fatal": fatal,
+                    },
+                },
+            )
+
+    def set_model(self, model):
+        self.model = model
+        self.name = model.model_name.split("-")[0]
+
+    def enqueue_input(self, user_input, opener=None):
+        self.input_queue.put((time.perf_counter(), user_input, opener))
         self.set_event()
 
     def start(self):
         self.thread.start()
 
-    def stop(self):
+    def stop(self, timeout=5.0):
         self.running = False
         self.input_queue.put(None)
-        self.thread.join()
-
-    def wait_event(self):
-        self.event.clear()
-        self.event.wait()
+        self.event.set()
+        # 워커 스레드 자신이 stop 을 호출한 경우 join 하면 교착 상태가 됨
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def is_alive(self):
+        return self.thread.is_alive()
+
+    def backlog(self):
+        # 끝난 worker 의 queue 에 남은 발언이나 stop sentinel(None) 은 부하가 아님
+        if not self.is_alive():
+            return 0
+        with self.input_queue.mutex:
+            queued = sum(item is not None for item in self.input_queue.queue)
+        return self.inflight + queued
+
+    def wait_event(self, interval=1.0):
+        while self.running and not self.event.wait(interval):
+            pass
 
     def set_event(self):
         self.event.set()
@@ -6,10 +6,11 @@ export const DEBATE_ROLES = {
     ADMIN: 'admin',
 };
 
+// 이 module 기준 상대 경로라 build 후에는 fingerprint 된 이미지를 가리킴
 export const AVATARS = {
-    GPT: './static/ChatGPT.png',
-    GEMINI: './static/Gemini.png',
-    USER: './static/User.png',
+    GPT: new URL('../ChatGPT.png', import.meta.url).href,
+    GEMINI: new URL('../Gemini.png', import.meta.url).href,
+    USER: new URL('../user.png', import.meta.url).href,
 };
 
 // 역할에 따른 표시 라벨
@@ -0,0 +1,142 @@
+"""테스트용 RESP 서버. RedisBackend 가 쓰는 명령만 메모리에서 처리한다."""
+
+import socket
+import socketserver
+import threading
+
+
+class FakeRedis:
+    def __init__(self):
+        self.strings = {}
+        self.lists = {}
+        self.sets = {}
+        self.commands = []
+        # 명령 이름 -> 실행한 뒤 응답 없이 연결을 끊을 횟수
+        self.drop_after = {}
+        self.lock = threading.Lock()
+
+        handler = type("Handler", (_Handler,), {"redis": self})
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.connections = []
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        )
+        self.thread.start()
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    def disconnect_all(self) -> None:
+        # 서버 쪽 idle timeout 처럼 열려 있는 연결을 모두 닫음
+        for conn in list(self.connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+        self.connections.clear()
+
+    def close(self) -> None:
+        self.disconnect_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, args):
+        command, args = args[0].upper().decode(), args[1:]
+        with self.lock:
+            self.commands.append(command)
+            if command in ("PING", "SELECT", "AUTH"):
+                return "OK"
+            if command == "GET":
+                return self.strings.get(args[0])
+            if command == "SET":
+                key, value, *options = args
+                if b"NX" in [option.upper() for option in options] and key in self.strings:
+                    return None
+                self.strings[key] = value
+                return "OK"
+            if command == "DEL":
+                removed = 0
+                for key in args:
+                    for store in (self.strings, self.lists, self.sets):
+                        if store.pop(key, None) is not None:
+                            removed += 1
+                return removed
+            if command == "SADD":
+                members = self.sets.setdefault(args[0], set())
+                before = len(members)
+                members.update(args[1:])
+                return len(members) - before
+            if command == "SREM":
+                members = self.sets.get(args[0], set())
+                before = len(members)
+                members.difference_update(args[1:])
+                return before - len(members)
+            if command == "SMEMBERS":
+                return sorted(self.sets.get(args[0], ()))
+            if command == "RPUSH":
+                items = self.lists.setdefault(args[0], [])
+                items.extend(args[1:])
+                return len(items)
+            if command == "LTRIM":
+                items = self.lists.get(args[0], [])
+                start, stop = int(args[1]), int(args[2])
+                size = len(items)
+                start = max(start + size if start < 0 else start, 0)
+                stop = stop + size if stop < 0 else min(stop, size - 1)
+                self.lists[args[0]] = items[start : stop + 1]
+                return "OK"
+            if command == "LRANGE":
+                items = self.lists.get(args[0], [])
+                start, stop = int(args[1]), int(args[2])
+                stop = len(items) if stop == -1 else stop + 1
+                return items[start:stop]
+        return Exception(f"ERR unknown command '{command}'")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    redis = None
+
+    def handle(self):
+        self.redis.connections.append(self.request)
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            reply = self.redis.handle(args)
+            name = args[0].upper().decode()
+            if self.redis.drop_after.get(name):
+                self.redis.drop_after[name] -= 1
+                return
+            self.wfile.write(encode(reply))
+
+    def read_command(self):
+        try:
+            line = self.rfile.readline()
+        except OSError:
+            return None
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            size = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+
+def encode(reply) -> bytes:
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, Exception):
+        return b"-" + str(reply).encode() + b"\r\n"
+    if isinstance(reply, str):
+        return b"+" + reply.encode() + b"\r\n"
+    if isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(encode(item) for item in reply)
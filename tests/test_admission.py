@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+
+from source.admission import AdmissionController, ConnectionLimiter
+
+
+class Load:
+    def __init__(self, rooms=0):
+        self.rooms = rooms
+
+    def __call__(self):
+        return {"rooms": self.rooms, "threads": 1, "queued": 0, "rss_mb": 1}
+
+
+def create(payload):
+    return payload["topic"]
+
+
+def test_limiter_rejects_over_limit_and_releases():
+    limiter = ConnectionLimiter(limit=1)
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    limiter.release()
+    assert limiter.acquire()
+    assert limiter.stats() == {"active": 1, "limit": 1, "rejected": 1}
+
+
+def test_zero_limit_is_unlimited():
+    limiter = ConnectionLimiter()
+    assert all(limiter.acquire() for _ in range(100))
+    assert AdmissionController(Load(10**6), {"rooms": 0}).overloaded() == []
+
+
+def test_admits_below_limit():
+    controller = AdmissionController(Load(0), {"rooms": 1})
+    assert controller.request({"topic": "a"}, create) == {"status": "admitted", "result": "a"}
+
+
+def test_queues_then_rejects_when_queue_is_full():
+    controller = AdmissionController(Load(1), {"rooms": 1}, queue_size=1, retry_after=7)
+
+    first = controller.request({"topic": "a"}, create)
+    assert first["status"] == "waiting"
+    assert first["position"] == 1
+    assert controller.request({"topic": "b"}, create) == {
+        "status": "rejected",
+        "retry_after": 7,
+    }
+    assert controller.metrics()["rejected"] == 1
+
+
+def test_poll_admits_in_fifo_order():
+    load = Load(1)
+    controller = AdmissionController(load, {"rooms": 1}, queue_size=2)
+    first = controller.request({"topic": "a"}, create)["ticket"]
+    second = controller.request({"topic": "b"}, create)["ticket"]
+
+    assert controller.poll(first, create)["status"] == "waiting"
+    load.rooms = 0
+    assert controller.poll(second, create) == {
+        "status": "waiting",
+        "ticket": second,
+        "position": 2,
+    }
+    assert controller.poll(first, create) == {"status": "admitted", "result": "a"}
+    assert controller.poll(second, create)["result"] == "b"
+
+
+def test_unpolled_tickets_expire():
+    controller = AdmissionController(Load(1), {"rooms": 1}, queue_size=1, ticket_ttl=0)
+    ticket = controller.request({"topic": "a"}, create)["ticket"]
+
+    assert controller.poll(ticket, create) == {"status": "expired"}
+    assert controller.metrics()["expired"] == 1
+
+
+def test_failed_create_keeps_ticket_at_front():
+    load = Load(1)
+    controller = AdmissionController(load, {"rooms": 1}, queue_size=2)
+    first = controller.request({"topic": "a"}, create)["ticket"]
+    controller.request({"topic": "b"}, create)
+    load.rooms = 0
+
+    def broken(payload):
+        raise RuntimeError("no capacity")
+
+    with pytest.raises(RuntimeError):
+        controller.poll(first, broken)
+    assert list(controller.waiting)[0] == first
+    assert controller.creating == 0
+
+
+def test_create_runs_outside_the_lock():
+    controller = AdmissionController(Load(0), {"rooms": 5})
+
+    def check(payload):
+        assert not controller.lock.locked()
+        return "ok"
+
+    assert controller.request({"topic": "a"}, check)["result"] == "ok"
+
+
+def test_rooms_being_created_count_against_the_limit():
+    controller = AdmissionController(Load(0), {"rooms": 1}, queue_size=1)
+    entered = threading.Event()
+    release = threading.Event()
+    results = []
+
+    def slow(payload):
+        entered.set()
+        release.wait(2)
+        return payload["topic"]
+
+    thread = threading.Thread(
+        target=lambda: results.append(controller.request({"topic": "a"}, slow))
+    )
+    thread.start()
+    assert entered.wait(2)
+
+    # 첫 방이 아직 만들어지는 중이어도 한도에 포함
+    assert controller.request({"topic": "b"}, create)["status"] == "waiting"
+    release.set()
+    thread.join(2)
+
+    assert results == [{"status": "admitted", "result": "a"}]
+    assert controller.creating == 0
+
+
+def test_cancel_frees_the_queue_position():
+    controller = AdmissionController(Load(1), {"rooms": 1}, queue_size=2)
+    first = controller.request({"topic": "a"}, create)["ticket"]
+    second = controller.request({"topic": "b"}, create)["ticket"]
+
+    assert controller.cancel(first)
+    assert not controller.cancel(first)
+    assert controller.poll(second, create)["position"] == 1
+    assert controller.poll(first, create) == {"status": "expired"}
+    assert controller.metrics()["cancelled"] == 1
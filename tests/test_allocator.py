@@ -0,0 +1,72 @@
+import pytest
+
+from source.allocator import RoomCapacityError, RoomIdAllocator
+
+
+def drain(allocator):
+    return [allocator.allocate() for _ in range(allocator.capacity)]
+
+
+def test_issues_every_code_once():
+    allocator = RoomIdAllocator(length=4, alphabet="ABC")
+
+    codes = drain(allocator)
+
+    assert len(set(codes)) == allocator.capacity == 81
+    assert all(len(code) == 4 and set(code) <= set("ABC") for code in codes)
+    with pytest.raises(RoomCapacityError):
+        allocator.allocate()
+
+
+def test_order_depends_on_key():
+    first = drain(RoomIdAllocator(length=3, alphabet="ABCDEF", key=b"one"))
+    second = drain(RoomIdAllocator(length=3, alphabet="ABCDEF", key=b"two"))
+    same = drain(RoomIdAllocator(length=3, alphabet="ABCDEF", key=b"one"))
+
+    assert first == same
+    assert first != second
+
+
+def test_consecutive_codes_have_no_constant_stride():
+    allocator = RoomIdAllocator(length=4, alphabet="ABCDEFGHIJ", key=b"secret")
+    indexes = [allocator._decode(allocator.allocate()) for _ in range(50)]
+
+    strides = {(b - a) % allocator.capacity for a, b in zip(indexes, indexes[1:])}
+    assert len(strides) > 40
+
+
+def test_released_code_is_reused():
+    allocator = RoomIdAllocator(length=2, alphabet="AB")
+    code = allocator.allocate()
+
+    allocator.release(code)
+
+    assert allocator.allocate() == code
+    assert allocator.metrics()["occupied"] == 1
+
+
+def test_release_ignores_unknown_codes():
+    allocator = RoomIdAllocator(length=2, alphabet="AB")
+    allocator.release("ZZ")
+    allocator.release("AAA")
+    allocator.release("AB")
+
+    assert allocator.metrics()["occupied"] == 0
+
+
+def test_conflicted_code_is_retried_after_fresh_codes():
+    allocator = RoomIdAllocator(length=2, alphabet="AB")
+    taken = allocator.allocate()
+    allocator.conflict(taken)
+
+    rest = [allocator.allocate() for _ in range(allocator.capacity - 1)]
+
+    assert taken not in rest
+    assert allocator.allocate() == taken
+    with pytest.raises(RoomCapacityError):
+        allocator.allocate()
+
+
+def test_rejects_invalid_alphabet():
+    with pytest.raises(ValueError):
+        RoomIdAllocator(length=2, alphabet="AA")
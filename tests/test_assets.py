@@ -0,0 +1,100 @@
+import gzip
+import json
+
+import flask
+import pytest
+
+from source import assets
+
+
+@pytest.fixture
+def static(tmp_path):
+    root = tmp_path / "static"
+    (root / "js").mkdir(parents=True)
+    (root / "Avatar.png").write_bytes(b"\x89PNG avatar")
+    (root / "js" / "constants.js").write_text(
+        "export const AVATAR = new URL('../Avatar.png', import.meta.url).href;\n"
+    )
+    (root / "js" / "utils.js").write_text(
+        "import { AVATAR } from './constants.js';\n"
+        "export const avatar = () => AVATAR;\n" + "// padding\n" * 40
+    )
+    return root
+
+
+def build(static):
+    return assets.build(str(static), str(static / "dist"))
+
+
+def read(static, manifest, name):
+    return (static / "dist" / manifest["files"][name]).read_text()
+
+
+def test_build_fingerprints_and_rewrites_references(static):
+    manifest = build(static)
+    files = manifest["files"]
+
+    assert set(files) == {"Avatar.png", "js/constants.js", "js/utils.js"}
+    assert files["Avatar.png"].startswith("Avatar.") and files["Avatar.png"].endswith(".png")
+    assert f"'../{files['Avatar.png']}'" in read(static, manifest, "js/constants.js")
+    hashed_constants = files["js/constants.js"].split("/")[-1]
+    assert f"'./{hashed_constants}'" in read(static, manifest, "js/utils.js")
+
+    saved = json.loads((static / "dist" / "manifest.json").read_text())
+    assert saved["files"] == files
+
+
+def test_referenced_file_change_changes_importer_hash(static):
+    before = build(static)["files"]
+    (static / "Avatar.png").write_bytes(b"\x89PNG other avatar")
+    after = build(static)["files"]
+
+    assert before["Avatar.png"] != after["Avatar.png"]
+    assert before["js/constants.js"] != after["js/constants.js"]
+    assert before["js/utils.js"] != after["js/utils.js"]
+
+
+def test_only_large_text_files_are_compressed(static):
+    manifest = build(static)
+    utils = manifest["files"]["js/utils.js"]
+
+    assert "gzip" in manifest["encodings"][utils]
+    assert manifest["files"]["Avatar.png"] not in manifest["encodings"]
+    assert manifest["files"]["js/constants.js"] not in manifest["encodings"]
+    compressed = (static / "dist" / (utils + ".gz")).read_bytes()
+    assert gzip.decompress(compressed).decode() == read(static, manifest, "js/utils.js")
+
+
+def make_app(static):
+    app = flask.Flask(__name__, static_folder=str(static))
+    served = assets.Assets(str(static), str(static / "dist"))
+    served.init_app(app)
+    return app, served
+
+
+def test_urls_fall_back_to_static_without_build(static):
+    app, served = make_app(static)
+    with app.test_request_context():
+        assert served.url("js/utils.js") == "/static/js/utils.js"
+        assert served.url("vendor/io.js", "https://cdn.example/io.js") == "https://cdn.example/io.js"
+
+
+def test_serves_hashed_files_with_precompressed_variant(static):
+    manifest = build(static)
+    app, served = make_app(static)
+    with app.test_request_context():
+        url = served.url("js/utils.js")
+    assert url == "/assets/" + manifest["files"]["js/utils.js"]
+
+    client = app.test_client()
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Cache-Control"] == assets.CACHE_CONTROL
+    assert "javascript" in response.mimetype
+
+    plain = client.get(url)
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_data(as_text=True) == read(static, manifest, "js/utils.js")
+
+    assert client.get("/assets/js/utils.js").status_code == 404
@@ -0,0 +1,74 @@
+import pytest
+
+from source.api import audio
+from source.api.audio import Capabilities, configure, select_profile
+
+OGG, MP3, WAV = "audio/ogg", "audio/mpeg", "audio/wav"
+
+
+@pytest.fixture(autouse=True)
+def profiles():
+    saved = dict(audio.PROFILES)
+    configure(
+        {
+            "default": "ogg_opus, 0, 1.0",
+            "low": "ogg_opus, 16000, 1.0",
+            "mp3": "mp3, 24000, 1.0",
+            "mp3_low": "mp3, 8000, 1.0",
+        }
+    )
+    yield
+    audio.PROFILES.clear()
+    audio.PROFILES.update(saved)
+
+
+@pytest.mark.parametrize(
+    "mimes, low_bandwidth, expected",
+    [
+        (None, False, "default"),
+        (None, True, "mp3_low"),
+        ({OGG}, False, "default"),
+        ({OGG}, True, "low"),
+        ({MP3}, False, "mp3"),
+        ({MP3}, True, "mp3_low"),
+        ({OGG, MP3}, False, "default"),
+        # 공통 형식이 어떤 profile 과도 겹치지 않으면 default
+        ({WAV}, False, "default"),
+        ({WAV}, True, "default"),
+        (set(), False, "default"),
+    ],
+)
+def test_select_profile(mimes, low_bandwidth, expected):
+    assert select_profile(mimes, low_bandwidth).name == expected
+
+
+def test_without_default_picks_highest_quality():
+    del audio.PROFILES["default"]
+    assert select_profile({OGG}).name == "low"
+    assert select_profile({MP3}).name == "mp3"
+
+
+def test_configure_always_keeps_default():
+    configure({"mp3": "mp3, 24000, 1.0"})
+    assert set(audio.PROFILES) == {"mp3", "default"}
+    assert audio.PROFILES["mp3"].mime == MP3
+
+
+def test_capabilities_follow_current_viewers():
+    capabilities = Capabilities()
+    assert capabilities.add("a", [OGG, MP3]).name == "default"
+    assert capabilities.add("b", [MP3]).name == "mp3"
+    assert capabilities.add("c", None, low_bandwidth=True).name == "mp3_low"
+
+    # 제한이 있던 시청자가 나가면 다시 넓어짐
+    assert capabilities.remove("c").name == "mp3"
+    assert capabilities.remove("b").name == "default"
+    assert capabilities.profile.name == "default"
+
+
+def test_capabilities_replace_on_reconnect_and_ignore_unknown_sid():
+    capabilities = Capabilities()
+    capabilities.add("a", [MP3], low_bandwidth=True)
+    assert capabilities.add("a", [OGG]).name == "default"
+    assert capabilities.remove("missing").name == "default"
+    assert capabilities.remove("a").name == "default"
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from source.api import cassette as _cassette
+from source.api.cassette import Cassette, CassetteMiss
+
+
+def record(directory, provider, request, value):
+    return Cassette(str(directory), mode="record").call(provider, request, lambda: value)
+
+
+def test_off_always_calls():
+    calls = []
+    value = Cassette(mode="off").call("openai", {"q": 1}, lambda: calls.append(1) or "live")
+
+    assert value == "live"
+    assert calls == [1]
+
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        Cassette(mode="rewind")
+
+
+def test_record_then_replay_round_trips_bytes(tmp_path):
+    response = {"text": "안녕", "audio": b"\x00\x01ogg", "usage": {"input": 3}}
+    assert record(tmp_path, "tts", {"text": "안녕", "voice": "A"}, response) == response
+
+    lines = (tmp_path / "tts.jsonl").read_text(encoding="utf-8").splitlines()
+    entry = json.loads(lines[0])
+    assert entry["response"]["audio"] == {"__bytes__": "AAFvZ2c="}
+    assert entry["latency"] >= 0
+
+    replay = Cassette(str(tmp_path), mode="replay")
+    assert replay.call("tts", {"voice": "A", "text": "안녕"}, pytest.fail) == response
+
+
+def test_replay_cycles_repeated_requests(tmp_path):
+    for answer in ("first", "second"):
+        record(tmp_path, "openai", {"q": "same"}, answer)
+
+    replay = Cassette(str(tmp_path), mode="replay")
+    answers = [replay.call("openai", {"q": "same"}, pytest.fail) for _ in range(3)]
+    assert answers == ["first", "second", "first"]
+
+
+def test_replay_miss(tmp_path):
+    record(tmp_path, "openai", {"q": "known"}, "ok")
+    replay = Cassette(str(tmp_path), mode="replay")
+
+    with pytest.raises(CassetteMiss):
+        replay.call("openai", {"q": "unknown"}, pytest.fail)
+    # provider 별로 따로 녹화됨
+    with pytest.raises(CassetteMiss):
+        replay.call("gemini", {"q": "known"}, pytest.fail)
+
+
+def test_recorded_speed_waits_for_latency(tmp_path, monkeypatch):
+    (tmp_path / "openai.jsonl").write_text(
+        json.dumps({"key": Cassette.make_key({"q": 1}), "latency": 0.25, "response": "ok"}) + "\n"
+    )
+    slept = []
+    monkeypatch.setattr(_cassette.time, "sleep", slept.append)
+
+    replay = Cassette(str(tmp_path), mode="replay", speed="recorded")
+    assert replay.call("openai", {"q": 1}, pytest.fail) == "ok"
+    assert slept == [0.25]
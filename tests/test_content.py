@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from source.content import Frame, FrameJSON, MessageContent, encode
+
+
+@pytest.fixture
+def message():
+    return MessageContent(
+        name="gpt", role="pros", message="찬성합니다", audio_base64="QUJD", timestamp="t"
+    )
+
+
+def test_encode_is_compact_and_keeps_unicode():
+    frame = encode({"a": [1, "가"]})
+    assert isinstance(frame, Frame)
+    assert frame == '{"a":[1,"가"]}'
+
+
+def test_framejson_embeds_frames_verbatim():
+    frame = encode({"seq": 1})
+    packet = ["pros-message", frame, {"room": "ABCD", "nested": [frame, None]}]
+
+    text = FrameJSON.dumps(packet)
+    assert text.count('{"seq":1}') == 2
+    assert FrameJSON.loads(text) == [
+        "pros-message",
+        {"seq": 1},
+        {"room": "ABCD", "nested": [{"seq": 1}, None]},
+    ]
+
+
+def test_framejson_matches_json_for_plain_values():
+    value = {"a": 1, "b": [True, None, 1.5, "x"], 3: "int key"}
+    assert json.loads(FrameJSON.dumps(value)) == json.loads(json.dumps(value))
+
+
+def test_frame_is_encoded_once(message):
+    assert message.frame is message.frame
+    assert json.loads(message.frame) == message.to_dict()
+
+
+def test_meta_drops_audio(message):
+    meta = json.loads(message.meta)
+    assert "audio_base64" not in meta
+    assert meta["has_audio"] is True
+    assert meta["message"] == "찬성합니다"
+
+
+def test_with_seq_returns_new_record_with_fresh_frames(message):
+    _ = message.frame
+    numbered = message.with_seq(7)
+
+    assert message.seq == 0
+    assert json.loads(numbered.frame)["seq"] == 7
+    assert json.loads(message.frame)["seq"] == 0
+
+
+def test_records_are_immutable_and_sized(message):
+    with pytest.raises(AttributeError):
+        message.seq = 3
+    assert message.size == len("찬성합니다".encode("utf-8")) + len("QUJD")
@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pytest
+
+from source.event import EventBus, Subscription
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+class Gate:
+    """첫 이벤트에서 drain 스레드를 붙잡아 두는 callback."""
+
+    def __init__(self):
+        self.received = []
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, data):
+        self.entered.set()
+        self.release.wait(2)
+        self.received.append(data)
+
+
+@pytest.fixture
+def bus():
+    bus = EventBus(maxsize=2)
+    yield bus
+    bus.close()
+
+
+def test_delivers_in_order(bus):
+    received = []
+    bus.subscribe("pros-response", received.append)
+
+    for seq in range(5):
+        bus.publish("pros-response", {"room": "A", "seq": seq})
+
+    assert wait_for(lambda: len(received) == 5)
+    assert [item["seq"] for item in received] == list(range(5))
+    assert bus.stats()["pros-response"]["delivered"] == 5
+
+
+def test_drop_oldest_discards_when_full():
+    gate = Gate()
+    subscription = Subscription("status", gate, maxsize=2, policy="drop-oldest")
+    subscription.put({"seq": 0})
+    assert gate.entered.wait(1)
+
+    for seq in range(1, 5):
+        subscription.put({"seq": seq})
+    gate.release.set()
+
+    assert wait_for(lambda: len(gate.received) == 3)
+    assert [item["seq"] for item in gate.received] == [0, 3, 4]
+    assert subscription.snapshot()["dropped"] == 2
+    subscription.close()
+
+
+def test_block_waits_for_room_in_queue():
+    gate = Gate()
+    subscription = Subscription("pros-response", gate, maxsize=1, policy="block")
+    subscription.put({"seq": 0})
+    assert gate.entered.wait(1)
+    subscription.put({"seq": 1})
+
+    publisher = threading.Thread(target=subscription.put, args=({"seq": 2},))
+    publisher.start()
+    publisher.join(0.1)
+    assert publisher.is_alive()
+
+    gate.release.set()
+    publisher.join(1)
+    assert wait_for(lambda: len(gate.received) == 3)
+    assert subscription.snapshot()["dropped"] == 0
+    subscription.close()
+
+
+def test_coalesce_replaces_pending_event_with_same_key():
+    gate = Gate()
+    subscription = Subscription(
+        "status", gate, policy="coalesce", key=lambda data: data["room"]
+    )
+    subscription.put({"room": "A", "value": 0})
+    assert gate.entered.wait(1)
+
+    subscription.put({"room": "A", "value": 1})
+    subscription.put({"room": "B", "value": 1})
+    subscription.put({"room": "A", "value": 2})
+    gate.release.set()
+
+    assert wait_for(lambda: len(gate.received) == 3)
+    assert gate.received == [
+        {"room": "A", "value": 0},
+        {"room": "A", "value": 2},
+        {"room": "B", "value": 1},
+    ]
+    subscription.close()
+
+
+def test_coalesce_without_key_keeps_every_message():
+    gate = Gate()
+    subscription = Subscription("pros-response", gate, policy="coalesce")
+    subscription.put({"room": "A", "seq": 0})
+    assert gate.entered.wait(1)
+
+    subscription.put({"room": "A", "seq": 1})
+    subscription.put({"room": "A", "seq": 2})
+    gate.release.set()
+
+    assert wait_for(lambda: len(gate.received) == 3)
+    assert subscription.policy == "block"
+    subscription.close()
+
+
+def test_failing_callback_is_counted_and_skipped(bus):
+    received = []
+
+    def callback(data):
+        if data["seq"] == 1:
+            raise RuntimeError("boom")
+        received.append(data)
+
+    bus.subscribe("pros-error", callback)
+    for seq in range(3):
+        bus.publish("pros-error", {"seq": seq})
+
+    assert wait_for(lambda: len(received) == 2)
+    stats = bus.stats()["pros-error"]
+    assert stats["errors"] == 1
+    assert stats["delivered"] == 2
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        Subscription("x", print, policy="lossy")
@@ -0,0 +1,94 @@
+import pytest
+from prometheus_client import CollectorRegistry
+from prometheus_client.parser import text_string_to_metric_families
+
+from source import metrics
+
+
+@pytest.fixture
+def registry():
+    return CollectorRegistry()
+
+
+@pytest.fixture
+def disabled():
+    metrics.configure(False)
+    yield
+    metrics.configure(True)
+
+
+def samples(registry) -> dict:
+    text = metrics.render(registry).decode()
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = metrics.Histogram("req_seconds", "Latency.", ["provider"], registry=registry)
+    latency.labels("openai").observe(0.02)
+    latency.labels("openai").observe(3)
+
+    result = samples(registry)
+    assert result[("req_seconds_bucket", (("le", "0.025"), ("provider", "openai")))] == 1
+    assert result[("req_seconds_bucket", (("le", "5.0"), ("provider", "openai")))] == 2
+    assert result[("req_seconds_bucket", (("le", "+Inf"), ("provider", "openai")))] == 2
+    assert result[("req_seconds_count", (("provider", "openai"),))] == 2
+    assert result[("req_seconds_sum", (("provider", "openai"),))] == pytest.approx(3.02)
+
+
+def test_custom_buckets_and_timer(registry):
+    size = metrics.Histogram("size_bytes", "Size.", buckets=(10, 100), registry=registry)
+    with size.time():
+        pass
+
+    result = samples(registry)
+    assert ("size_bytes_bucket", (("le", "100.0"),)) in result
+    assert result[("size_bytes_count", ())] == 1
+
+
+def test_counter_and_gauge(registry):
+    tokens = metrics.Counter("tokens_total", "Tokens.", ["kind"], registry=registry)
+    tokens.labels(kind="input").inc(3)
+    tokens.labels(kind="input").inc(2)
+    rooms = metrics.Gauge("rooms", "Rooms.", registry=registry)
+    rooms.set(4)
+    threads = metrics.Gauge("threads", "Threads.", registry=registry)
+    threads.set_function(lambda: 7)
+
+    result = samples(registry)
+    assert result[("tokens_total", (("kind", "input"),))] == 5
+    assert result[("rooms", ())] == 4
+    assert result[("threads", ())] == 7
+
+
+def test_label_values_are_escaped(registry):
+    counter = metrics.Counter("odd_total", "Odd.", ["model"], registry=registry)
+    counter.labels('a"b\\c').inc()
+
+    assert samples(registry)[("odd_total", (("model", 'a"b\\c'),))] == 1
+
+
+def test_disabled_observations_are_noops(registry, disabled):
+    latency = metrics.Histogram("off_seconds", "Off.", registry=registry)
+    counter = metrics.Counter("off_total", "Off.", registry=registry)
+    gauge = metrics.Gauge("off_gauge", "Off.", registry=registry)
+    latency.observe(1)
+    with latency.time():
+        pass
+    counter.inc()
+    gauge.set(3)
+
+    result = samples(registry)
+    assert result[("off_seconds_count", ())] == 0
+    assert result[("off_total", ())] == 0
+    assert result[("off_gauge", ())] == 0
+
+
+def test_module_metrics_use_own_registry():
+    from prometheus_client import REGISTRY as GLOBAL
+
+    assert GLOBAL.get_sample_value("llm_request_seconds_count") is None
+    assert b"# TYPE llm_request_seconds histogram" in metrics.render()
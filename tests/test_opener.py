@@ -0,0 +1,219 @@
+import itertools
+
+import pytest
+
+from source import worker
+from source.api.audio import AudioProfile
+from source.opener import OpenerCache, OpenerWarmer, make_key, opening_message
+from source.resilience import Policy
+
+OPUS = AudioProfile("default")
+LOW = AudioProfile("low", "MP3", 8000)
+
+
+class FakeModel:
+    provider = "openai"
+
+    def __init__(self, model_name="gpt-test", answers=None):
+        self.model_name = model_name
+        self.system_prompt = None
+        self.answers = answers or itertools.count(1)
+        self.calls = []
+        self.history = []
+        self.closed = False
+
+    def set_system_prompt(self, prompt):
+        self.system_prompt = prompt
+
+    def get_response(self, text):
+        self.calls.append(text)
+        return f"{self.model_name} 발언 {next(self.answers)}"
+
+    def import_history(self, items):
+        self.history.extend(items)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeTTS:
+    provider = "tts"
+
+    def __init__(self, voice="ko-KR-Standard-A"):
+        self.config = {"voice": voice}
+        self.requests = []
+        self.closed = False
+
+    def request(self, text, profile=None):
+        self.requests.append((text, profile.name))
+        return f"{profile.name}:{text}".encode("utf-8")
+
+    def decode(self, audio):
+        return audio.decode("utf-8")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OpenerCache(str(tmp_path))
+
+
+def test_key_depends_on_every_input():
+    model, tts = FakeModel(), FakeTTS()
+    model.set_system_prompt("찬성")
+    base = make_key(model, tts, opening_message("A"), OPUS)
+    assert make_key(model, tts, opening_message("A"), OPUS) == base
+
+    other_model = FakeModel("gemini-test")
+    other_model.set_system_prompt("찬성")
+    other_prompt = FakeModel()
+    other_prompt.set_system_prompt("반대")
+    variants = [
+        make_key(other_model, tts, opening_message("A"), OPUS),
+        make_key(other_prompt, tts, opening_message("A"), OPUS),
+        make_key(model, FakeTTS("ko-KR-Standard-C"), opening_message("A"), OPUS),
+        make_key(model, tts, opening_message("A"), LOW),
+        make_key(model, tts, opening_message("B"), OPUS),
+    ]
+    assert base not in variants
+    assert len(set(variants)) == len(variants)
+
+
+def test_pick_returns_stored_opener(cache):
+    model, tts = FakeModel(), FakeTTS()
+    text = opening_message("A")
+    item = {"message": "미리 만든 발언", "audio_base64": "QUJD", "audio_type": "audio/ogg"}
+
+    assert cache.pick(model, tts, text, OPUS) is None
+    cache.add(make_key(model, tts, text, OPUS), item)
+    assert cache.pick(model, tts, text, OPUS) == item
+    # 다른 profile 은 여전히 miss
+    assert cache.pick(model, tts, text, LOW) is None
+
+
+def test_disabled_cache_never_picks(tmp_path):
+    model, tts = FakeModel(), FakeTTS()
+    text = opening_message("A")
+    OpenerCache(str(tmp_path)).add(make_key(model, tts, text, OPUS), {"message": "x"})
+
+    assert OpenerCache(str(tmp_path), enabled=False).pick(model, tts, text, OPUS) is None
+
+
+class FakeRoom:
+    room_id = "ROOM"
+    event_bus = None
+    audio_profile = OPUS
+
+    def __init__(self):
+        self.policy = Policy(retries=0)
+        self.messages = []
+        self.worker = None
+
+    def append_message(self, record):
+        self.messages.append(record)
+        # 첫 발언만 보고 worker 를 끝냄
+        self.worker.stop()
+        return record
+
+
+def first_turn(model, tts, item):
+    room = FakeRoom()
+    room.worker = worker.ModelWorker(room, "pros", model, tts)
+    room.worker.enqueue_input(opening_message("A"), item)
+    room.worker.start()
+    room.worker.thread.join(2)
+    assert not room.worker.is_alive()
+    return room.messages[0]
+
+
+def test_miss_falls_back_to_live_generation(cache):
+    model, tts = FakeModel(), FakeTTS()
+    item = cache.pick(model, tts, opening_message("A"), OPUS)
+
+    record = first_turn(model, tts, item)
+    assert model.calls == [opening_message("A")]
+    assert record.message == "gpt-test 발언 1"
+    assert tts.requests == [("gpt-test 발언 1", "default")]
+
+
+def test_hit_skips_generation_and_synthesis(cache):
+    model, tts = FakeModel(), FakeTTS()
+    text = opening_message("A")
+    cache.add(
+        make_key(model, tts, text, OPUS),
+        {"message": "미리 만든 발언", "audio_base64": "QUJD", "audio_type": "audio/ogg"},
+    )
+
+    record = first_turn(model, tts, cache.pick(model, tts, text, OPUS))
+    assert model.calls == []
+    assert tts.requests == []
+    assert (record.message, record.audio_base64) == ("미리 만든 발언", "QUJD")
+    assert model.history == [("user", text), ("assistant", "미리 만든 발언")]
+
+
+def make_warmer(cache, **kwargs):
+    built = []
+    answers = {}
+    tts = FakeTTS()
+
+    def build_model(name):
+        if name == "broken":
+            raise ConnectionError("no credentials")
+        model = FakeModel(f"{name}-test", answers=answers.setdefault(name, itertools.count(1)))
+        built.append(model)
+        return model
+
+    warmer = OpenerWarmer(
+        cache,
+        ["A", "B"],
+        build_model,
+        lambda voice: tts,
+        prompt="찬성",
+        voice=tts.config["voice"],
+        profiles=[OPUS, LOW],
+        **kwargs,
+    )
+    return warmer, built, tts
+
+
+def test_warmer_fills_every_profile_up_to_count(cache):
+    warmer, built, tts = make_warmer(cache, models=("gpt",), count=2)
+
+    # 주제 2 개 x 발언 2 개 x profile 2 개
+    assert warmer.run() == 8
+    assert all(model.closed for model in built)
+    assert tts.closed
+
+    model = FakeModel("gpt-test")
+    model.set_system_prompt("찬성")
+    key = make_key(model, tts, opening_message("A"), LOW)
+    items = cache.load(key)
+    assert [item["message"] for item in items] == ["gpt-test 발언 1", "gpt-test 발언 2"]
+    assert items[0]["audio_base64"] == "low:gpt-test 발언 1"
+    assert items[0]["audio_type"] == "audio/mpeg"
+
+    # 이미 채워졌으면 다시 생성하지 않음
+    assert warmer.run() == 0
+
+
+def test_warmer_only_fills_missing_profiles(cache):
+    warmer, built, tts = make_warmer(cache, models=("gpt",), count=1)
+    model = FakeModel("gpt-test")
+    model.set_system_prompt("찬성")
+    for topic in ("A", "B"):
+        cache.add(make_key(model, tts, opening_message(topic), OPUS), {"message": "x"})
+
+    assert warmer.run() == 2
+    assert {name for _, name in tts.requests} == {"low"}
+
+
+def test_warmer_skips_failing_models_and_stops(cache):
+    warmer, built, tts = make_warmer(cache, models=("broken", "gpt"), count=1)
+    assert warmer.run() == 4
+
+    stopped, _, _ = make_warmer(cache, count=1)
+    stopped.stop()
+    assert stopped.run() == 0
+
@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from source.content import MessageContent
+from source.playback import Playback
+
+
+def say(playback, role, text="발언"):
+    return playback.append(MessageContent(name=role, role=role, message=text, timestamp="t"))
+
+
+@pytest.fixture
+def playback():
+    playback = Playback(limit=4)
+    playback.join("a")
+    playback.join("b")
+    return playback
+
+
+def test_append_numbers_messages_and_tracks_size(playback):
+    first = say(playback, "pros", "가")
+    second = say(playback, "cons", "나")
+
+    assert (first.seq, second.seq) == (1, 2)
+    assert playback.find(2) == second
+    assert playback.size == first.size + second.size
+
+
+def test_ring_drops_oldest_messages():
+    playback = Playback(limit=2)
+    for role in ("pros", "cons", "pros"):
+        say(playback, role)
+
+    assert playback.find(1) is None
+    assert [playback.find(seq).seq for seq in (2, 3)] == [2, 3]
+    assert playback.find(4) is None
+    assert playback.size == 2 * len("발언".encode("utf-8"))
+
+
+def test_since_returns_only_newer_metadata(playback):
+    for role in ("pros", "cons", "pros"):
+        say(playback, role)
+
+    assert [json.loads(meta)["seq"] for meta in playback.since(1)] == [2, 3]
+    assert playback.since(3) == []
+    assert "audio_base64" not in json.loads(playback.since(0)[0])
+
+
+def test_since_behind_the_ring_returns_what_is_left(playback):
+    for role in ("pros", "cons") * 3:
+        say(playback, role)
+
+    # 1, 2 는 이미 밀려났으므로 남아 있는 3..6 을 모두 돌려줌
+    assert [json.loads(meta)["seq"] for meta in playback.since(1)] == [3, 4, 5, 6]
+
+
+def test_pending_reports_other_viewers_playing(playback):
+    assert playback.pending("a") is None
+    say(playback, "pros")
+
+    # 발언을 실시간으로 받은 a, b 가 재생 중
+    assert playback.pending("a") == {"seq": 1, "role": "pros", "playing": True}
+    playback.leave("b")
+    assert playback.pending("a")["playing"] is False
+
+
+def test_reconnect_after_broadcast_is_not_a_listener(playback):
+    playback.leave("a")
+    say(playback, "pros")
+    playback.leave("b")
+    playback.join("a")
+
+    # 재접속한 시청자는 아무도 재생 중이 아니므로 직접 재생해야 함
+    assert playback.pending("a") == {"seq": 1, "role": "pros", "playing": False}
+
+
+def test_acknowledge_by_seq_is_idempotent(playback):
+    say(playback, "pros")
+    say(playback, "cons")
+
+    assert playback.acknowledge("pros", 1) == "pros"
+    # 다른 시청자의 늦은/중복 complete 는 다음 차례를 깨우지 않음
+    assert playback.acknowledge("pros", 1) is None
+    assert playback.pending("a")["seq"] == 2
+    assert playback.acknowledge("cons", 2) == "cons"
+    assert playback.pending("a") is None
+
+
+def test_acknowledge_clears_listeners(playback):
+    say(playback, "pros")
+    say(playback, "cons")
+
+    playback.acknowledge("pros", 1)
+    assert playback.pending("a") == {"seq": 2, "role": "cons", "playing": False}
+
+
+def test_legacy_acknowledge_without_seq_uses_role(playback):
+    say(playback, "pros")
+    say(playback, "cons")
+
+    assert playback.acknowledge("cons") is None
+    assert playback.acknowledge("pros") == "pros"
+    assert playback.pending("a")["role"] == "cons"
+
+
+def test_acknowledge_skips_messages_dropped_from_the_ring():
+    playback = Playback(limit=2)
+    for role in ("pros", "cons", "pros"):
+        say(playback, role)
+
+    assert playback.pending() == {"seq": 2, "role": "cons", "playing": False}
+    assert playback.acknowledge("cons", 2) == "cons"
+    assert playback.acknowledge("pros", 3) == "pros"
+    assert playback.pending() is None
+
+
+def test_clear_empties_everything(playback):
+    say(playback, "pros")
+    playback.clear()
+
+    assert len(playback) == 0
+    assert playback.pending() is None
+    assert playback.size == 0
@@ -0,0 +1,83 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from source import profiler
+
+
+def current_tags():
+    return dict(profiler._TAGS.get(threading.get_ident()) or {})
+
+
+def test_tagged_nests_and_restores():
+    with profiler.tagged(room="ABCD"):
+        with profiler.tagged(role="pros"):
+            assert current_tags() == {"room": "ABCD", "role": "pros"}
+        assert current_tags() == {"room": "ABCD"}
+    assert current_tags() == {}
+
+
+def test_bind_carries_tags_into_pool_threads():
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with profiler.tagged(room="ABCD", role="evaluate"):
+            tagged = pool.submit(profiler.bind(current_tags)).result()
+        untagged = pool.submit(current_tags).result()
+
+    assert tagged == {"room": "ABCD", "role": "evaluate"}
+    # 작업이 끝나면 pool 스레드의 tag 는 지워짐
+    assert untagged == {}
+
+
+def test_bind_without_tags_returns_function():
+    assert profiler.bind(current_tags) is current_tags
+
+
+@pytest.fixture
+def sleeper():
+    started = threading.Event()
+    stop = threading.Event()
+
+    def idle():
+        with profiler.tagged(room="WXYZ", role="cons"):
+            started.set()
+            stop.wait(5)
+
+    thread = threading.Thread(target=idle, name="sleeper", daemon=True)
+    thread.start()
+    assert started.wait(2)
+    yield thread
+    stop.set()
+    thread.join(2)
+
+
+def test_sample_labels_stacks_with_tags(sleeper):
+    profile = profiler.sample(0.05, interval=0.01)
+
+    assert profile.count > 0
+    labels = {label for label, _ in profile.samples}
+    assert ("room:WXYZ", "role:cons", "thread:sleeper") in labels
+    assert "room:WXYZ;role:cons;thread:sleeper;" in profile.collapsed()
+
+    speedscope = profile.speedscope()
+    names = [item["name"] for item in speedscope["profiles"]]
+    assert "room:WXYZ role:cons thread:sleeper" in names
+    frames = speedscope["shared"]["frames"]
+    indexes = [
+        index for item in speedscope["profiles"] for stack in item["samples"] for index in stack
+    ]
+    assert indexes and all(0 <= index < len(frames) for index in indexes)
+
+
+def test_only_one_profile_at_a_time():
+    with profiler._LOCK:
+        with pytest.raises(profiler.ProfilerBusy):
+            profiler.sample(0.01)
+
+
+def test_threads_reports_tags_and_waiting_state(sleeper):
+    info = next(item for item in profiler.threads() if item["name"] == "sleeper")
+
+    assert info["tags"] == {"room": "WXYZ", "role": "cons"}
+    assert info["state"] == "waiting"
+    assert info["stack"]
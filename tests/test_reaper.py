@@ -0,0 +1,66 @@
+from source.reaper import RoomReaper
+
+
+class FakeRoom:
+    def __init__(self, age=0.0, idle=0.0, members=0):
+        self.usage = {"age": age, "idle": idle, "members": members}
+
+    def resources(self):
+        return self.usage
+
+
+class FakeManager:
+    def __init__(self, rooms):
+        self.rooms = rooms
+        self.removed = []
+
+    def list_rooms(self):
+        return list(self.rooms)
+
+    def get_room(self, room_id):
+        return self.rooms.get(room_id)
+
+    def remove_room(self, room_id):
+        self.removed.append(room_id)
+        self.rooms.pop(room_id)
+
+
+def test_reaps_idle_and_old_rooms():
+    manager = FakeManager(
+        {
+            "IDLE": FakeRoom(idle=700),
+            "OLD": FakeRoom(age=4000),
+            "LIVE": FakeRoom(age=10, idle=1),
+        }
+    )
+    reaper = RoomReaper(manager, idle_ttl=600, max_lifetime=3600)
+
+    assert sorted(reaper.reap()) == ["IDLE", "OLD"]
+    assert manager.list_rooms() == ["LIVE"]
+
+
+def test_keeps_rooms_with_members():
+    manager = FakeManager({"WATCHED": FakeRoom(age=4000, idle=700, members=1)})
+    reaper = RoomReaper(manager, idle_ttl=600, max_lifetime=3600)
+
+    assert reaper.reap() == []
+    assert manager.removed == []
+
+
+def test_zero_ttl_disables_check():
+    manager = FakeManager({"IDLE": FakeRoom(age=10**6, idle=10**6)})
+    reaper = RoomReaper(manager, idle_ttl=0, max_lifetime=0)
+
+    assert reaper.reap() == []
+
+
+def test_failed_removal_does_not_stop_the_sweep():
+    class Broken(FakeManager):
+        def remove_room(self, room_id):
+            if room_id == "A":
+                raise RuntimeError("boom")
+            super().remove_room(room_id)
+
+    manager = Broken({"A": FakeRoom(idle=700), "B": FakeRoom(idle=700)})
+
+    assert RoomReaper(manager, idle_ttl=600).reap() == ["B"]
@@ -0,0 +1,254 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from source import resilience, worker
+from source.api.audio import DEFAULT_PROFILE
+from source.resilience import CircuitBreaker, CircuitOpenError, Policy, RetryBudget
+
+
+class Flaky:
+    def __init__(self, failures, result="ok"):
+        self.failures = failures
+        self.result = result
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError(f"failure {self.calls}")
+        return self.result
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    # 가장 긴 backoff 를 고르고 실제로 잠들지 않음
+    recorded = []
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    monkeypatch.setattr(resilience.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_retries_with_exponential_backoff(delays):
+    policy = Policy(retries=2, backoff=0.5, threshold=10)
+    fn = Flaky(failures=2)
+
+    assert policy.call("openai", fn) == "ok"
+    assert fn.calls == 3
+    assert delays == [0.5, 1.0]
+    assert policy.stats()["openai"] == {"state": "closed", "failures": 0}
+
+
+def test_gives_up_after_retries(delays):
+    policy = Policy(retries=2, backoff=0.0, threshold=10)
+    fn = Flaky(failures=10)
+
+    with pytest.raises(ConnectionError, match="failure 3"):
+        policy.call("openai", fn)
+    assert fn.calls == 3
+
+
+def test_retry_budget_limits_retries(delays):
+    policy = Policy(retries=10, backoff=0.0, budget_ratio=0.0, threshold=100)
+    fn = Flaky(failures=100)
+
+    with pytest.raises(ConnectionError):
+        policy.call("openai", fn)
+    # 처음 적립된 3 개만큼만 재시도
+    assert fn.calls == 4
+
+    fn.calls = 0
+    with pytest.raises(ConnectionError):
+        policy.call("openai", fn)
+    assert fn.calls == 1
+
+
+def test_budget_refills_per_request():
+    budget = RetryBudget(ratio=0.5, minimum=0.0, maximum=1.0)
+    assert not budget.withdraw()
+    budget.deposit()
+    budget.deposit()
+    budget.deposit()
+    assert budget.withdraw()
+    assert not budget.withdraw()
+
+
+def test_breaker_opens_and_rejects(delays):
+    policy = Policy(retries=0, threshold=2, reset_timeout=60)
+    fn = Flaky(failures=2)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            policy.call("gemini", fn)
+
+    with pytest.raises(CircuitOpenError):
+        policy.call("gemini", fn)
+    assert fn.calls == 2
+    assert policy.stats()["gemini"]["state"] == "open"
+
+
+def test_breaker_half_open_allows_one_probe():
+    breaker = CircuitBreaker("gemini", threshold=1, reset_timeout=60)
+    breaker.failure()
+    assert not breaker.allow()
+
+    breaker.opened_at -= 60
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker("gemini", threshold=3, reset_timeout=60)
+    for _ in range(3):
+        breaker.failure()
+    breaker.opened_at -= 60
+    assert breaker.allow()
+
+    breaker.failure()
+    assert breaker.state == "open"
+
+
+class FakeModel:
+    def __init__(self, provider, fn):
+        self.provider = provider
+        self.model_name = f"{provider}-test"
+        self.get_response = fn
+        self.history = []
+
+    def import_history(self, items):
+        self.history.extend(items)
+
+
+class FakeBus:
+    def __init__(self):
+        self.events = []
+
+    def publish(self, event, data):
+        self.events.append((event, data["data"]))
+
+
+class FakeRoom:
+    room_id = "ROOM"
+    audio_profile = DEFAULT_PROFILE
+
+    def __init__(self, policy, alternate):
+        self.policy = policy
+        self.alternate = alternate
+        self.event_bus = FakeBus()
+        self.stopped = False
+        self.workers = []
+        self.messages = []
+
+    def append_message(self, record):
+        self.messages.append(record)
+        # 시청자가 바로 재생을 끝낸 것처럼 다음 차례를 깨움
+        self.workers[0].set_event()
+        return record
+
+    def failover_model(self, role):
+        self.workers[0].set_model(self.alternate)
+        return self.alternate
+
+    def stop_threads(self):
+        self.stopped = True
+        for item in self.workers:
+            item.stop()
+
+
+def make_worker(primary, alternate, failover=True, tts=None):
+    room = FakeRoom(Policy(retries=0, backoff=0.0, failover=failover), alternate)
+    model_worker = worker.ModelWorker(room, "pros", FakeModel("openai", primary), tts=tts)
+    room.workers.append(model_worker)
+    return room, model_worker
+
+
+def test_worker_fails_over_to_other_provider():
+    room, model_worker = make_worker(Flaky(failures=1), FakeModel("gemini", Flaky(0, "hi")))
+
+    assert model_worker.generate("topic") == "hi"
+    assert model_worker.model is room.alternate
+    assert [data["fatal"] for _, data in room.event_bus.events] == [False]
+
+
+def test_worker_ends_debate_when_every_provider_fails():
+    room, model_worker = make_worker(Flaky(failures=10), FakeModel("gemini", Flaky(10)))
+    model_worker.enqueue_input("topic")
+    model_worker.input_queue.put((0.0, "next", None))
+
+    model_worker.start()
+    model_worker.thread.join(2)
+
+    assert not model_worker.is_alive()
+    assert room.stopped
+    event, data = room.event_bus.events[-1]
+    assert event == "pros-error"
+    assert data["fatal"]
+    assert sum(data["fatal"] for _, data in room.event_bus.events) == 1
+
+
+def test_worker_counts_inflight_calls():
+    seen = []
+    room, model_worker = make_worker(lambda text: seen.append(model_worker.inflight) or "ok", None)
+
+    assert model_worker.generate("topic") == "ok"
+    assert seen == [1]
+    assert model_worker.inflight == 0
+
+
+def test_backlog_counts_only_live_work():
+    gate = threading.Event()
+
+    def blocked(text):
+        # 응답이 없으면 worker 가 토론을 끝내고 종료함
+        gate.wait(5)
+
+    room, model_worker = make_worker(blocked, None)
+    model_worker.enqueue_input("topic")
+    model_worker.input_queue.put((0.0, "next", None))
+    # 시작 전(또는 끝난 뒤)의 worker 는 queue 에 무엇이 남아 있어도 0
+    assert model_worker.backlog() == 0
+
+    model_worker.start()
+    deadline = time.monotonic() + 2
+    while model_worker.inflight == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    model_worker.input_queue.put(None)
+    # 응답을 기다리는 호출 1 + 대기 중인 발언 1, stop sentinel 은 세지 않음
+    assert model_worker.backlog() == 2
+
+    gate.set()
+    model_worker.thread.join(2)
+    assert not model_worker.is_alive()
+    assert model_worker.input_queue.qsize() > 0
+    assert model_worker.backlog() == 0
+
+
+class DownTTS:
+    provider = "tts"
+
+    def request(self, text, profile=None):
+        raise ConnectionError("tts unavailable")
+
+
+def test_tts_outage_sends_text_and_keeps_debating():
+    room, model_worker = make_worker(Flaky(0, "hi"), None, tts=DownTTS())
+    model_worker.set_output_queue(queue.Queue())
+    model_worker.enqueue_input("topic")
+
+    model_worker.start()
+    # 음성 없이 발언하고 상대 차례로 넘어감
+    _, response, _ = model_worker.output_queue.get(timeout=2)
+    model_worker.stop()
+
+    assert response == "hi"
+    assert not room.stopped
+    assert [(record.message, record.audio_base64) for record in room.messages] == [("hi", "")]
+    (error, data), (response_event, _) = room.event_bus.events
+    assert (error, response_event) == ("pros-error", "pros-response")
+    assert (data["kind"], data["fatal"]) == ("tts", False)
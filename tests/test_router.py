@@ -0,0 +1,116 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from source import profiler
+from source.api.router import Endpoint, LLMRouter
+
+
+class FakeClient:
+    """chat.completions.create 만 흉내 내는 OpenAI client."""
+
+    def __init__(self, answer="ok", error=None, gate=None):
+        self.answer = answer
+        self.error = error
+        self.gate = gate
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, extra_body=None):
+        self.calls.append(dict(profiler._TAGS.get(threading.get_ident()) or {}))
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        message = SimpleNamespace(content=self.answer)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def make_router(*clients, **kwargs):
+    fallbacks = [("vllm", f"fallback-{index}") for index in range(1, len(clients))]
+    router = LLMRouter(model="primary", base="vllm", fallbacks=fallbacks, **kwargs)
+    for endpoint, client in zip(router.endpoints, clients):
+        endpoint.client = client
+    return router
+
+
+@pytest.fixture
+def gate():
+    gate = threading.Event()
+    yield gate
+    gate.set()
+
+
+def test_single_endpoint_calls_directly():
+    client = FakeClient("hello")
+    router = make_router(client)
+
+    assert router.get_response("hi") == "hello"
+    assert len(client.calls) == 1
+
+
+def test_falls_back_when_primary_fails():
+    primary = FakeClient(error=ConnectionError("down"))
+    fallback = FakeClient("from fallback")
+    router = make_router(primary, fallback)
+
+    assert router.get_response("hi") == "from fallback"
+    assert router.endpoints[0].health < 1.0
+    assert router.endpoints[1].stats()["p50"] is not None
+
+
+def test_raises_last_error_when_every_endpoint_fails():
+    router = make_router(
+        FakeClient(error=ConnectionError("first")), FakeClient(error=TimeoutError("second"))
+    )
+
+    with pytest.raises(TimeoutError, match="second"):
+        router.get_response("hi")
+
+
+def test_hedges_slow_primary(gate):
+    primary = FakeClient("slow", gate=gate)
+    hedge = FakeClient("fast")
+    router = make_router(primary, hedge, hedge_percentile=99, hedge_min_delay=0.05)
+
+    assert router.get_response("hi") == "fast"
+    assert len(primary.calls) == 1
+    assert len(hedge.calls) == 1
+
+
+def test_no_hedge_without_percentile(gate):
+    primary = FakeClient("slow", gate=gate)
+    hedge = FakeClient("fast")
+    router = make_router(primary, hedge)
+
+    threading.Timer(0.1, gate.set).start()
+    assert router.get_response("hi") == "slow"
+    assert hedge.calls == []
+
+
+def test_unhealthy_endpoints_go_last():
+    router = make_router(FakeClient(), FakeClient(), FakeClient())
+    router.endpoints[0].health = 0.1
+
+    assert router._candidates() == [router.endpoints[1], router.endpoints[2], router.endpoints[0]]
+
+
+def test_hedge_deadline_uses_latency_percentile():
+    endpoint = Endpoint("vllm", {"url": "http://localhost:8000/v1"}, "m", key="")
+    endpoint.record(0.5)
+    assert endpoint.deadline(99, minimum=0.2) == 0.2
+
+    for _ in range(20):
+        endpoint.record(2.0)
+    assert endpoint.deadline(50, minimum=0.2) == pytest.approx(2.0)
+
+
+def test_pool_calls_keep_profiler_tags():
+    primary = FakeClient(error=ConnectionError("down"))
+    fallback = FakeClient("ok")
+    router = make_router(primary, fallback)
+
+    with profiler.tagged(room="ABCD", role="evaluate"):
+        router.get_response("hi")
+    assert fallback.calls == [{"room": "ABCD", "role": "evaluate"}]
@@ -0,0 +1,105 @@
+import pytest
+
+from source import state
+from tests.resp import FakeRedis
+
+
+@pytest.fixture
+def redis():
+    server = FakeRedis()
+    yield server
+    server.close()
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        yield state.MemoryBackend()
+        return
+    server = FakeRedis()
+    backend = state.create_backend(server.url)
+    yield backend
+    backend.conn.close()
+    server.close()
+
+
+def test_backend_requires_every_method():
+    class Partial(state.StateBackend):
+        def claim_room(self, room_id, meta):
+            return True
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_claim_room_only_once(backend):
+    assert backend.claim_room("ABCD", {"node": "a"})
+    assert not backend.claim_room("ABCD", {"node": "b"})
+    assert backend.load_room("ABCD") == {"node": "a"}
+    assert backend.list_rooms() == ["ABCD"]
+
+
+def test_save_and_delete_room(backend):
+    backend.save_room("ABCD", {"topic": "x"})
+    backend.append_message("ABCD", {"seq": 1})
+    backend.set_results("ABCD", {"score": 1})
+
+    backend.delete_room("ABCD")
+
+    assert backend.load_room("ABCD") is None
+    assert backend.get_messages("ABCD") == []
+    assert backend.get_results("ABCD") == {}
+    assert backend.list_rooms() == []
+
+
+def test_messages_keep_order_and_limit(backend):
+    for seq in range(1, 6):
+        backend.append_message("ABCD", {"seq": seq, "message": "안녕"}, limit=3)
+
+    assert backend.get_messages("ABCD") == [
+        {"seq": 3, "message": "안녕"},
+        {"seq": 4, "message": "안녕"},
+        {"seq": 5, "message": "안녕"},
+    ]
+
+
+def test_results_round_trip(backend):
+    assert backend.get_results("ABCD") == {}
+    backend.set_results("ABCD", {"winner": "pros"})
+    assert backend.get_results("ABCD") == {"winner": "pros"}
+
+
+def test_create_backend_rejects_unknown_scheme():
+    with pytest.raises(ValueError):
+        state.create_backend("mongo://localhost")
+
+
+def test_reconnects_after_server_closed_idle_connection(redis):
+    backend = state.create_backend(redis.url)
+    backend.save_room("ABCD", {"topic": "x"})
+
+    redis.disconnect_all()
+
+    backend.append_message("ABCD", {"seq": 1})
+    assert backend.get_messages("ABCD") == [{"seq": 1}]
+
+
+def test_does_not_replay_writes_after_sending(redis):
+    backend = state.create_backend(redis.url)
+    # 서버는 RPUSH 를 실행했지만 응답 전에 연결이 끊김
+    redis.drop_after["RPUSH"] = 1
+
+    with pytest.raises((OSError, EOFError)):
+        backend.append_message("ABCD", {"seq": 1})
+
+    assert redis.commands.count("RPUSH") == 1
+    assert backend.get_messages("ABCD") == [{"seq": 1}]
+
+
+def test_retries_idempotent_reads(redis):
+    backend = state.create_backend(redis.url)
+    backend.set_results("ABCD", {"winner": "cons"})
+    redis.drop_after["GET"] = 1
+
+    assert backend.get_results("ABCD") == {"winner": "cons"}
+    assert redis.commands.count("GET") == 2
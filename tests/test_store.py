@@ -0,0 +1,106 @@
+import sqlite3
+
+import pytest
+
+from source.store import TranscriptStore
+
+
+class TrackingStore(TranscriptStore):
+    """열었던 sqlite 연결을 기록해 닫혔는지 확인한다."""
+
+    def __init__(self, *args, **kwargs):
+        self.connections = []
+        super().__init__(*args, **kwargs)
+
+    def _connect(self):
+        conn = super()._connect()
+        self.connections.append(conn)
+        return conn
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TrackingStore(str(tmp_path / "transcripts.sqlite3"), flush_interval=0.05)
+    yield store
+    store.close()
+
+
+def is_closed(conn) -> bool:
+    try:
+        conn.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def test_round_trip(store):
+    store.open_room("uid-1", "ABCD", {"topic": "x"})
+    store.append_message("uid-1", "ABCD", {"seq": 1, "audio_base64": "AAAA"})
+    store.append_message("uid-1", "ABCD", {"seq": 2})
+    store.set_results("uid-1", {"winner": "pros"})
+    store.flush()
+
+    assert store.get_messages("uid-1") == [{"seq": 1}, {"seq": 2}]
+    assert store.get_messages("uid-1", limit=1) == [{"seq": 2}]
+    assert store.get_results("uid-1") == {"winner": "pros"}
+    room = store.get_room("uid-1")
+    assert room["room_id"] == "ABCD" and room["topic"] == "x"
+    assert [r["uid"] for r in store.find_rooms(room_id="ABCD")] == ["uid-1"]
+
+
+def test_reused_room_code_keeps_transcripts_apart(store):
+    store.open_room("uid-1", "ABCD")
+    store.append_message("uid-1", "ABCD", {"seq": 1})
+    store.open_room("uid-2", "ABCD")
+    store.append_message("uid-2", "ABCD", {"seq": 9})
+    store.flush()
+
+    assert store.get_messages("uid-2") == [{"seq": 9}]
+    assert len(store.find_rooms(room_id="ABCD")) == 2
+
+
+def test_keep_audio(tmp_path):
+    store = TranscriptStore(str(tmp_path / "audio.sqlite3"), keep_audio=True)
+    store.append_message("uid-1", "ABCD", {"seq": 1, "audio_base64": "AAAA"})
+    store.flush()
+
+    assert store.get_messages("uid-1") == [{"seq": 1, "audio_base64": "AAAA"}]
+    store.close()
+
+
+def test_reads_close_their_connections(store):
+    store.get_messages("uid-1")
+    store.get_results("uid-1")
+    store.get_room("uid-1")
+    store.find_rooms()
+
+    # 백그라운드 writer 의 연결을 제외하고 모두 닫혀 있어야 함
+    open_connections = [conn for conn in store.connections if not is_closed(conn)]
+    assert len(open_connections) <= 1
+
+
+def test_failing_record_does_not_drop_the_batch(store):
+    store.open_room("uid-1", "ABCD")
+    # uid 가 NOT NULL 이므로 이 항목만 실패
+    store.append_message(None, "ABCD", {"seq": 0})
+    store.append_message("uid-1", "ABCD", {"seq": 1})
+    store.flush()
+
+    assert store.get_messages("uid-1") == [{"seq": 1}]
+    assert store.get_room("uid-1") is not None
+
+
+def test_write_isolates_each_statement(store):
+    conn = store._connect()
+    conn.isolation_level = None
+    store._write(
+        conn,
+        [
+            ("INSERT INTO rooms (uid, room_id, created_at) VALUES (?, ?, ?)", ("a", "A", 1)),
+            ("INSERT INTO rooms (uid, room_id, created_at) VALUES (?, ?, ?)", ("a", "B", 2)),
+            ("INSERT INTO rooms (uid, room_id, created_at) VALUES (?, ?, ?)", ("b", "B", 3)),
+        ],
+    )
+    conn.close()
+
+    assert [room["uid"] for room in store.find_rooms()] == ["a", "b"]
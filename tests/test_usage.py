@@ -0,0 +1,141 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from source import usage
+from source.usage import UsageMeter
+
+
+@pytest.fixture(autouse=True)
+def prices():
+    saved = dict(usage.PRICES)
+    usage.configure({"GPT-X": "2, 0.5, 8", "gemini": "1, 0.25, 4", "tts": "16"})
+    yield
+    usage.PRICES.clear()
+    usage.PRICES.update(saved)
+
+
+def test_cost_charges_cached_input_at_cached_price():
+    counts = {"input": 1_000_000, "cached_input": 400_000, "output": 500_000}
+    # 600k * 2 + 400k * 0.5 + 500k * 8
+    assert usage.cost("openai", "gpt-x", counts) == pytest.approx(5.4)
+
+
+def test_cost_never_charges_negative_uncached_input():
+    counts = {"input": 100, "cached_input": 1_000_000}
+    assert usage.cost("openai", "gpt-x", counts) == pytest.approx(0.5)
+
+
+def test_cost_falls_back_to_provider_then_zero():
+    counts = {"input": 1_000_000, "output": 1_000_000}
+    assert usage.cost("gemini", "gemini-unknown", counts) == pytest.approx(5.0)
+    assert usage.cost("openai", "unknown", counts) == 0.0
+
+
+def test_cost_tts_is_per_character():
+    assert usage.cost("tts", "ko-KR-Standard-A", {"tts_chars": 500_000}) == pytest.approx(8.0)
+
+
+def test_from_openai_responses_api():
+    raw = SimpleNamespace(
+        input_tokens=120,
+        input_tokens_details=SimpleNamespace(cached_tokens=100),
+        output_tokens=50,
+        output_tokens_details=SimpleNamespace(reasoning_tokens=30),
+    )
+    assert usage.from_openai(raw) == {
+        "input": 120,
+        "cached_input": 100,
+        "output": 50,
+        "reasoning": 30,
+    }
+
+
+def test_from_openai_chat_completions_without_details():
+    raw = SimpleNamespace(
+        prompt_tokens=12,
+        prompt_tokens_details=None,
+        completion_tokens=5,
+        completion_tokens_details=None,
+    )
+    assert usage.from_openai(raw) == {"input": 12, "cached_input": 0, "output": 5, "reasoning": 0}
+    assert usage.from_openai(None) == {}
+
+
+def test_from_gemini_adds_thoughts_to_output():
+    raw = SimpleNamespace(
+        prompt_token_count=80,
+        cached_content_token_count=None,
+        candidates_token_count=20,
+        thoughts_token_count=15,
+    )
+    assert usage.from_gemini(raw) == {
+        "input": 80,
+        "cached_input": 0,
+        "output": 35,
+        "reasoning": 15,
+    }
+    assert usage.from_gemini(None) == {}
+
+
+def test_meter_add_and_summary():
+    meter = UsageMeter()
+    meter.add("openai", "gpt-x", {"input": 1_000_000, "output": None})
+    meter.add("tts", "voice", {"tts_chars": 1_000_000})
+
+    summary = meter.summary()
+    assert summary["providers"]["openai/gpt-x"]["calls"] == 1
+    assert summary["providers"]["openai/gpt-x"]["output"] == 0
+    assert summary["total"]["cost"] == pytest.approx(18.0)
+    assert summary["total"]["calls"] == 2
+
+
+def test_merge_sums_entries():
+    first, second = UsageMeter(), UsageMeter()
+    first.add("openai", "gpt-x", {"input": 10, "output": 5})
+    second.add("openai", "gpt-x", {"input": 1, "output": 2})
+    second.add("gemini", "g", {"input": 3})
+
+    first.merge(second)
+    totals = first.summary()["providers"]
+    assert totals["openai/gpt-x"]["input"] == 11
+    assert totals["openai/gpt-x"]["calls"] == 2
+    assert totals["gemini/g"]["input"] == 3
+    # merge 는 원본을 바꾸지 않음
+    assert second.summary()["total"]["calls"] == 2
+
+
+def test_merge_is_thread_safe():
+    target = UsageMeter()
+    sources = []
+    for _ in range(8):
+        meter = UsageMeter()
+        for _ in range(200):
+            meter.add("openai", "gpt-x", {"input": 1, "output": 1})
+        sources.append(meter)
+
+    def work(meter):
+        target.merge(meter)
+        for _ in range(200):
+            target.add("openai", "gpt-x", {"input": 1})
+
+    threads = [threading.Thread(target=work, args=(meter,)) for meter in sources]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    entry = target.summary()["providers"]["openai/gpt-x"]
+    assert entry["calls"] == 8 * 400
+    assert entry["input"] == 8 * 400
+    assert entry["output"] == 8 * 200
+
+
+def test_record_updates_given_meter():
+    meter = UsageMeter()
+    usage.record("openai", "gpt-x", {"input": 7, "unknown": 3}, meter)
+
+    entry = meter.summary()["providers"]["openai/gpt-x"]
+    assert entry["input"] == 7
+    assert "unknown" not in entry
@@ -0,0 +1,23 @@
+import pytest
+
+from source import utils
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (3, 3),
+        ("12", 12),
+        (0, 0),
+        ("abc", None),
+        ("1.5", None),
+        (None, None),
+        ([], None),
+        ({}, None),
+        (-1, None),
+        (True, None),
+        (float("inf"), None),
+    ],
+)
+def test_parse_seq(value, expected):
+    assert utils.parse_seq(value) == expected